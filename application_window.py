@@ -21,18 +21,21 @@
 # along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from PySide2.QtCore import QByteArray, QSettings, QSize, Qt, Signal
-from PySide2.QtGui import QIcon, QKeySequence
-from PySide2.QtWidgets import QAction, QActionGroup, QApplication, QFileDialog, QMainWindow, QMenu, QMessageBox, QTabWidget
+from PySide2.QtCore import QByteArray, QEventLoop, QSettings, QSize, Qt, QUrl, Signal
+from PySide2.QtGui import QKeySequence
+from PySide2.QtWidgets import QAction, QActionGroup, QApplication, QFileDialog, QMainWindow, QMenu, QMessageBox, QProgressBar, QTabWidget
 
-from about_dialog import AboutDialog
-from colophon_dialog import ColophonDialog
+from async_loop import AsyncLoop
 from confirmation_dialog import ConfirmationDialog
 from document_manager import DocumentManager
 from document_widget import DocumentWidget
 from document_window import DocumentWindow
+from edit_journal import EditJournal
+from icon_cache import IconCache
 from message_box import MessageBox
-from preferences_dialog import PreferencesDialog
+from profiler import Profiler
+from task_scheduler import TaskScheduler
+from tracer import Tracer
 
 import icons_rc
 
@@ -40,12 +43,13 @@ import icons_rc
 class ApplicationWindow(QMainWindow):
 
     documentCountChanged = Signal(int)
+    documentsSaved = Signal()
 
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
 
-        self.setWindowIcon(QIcon(":/icons/apps/16/tabelo.svg"))
+        self.setWindowIcon(IconCache.resourceIcon(":/icons/apps/16/tabelo.svg"))
 
         self._documentsArea = DocumentManager()
         self._documentsArea.setViewMode(DocumentManager.TabbedView)
@@ -59,13 +63,22 @@ class ApplicationWindow(QMainWindow):
         self._documentsArea.tabsAutoHideChanged.connect(self._docManagerTabsAutoHideChanged)
         self._documentsArea.subWindowActivated.connect(self._documentActivated)
 
+        self._taskScheduler = TaskScheduler(parent=self)
+        self._pendingSaves = {}
+        self._saveErrors = []
+        self._asyncLoop = AsyncLoop(parent=self)
+
         self._setupActions()
+        Profiler.milestone("Actions set up")
         self._loadSettings()
+        Profiler.milestone("Settings loaded")
 
         self._documentsArea.initTabsVisible()
         self._documentsArea.initTabsPosition()
         self._documentsArea.initTabsAutoHide()
 
+        self._restoringSession = False
+
         self._documentActivated(None)
 
 
@@ -76,7 +89,7 @@ class ApplicationWindow(QMainWindow):
 
         self._actionAbout = QAction(self.tr("&About {0}").format(QApplication.applicationName()), self)
         self._actionAbout.setObjectName("actionAbout")
-        self._actionAbout.setIcon(QIcon(":/icons/apps/16/tabelo.svg"))
+        self._actionAbout.setIcon(IconCache.resourceIcon(":/icons/apps/16/tabelo.svg"))
         self._actionAbout.setIconText(self.tr("About"))
         self._actionAbout.setToolTip(self.tr("Brief description of the application"))
         self._actionAbout.setMenuRole(QAction.AboutRole)
@@ -84,21 +97,21 @@ class ApplicationWindow(QMainWindow):
 
         self._actionColophon = QAction(self.tr("&Colophon"), self)
         self._actionColophon.setObjectName("actionColophon")
-        self._actionColophon.setIcon(QIcon.fromTheme("help-about", QIcon(":/icons/actions/16/help-about.svg")))
+        self._actionColophon.setIcon(IconCache.themeIcon("help-about"))
         self._actionColophon.setToolTip(self.tr("Lengthy description of the application"))
         self._actionColophon.setMenuRole(QAction.ApplicationSpecificRole)
         self._actionColophon.triggered.connect(self._slotColophon)
 
         self._actionPreferences = QAction(self.tr("&Preferences..."), self)
         self._actionPreferences.setObjectName("actionPreferences")
-        self._actionPreferences.setIcon(QIcon.fromTheme("configure", QIcon(":/icons/actions/16/configure.svg")))
+        self._actionPreferences.setIcon(IconCache.themeIcon("configure"))
         self._actionPreferences.setToolTip(self.tr("Customize the appearance and behavior of the application"))
         self._actionPreferences.setMenuRole(QAction.PreferencesRole)
         self._actionPreferences.triggered.connect(self._slotPreferences)
 
         self._actionQuit = QAction(self.tr("&Quit"), self)
         self._actionQuit.setObjectName("actionQuit")
-        self._actionQuit.setIcon(QIcon.fromTheme("application-exit", QIcon(":/icons/actions/16/application-exit.svg")))
+        self._actionQuit.setIcon(IconCache.themeIcon("application-exit"))
         self._actionQuit.setShortcut(QKeySequence.Quit)
         self._actionQuit.setToolTip(self.tr("Quit the application"))
         self._actionQuit.setMenuRole(QAction.QuitRole)
@@ -127,7 +140,7 @@ class ApplicationWindow(QMainWindow):
 
         self._actionNew = QAction(self.tr("&New"), self)
         self._actionNew.setObjectName("actionNew")
-        self._actionNew.setIcon(QIcon.fromTheme("document-new", QIcon(":/icons/actions/16/document-new.svg")))
+        self._actionNew.setIcon(IconCache.themeIcon("document-new"))
         self._actionNew.setShortcut(QKeySequence.New)
         self._actionNew.setToolTip(self.tr("Create new document"))
         self._actionNew.triggered.connect(self._slotNew)
@@ -135,27 +148,33 @@ class ApplicationWindow(QMainWindow):
 
         self._actionOpen = QAction(self.tr("&Open..."), self)
         self._actionOpen.setObjectName("actionOpen")
-        self._actionOpen.setIcon(QIcon.fromTheme("document-open", QIcon(":/icons/actions/16/document-open.svg")))
+        self._actionOpen.setIcon(IconCache.themeIcon("document-open"))
         self._actionOpen.setShortcut(QKeySequence.Open)
         self._actionOpen.setToolTip(self.tr("Open an existing document"))
         self._actionOpen.triggered.connect(self._slotOpen)
         self.addAction(self._actionOpen)
 
+        self._actionSaveAll = QAction(self.tr("Save A&ll"), self)
+        self._actionSaveAll.setObjectName("actionSaveAll")
+        self._actionSaveAll.setIcon(IconCache.themeIcon("document-save"))
+        self._actionSaveAll.setToolTip(self.tr("Save all modified documents"))
+        self._actionSaveAll.triggered.connect(self._slotSaveAll)
+
         self._actionCopyPath = QAction(self.tr("Cop&y Path"), self)
         self._actionCopyPath.setObjectName("actionCopyPath")
-        self._actionCopyPath.setIcon(QIcon.fromTheme("edit-copy-path", QIcon(":/icons/actions/16/edit-copy-path.svg")))
+        self._actionCopyPath.setIcon(IconCache.themeIcon("edit-copy-path"))
         self._actionCopyPath.setToolTip(self.tr("Copy document path to clipboard"))
         self._actionCopyPath.triggered.connect(self._slotCopyPath)
 
         self._actionCopyFilename = QAction(self.tr("Copy &Filename"), self)
         self._actionCopyFilename.setObjectName("actionCopyFilename")
-        self._actionCopyFilename.setIcon(QIcon.fromTheme("edit-copy-path", QIcon(":/icons/actions/16/edit-copy-path.svg")))
+        self._actionCopyFilename.setIcon(IconCache.themeIcon("edit-copy-path"))
         self._actionCopyFilename.setToolTip(self.tr("Copy document filename to clipboard"))
         self._actionCopyFilename.triggered.connect(self._slotCopyFilename)
 
         self._actionClose = QAction(self.tr("&Close"), self)
         self._actionClose.setObjectName("actionClose")
-        self._actionClose.setIcon(QIcon.fromTheme("document-close", QIcon(":/icons/actions/16/document-close.svg")))
+        self._actionClose.setIcon(IconCache.themeIcon("document-close"))
         self._actionClose.setShortcut(QKeySequence.Close)
         self._actionClose.setToolTip(self.tr("Close document"))
         self._actionClose.triggered.connect(self._documentsArea.closeActiveSubWindow)
@@ -177,6 +196,8 @@ class ApplicationWindow(QMainWindow):
         menuFile.addSeparator()
         menuFile.addAction(self._actionOpen)
         menuFile.addSeparator()
+        menuFile.addAction(self._actionSaveAll)
+        menuFile.addSeparator()
         menuFile.addAction(self._actionCopyPath)
         menuFile.addAction(self._actionCopyFilename)
         menuFile.addSeparator()
@@ -188,6 +209,7 @@ class ApplicationWindow(QMainWindow):
         self._toolbarFile.setObjectName("toolbarFile")
         self._toolbarFile.addAction(self._actionNew)
         self._toolbarFile.addAction(self._actionOpen)
+        self._toolbarFile.addAction(self._actionSaveAll)
         self._toolbarFile.addSeparator()
         self._toolbarFile.addAction(self._actionClose)
 
@@ -205,11 +227,67 @@ class ApplicationWindow(QMainWindow):
         #
         # View
 
+        self._actionFollow = QAction(self.tr("&Follow Appended Rows"), self)
+        self._actionFollow.setObjectName("actionFollow")
+        self._actionFollow.setCheckable(True)
+        self._actionFollow.setIconText(self.tr("Follow"))
+        self._actionFollow.setToolTip(self.tr("Keep the view at the last row while other programs append to the document"))
+        self._actionFollow.toggled.connect(self._slotFollow)
+
+        self._actionSplitSheet = QAction(self.tr("S&plit Sheet"), self)
+        self._actionSplitSheet.setObjectName("actionSplitSheet")
+        self._actionSplitSheet.setIconText(self.tr("Split"))
+        self._actionSplitSheet.setToolTip(self.tr("Show the current sheet in two views, or one view again"))
+        self._actionSplitSheet.triggered.connect(self._slotSplitSheet)
+
+        self._actionFreezePanes = QAction(self.tr("F&reeze Panes"), self)
+        self._actionFreezePanes.setObjectName("actionFreezePanes")
+        self._actionFreezePanes.setIconText(self.tr("Freeze"))
+        self._actionFreezePanes.setToolTip(self.tr("Keep the rows above and the columns left of the current cell visible, or unfreeze them"))
+        self._actionFreezePanes.triggered.connect(self._slotFreezePanes)
+
+        self._actionHideRows = QAction(self.tr("&Hide Rows"), self)
+        self._actionHideRows.setObjectName("actionHideRows")
+        self._actionHideRows.setToolTip(self.tr("Hide the selected rows"))
+        self._actionHideRows.triggered.connect(self._slotHideRows)
+
+        self._actionHideColumns = QAction(self.tr("Hide &Columns"), self)
+        self._actionHideColumns.setObjectName("actionHideColumns")
+        self._actionHideColumns.setToolTip(self.tr("Hide the selected columns"))
+        self._actionHideColumns.triggered.connect(self._slotHideColumns)
+
+        self._actionShowHidden = QAction(self.tr("Show Hidden Rows and C&olumns"), self)
+        self._actionShowHidden.setObjectName("actionShowHidden")
+        self._actionShowHidden.setToolTip(self.tr("Show all hidden rows and columns and expand all groups"))
+        self._actionShowHidden.triggered.connect(self._slotShowHidden)
+
+        self._actionGroupRows = QAction(self.tr("&Group Rows"), self)
+        self._actionGroupRows.setObjectName("actionGroupRows")
+        self._actionGroupRows.setToolTip(self.tr("Group the selected rows into an outline group"))
+        self._actionGroupRows.triggered.connect(self._slotGroupRows)
+
+        self._actionToggleRowGroup = QAction(self.tr("Collapse or &Expand Row Group"), self)
+        self._actionToggleRowGroup.setObjectName("actionToggleRowGroup")
+        self._actionToggleRowGroup.setToolTip(self.tr("Collapse or expand the row group at the current cell"))
+        self._actionToggleRowGroup.triggered.connect(self._slotToggleRowGroup)
+
         menuView = self.menuBar().addMenu(self.tr("&View"))
         menuView.setObjectName("menuView")
+        menuView.addAction(self._actionFollow)
+        menuView.addSeparator()
+        menuView.addAction(self._actionSplitSheet)
+        menuView.addAction(self._actionFreezePanes)
+        menuView.addSeparator()
+        menuView.addAction(self._actionHideRows)
+        menuView.addAction(self._actionHideColumns)
+        menuView.addAction(self._actionShowHidden)
+        menuView.addSeparator()
+        menuView.addAction(self._actionGroupRows)
+        menuView.addAction(self._actionToggleRowGroup)
 
         self._toolbarView = self.addToolBar(self.tr("View Toolbar"))
         self._toolbarView.setObjectName("toolbarView")
+        self._toolbarView.addAction(self._actionFollow)
 
 
         #
@@ -225,11 +303,20 @@ class ApplicationWindow(QMainWindow):
         #
         # Tools
 
+        self._actionRecordTrace = QAction(self.tr("&Record Trace"), self)
+        self._actionRecordTrace.setObjectName("actionRecordTrace")
+        self._actionRecordTrace.setCheckable(True)
+        self._actionRecordTrace.setIconText(self.tr("Trace"))
+        self._actionRecordTrace.setToolTip(self.tr("Record the timing of long-running operations and save it as a Chrome trace"))
+        self._actionRecordTrace.toggled.connect(self._slotRecordTrace)
+
         menuTools = self.menuBar().addMenu(self.tr("&Tools"))
         menuTools.setObjectName("menuTools")
+        menuTools.addAction(self._actionRecordTrace)
 
         self._toolbarTools = self.addToolBar(self.tr("Tools Toolbar"))
         self._toolbarTools.setObjectName("toolbarTools")
+        self._toolbarTools.addAction(self._actionRecordTrace)
 
 
         #
@@ -239,7 +326,7 @@ class ApplicationWindow(QMainWindow):
         self._actionShowPath.setObjectName("actionShowPath")
         self._actionShowPath.setCheckable(True)
         self._actionShowPath.setChecked(True)
-        self._actionShowPath.setIcon(QIcon.fromTheme("show-path", QIcon(":/icons/actions/16/show-path.svg")))
+        self._actionShowPath.setIcon(IconCache.themeIcon("show-path"))
         self._actionShowPath.setIconText(self.tr("Path"))
         self._actionShowPath.setToolTip(self.tr("Show document path in the window caption"))
         self._actionShowPath.toggled.connect(self._slotShowPath)
@@ -248,7 +335,7 @@ class ApplicationWindow(QMainWindow):
         self._actionShowMenubar.setObjectName("actionShowMenubar")
         self._actionShowMenubar.setCheckable(True)
         self._actionShowMenubar.setChecked(True)
-        self._actionShowMenubar.setIcon(QIcon.fromTheme("show-menubar", QIcon(":/icons/actions/16/show-menubar.svg")))
+        self._actionShowMenubar.setIcon(IconCache.themeIcon("show-menubar"))
         self._actionShowMenubar.setIconText(self.tr("Menubar"))
         self._actionShowMenubar.setShortcut(QKeySequence(Qt.CTRL + Qt.Key_M))
         self._actionShowMenubar.setToolTip(self.tr("Show the menubar"))
@@ -377,7 +464,7 @@ class ApplicationWindow(QMainWindow):
         self._actionDocumentTabsVisible.setObjectName("actionDocumentTabsVisible")
         self._actionDocumentTabsVisible.setCheckable(True)
         self._actionDocumentTabsVisible.setChecked(True)
-        self._actionDocumentTabsVisible.setIcon(QIcon.fromTheme("show-tabbar", QIcon(":/icons/actions/16/show-tabbar.svg")))
+        self._actionDocumentTabsVisible.setIcon(IconCache.themeIcon("show-tabbar"))
         self._actionDocumentTabsVisible.setIconText(self.tr("Document Tabs"))
         self._actionDocumentTabsVisible.setToolTip(self.tr("Show the document tabs"))
         self._actionDocumentTabsVisible.toggled.connect(self._slotDocumentTabsVisible)
@@ -410,7 +497,7 @@ class ApplicationWindow(QMainWindow):
         self._actionSheetTabsVisible.setObjectName("actionSheetTabsVisible")
         self._actionSheetTabsVisible.setCheckable(True)
         self._actionSheetTabsVisible.setChecked(True)
-        self._actionSheetTabsVisible.setIcon(QIcon.fromTheme("show-tabbar-bottom", QIcon(":/icons/actions/16/show-tabbar-bottom.svg")))
+        self._actionSheetTabsVisible.setIcon(IconCache.themeIcon("show-tabbar-bottom"))
         self._actionSheetTabsVisible.setIconText(self.tr("Sheet Tabs"))
         self._actionSheetTabsVisible.setToolTip(self.tr("Show the sheet tabs"))
         self._actionSheetTabsVisible.toggled.connect(self._slotSheetTabsVisible)
@@ -440,11 +527,17 @@ class ApplicationWindow(QMainWindow):
         self._actionSheetTabsAutoHide.setToolTip(self.tr("Tabs are automatically hidden if they contain only 1 sheet"))
         self._actionSheetTabsAutoHide.toggled.connect(self._slotSheetTabsAutoHide)
 
+        self._actionReleaseInactiveSheets = QAction(self.tr("&Release Inactive Sheets"), self)
+        self._actionReleaseInactiveSheets.setObjectName("actionReleaseInactiveSheets")
+        self._actionReleaseInactiveSheets.setCheckable(True)
+        self._actionReleaseInactiveSheets.setToolTip(self.tr("Free the views of sheets that are not displayed and rebuild them when displayed again"))
+        self._actionReleaseInactiveSheets.toggled.connect(self._slotReleaseInactiveSheets)
+
         self._actionShowStatusbar = QAction(self.tr("Show Stat&usbar"), self)
         self._actionShowStatusbar.setObjectName("actionShowStatusbar")
         self._actionShowStatusbar.setCheckable(True)
         self._actionShowStatusbar.setChecked(True)
-        self._actionShowStatusbar.setIcon(QIcon.fromTheme("show-statusbar", QIcon(":/icons/actions/16/show-statusbar.svg")))
+        self._actionShowStatusbar.setIcon(IconCache.themeIcon("show-statusbar"))
         self._actionShowStatusbar.setIconText(self.tr("Statusbar"))
         self._actionShowStatusbar.setToolTip(self.tr("Show the statusbar"))
         self._actionShowStatusbar.toggled.connect(self._slotShowStatusbar)
@@ -457,28 +550,20 @@ class ApplicationWindow(QMainWindow):
         self.addAction(self._actionFullScreen)
         self._updateActionFullScreen()
 
-        menuToolButtonStyle = QMenu(self.tr("Tool Button St&yle"), self)
-        menuToolButtonStyle.setObjectName("menuToolButtonStyle")
-        menuToolButtonStyle.addSection(self.tr("Text Position"))
-        menuToolButtonStyle.addActions(self._actionsToolButtonStyle.actions())
-        menuToolButtonStyle.addSection(self.tr("Icon Size"))
-        menuToolButtonStyle.addActions(self._actionsToolButtonSize.actions())
-
-        menuDocumentTabsPosition = QMenu(self.tr("Document Tab &Position"), self)
-        menuDocumentTabsPosition.setObjectName("menuDocumentTabsPosition")
-        menuDocumentTabsPosition.addSection(self.tr("Position"))
-        menuDocumentTabsPosition.addActions(self._actionsDocumentTabsPosition.actions())
-        menuDocumentTabsPosition.addSection(self.tr("Behavior"))
-        menuDocumentTabsPosition.addAction(self._actionDocumentTabsAutoHide)
-        self._actionDocumentTabsVisible.toggled.connect(menuDocumentTabsPosition.setEnabled)
-
-        menuSheetTabsPosition = QMenu(self.tr("Sheet Tab P&osition"), self)
-        menuSheetTabsPosition.setObjectName("menuSheetTabsPosition")
-        menuSheetTabsPosition.addSection(self.tr("Position"))
-        menuSheetTabsPosition.addActions(self._actionsSheetTabsPosition.actions())
-        menuSheetTabsPosition.addSection(self.tr("Behavior"))
-        menuSheetTabsPosition.addAction(self._actionSheetTabsAutoHide)
-        self._actionSheetTabsVisible.toggled.connect(menuSheetTabsPosition.setEnabled)
+        # Submenus are populated on first show
+        self._menuToolButtonStyle = QMenu(self.tr("Tool Button St&yle"), self)
+        self._menuToolButtonStyle.setObjectName("menuToolButtonStyle")
+        self._menuToolButtonStyle.aboutToShow.connect(self._populateMenuToolButtonStyle)
+
+        self._menuDocumentTabsPosition = QMenu(self.tr("Document Tab &Position"), self)
+        self._menuDocumentTabsPosition.setObjectName("menuDocumentTabsPosition")
+        self._menuDocumentTabsPosition.aboutToShow.connect(self._populateMenuDocumentTabsPosition)
+        self._actionDocumentTabsVisible.toggled.connect(self._menuDocumentTabsPosition.setEnabled)
+
+        self._menuSheetTabsPosition = QMenu(self.tr("Sheet Tab P&osition"), self)
+        self._menuSheetTabsPosition.setObjectName("menuSheetTabsPosition")
+        self._menuSheetTabsPosition.aboutToShow.connect(self._populateMenuSheetTabsPosition)
+        self._actionSheetTabsVisible.toggled.connect(self._menuSheetTabsPosition.setEnabled)
 
         menuAppearance = self.menuBar().addMenu(self.tr("Appea&rance"))
         menuAppearance.setObjectName("menuAppearance")
@@ -494,12 +579,12 @@ class ApplicationWindow(QMainWindow):
         menuAppearance.addAction(self._actionShowToolbarTools)
         menuAppearance.addAction(self._actionShowToolbarAppearance)
         menuAppearance.addAction(self._actionShowToolbarHelp)
-        menuAppearance.addMenu(menuToolButtonStyle)
+        menuAppearance.addMenu(self._menuToolButtonStyle)
         menuAppearance.addSeparator()
         menuAppearance.addAction(self._actionDocumentTabsVisible)
-        menuAppearance.addMenu(menuDocumentTabsPosition)
+        menuAppearance.addMenu(self._menuDocumentTabsPosition)
         menuAppearance.addAction(self._actionSheetTabsVisible)
-        menuAppearance.addMenu(menuSheetTabsPosition)
+        menuAppearance.addMenu(self._menuSheetTabsPosition)
         menuAppearance.addSeparator()
         menuAppearance.addAction(self._actionShowStatusbar)
         menuAppearance.addSeparator()
@@ -507,12 +592,7 @@ class ApplicationWindow(QMainWindow):
 
         self._toolbarAppearance = self.addToolBar(self.tr("Appearance Toolbar"))
         self._toolbarAppearance.setObjectName("toolbarAppearance")
-        self._toolbarAppearance.addAction(self._actionShowMenubar)
-        self._toolbarAppearance.addAction(self._actionDocumentTabsVisible)
-        self._toolbarAppearance.addAction(self._actionSheetTabsVisible)
-        self._toolbarAppearance.addAction(self._actionShowStatusbar)
-        self._toolbarAppearance.addSeparator()
-        self._toolbarAppearance.addAction(self._actionFullScreen)
+        self._toolbarAppearance.visibilityChanged.connect(self._populateToolbarAppearance)
 
 
         #
@@ -547,9 +627,65 @@ class ApplicationWindow(QMainWindow):
         #
         # Statusbar
 
+        self._taskProgress = QProgressBar()
+        self._taskProgress.setMaximumWidth(200)
+        self._taskProgress.setRange(0, 100)
+        self._taskProgress.setVisible(False)
+        self.statusBar().addPermanentWidget(self._taskProgress)
+
+        self._taskScheduler.activeTasksChanged.connect(self._taskSchedulerActiveTasksChanged)
+        self._taskScheduler.progressChanged.connect(self._taskProgress.setValue)
+
         self.statusBar().showMessage(self.tr("Ready"), 3000)
 
 
+    def _populateMenuToolButtonStyle(self):
+        """  """
+        if not self._menuToolButtonStyle.isEmpty():
+            return None
+
+        self._menuToolButtonStyle.addSection(self.tr("Text Position"))
+        self._menuToolButtonStyle.addActions(self._actionsToolButtonStyle.actions())
+        self._menuToolButtonStyle.addSection(self.tr("Icon Size"))
+        self._menuToolButtonStyle.addActions(self._actionsToolButtonSize.actions())
+
+
+    def _populateMenuDocumentTabsPosition(self):
+        """  """
+        if not self._menuDocumentTabsPosition.isEmpty():
+            return None
+
+        self._menuDocumentTabsPosition.addSection(self.tr("Position"))
+        self._menuDocumentTabsPosition.addActions(self._actionsDocumentTabsPosition.actions())
+        self._menuDocumentTabsPosition.addSection(self.tr("Behavior"))
+        self._menuDocumentTabsPosition.addAction(self._actionDocumentTabsAutoHide)
+
+
+    def _populateMenuSheetTabsPosition(self):
+        """  """
+        if not self._menuSheetTabsPosition.isEmpty():
+            return None
+
+        self._menuSheetTabsPosition.addSection(self.tr("Position"))
+        self._menuSheetTabsPosition.addActions(self._actionsSheetTabsPosition.actions())
+        self._menuSheetTabsPosition.addSection(self.tr("Behavior"))
+        self._menuSheetTabsPosition.addAction(self._actionSheetTabsAutoHide)
+        self._menuSheetTabsPosition.addAction(self._actionReleaseInactiveSheets)
+
+
+    def _populateToolbarAppearance(self, visible):
+        """  """
+        if not visible or self._toolbarAppearance.actions():
+            return None
+
+        self._toolbarAppearance.addAction(self._actionShowMenubar)
+        self._toolbarAppearance.addAction(self._actionDocumentTabsVisible)
+        self._toolbarAppearance.addAction(self._actionSheetTabsVisible)
+        self._toolbarAppearance.addAction(self._actionShowStatusbar)
+        self._toolbarAppearance.addSeparator()
+        self._toolbarAppearance.addAction(self._actionFullScreen)
+
+
     def _updateActionsToolButtonStyle(self, style):
 
         for action in self._actionsToolButtonStyle.actions():
@@ -606,16 +742,28 @@ class ApplicationWindow(QMainWindow):
             self._actionSheetTabsAutoHide.toggle()
 
 
+    def _updateActionReleaseInactiveSheets(self, enabled):
+        """  """
+        if enabled != self._actionReleaseInactiveSheets.isChecked():
+            self._actionReleaseInactiveSheets.toggle()
+
+
+    def _updateActionFollow(self, follow):
+        """  """
+        if follow != self._actionFollow.isChecked():
+            self._actionFollow.toggle()
+
+
     def _updateActionFullScreen(self):
 
         if not self._actionFullScreen.isChecked():
             self._actionFullScreen.setText(self.tr("Full &Screen Mode"))
-            self._actionFullScreen.setIcon(QIcon.fromTheme("view-fullscreen", QIcon(":/icons/actions/16/view-fullscreen.svg")))
+            self._actionFullScreen.setIcon(IconCache.themeIcon("view-fullscreen"))
             self._actionFullScreen.setIconText(self.tr("Full Screen"))
             self._actionFullScreen.setToolTip(self.tr("Display the window in full screen"))
         else:
             self._actionFullScreen.setText(self.tr("Exit Full &Screen Mode"))
-            self._actionFullScreen.setIcon(QIcon.fromTheme("view-restore", QIcon(":/icons/actions/16/view-restore.svg")))
+            self._actionFullScreen.setIcon(IconCache.themeIcon("view-restore"))
             self._actionFullScreen.setIconText(self.tr("Full Screen"))
             self._actionFullScreen.setToolTip(self.tr("Exit full screen mode"))
 
@@ -623,6 +771,14 @@ class ApplicationWindow(QMainWindow):
     def _enableActions(self, enabled):
 
         self._actionClose.setEnabled(enabled)
+        self._actionSaveAll.setEnabled(enabled)
+        self._actionSplitSheet.setEnabled(enabled)
+        self._actionFreezePanes.setEnabled(enabled)
+        self._actionHideRows.setEnabled(enabled)
+        self._actionHideColumns.setEnabled(enabled)
+        self._actionShowHidden.setEnabled(enabled)
+        self._actionGroupRows.setEnabled(enabled)
+        self._actionToggleRowGroup.setEnabled(enabled)
         self._actionCloseAll.setEnabled(enabled)
 
 
@@ -635,6 +791,7 @@ class ApplicationWindow(QMainWindow):
 
         self._actionCopyPath.setEnabled(enabled)
         self._actionCopyFilename.setEnabled(enabled)
+        self._actionFollow.setEnabled(enabled)
 
 
     def _loadSettings(self):
@@ -731,7 +888,24 @@ class ApplicationWindow(QMainWindow):
 
     def closeEvent(self, event):
 
-        if self._documentsArea.subWindowCount() >= 1:
+        if self._modifiedDocuments():
+
+            title = self.tr("Quit the application")
+            text = self.tr("There are documents with unsaved changes.\n"
+                           "Do you want to save them before quitting?")
+            buttons = QMessageBox.Save | QMessageBox.Discard | QMessageBox.Cancel
+            default = QMessageBox.Save
+
+            answer = ConfirmationDialog.warning(self, title, text, buttons, default)
+            if answer == QMessageBox.Cancel:
+                event.ignore()
+                return None
+
+            if answer == QMessageBox.Save and not self._saveDocumentsAndWait(self._modifiedDocuments()):
+                event.ignore()
+                return None
+
+        elif self._documentsArea.subWindowCount() >= 1:
 
             title = self.tr("Quit the application")
             text = self.tr("This will close all open documents and quit the application.\n"
@@ -743,7 +917,12 @@ class ApplicationWindow(QMainWindow):
                 event.ignore()
                 return None
 
-            self._documentsArea.closeAllSubWindows()
+        self._documentsArea.saveSession()
+        self._documentsArea.closeAllSubWindows()
+        EditJournal.flush()
+
+        self._taskScheduler.shutdown()
+        self._asyncLoop.stop()
 
         self._documentsArea.saveSettings()
         self._saveSettings()
@@ -768,6 +947,26 @@ class ApplicationWindow(QMainWindow):
         self.setWindowTitle(caption)
 
 
+    def taskScheduler(self):
+        """ Returns the scheduler shared by all long-running operations. """
+        return self._taskScheduler
+
+
+    def asyncLoop(self):
+        """ Returns the asyncio loop for I/O-bound coroutines. """
+        return self._asyncLoop
+
+
+    #
+    # Task scheduler
+    #
+
+    def _taskSchedulerActiveTasksChanged(self, count):
+        """  """
+        self._taskProgress.setVisible(count >= 1)
+        self._taskProgress.setFormat(self.tr("%p% ({0} tasks)").format(count) if count >= 2 else self.tr("%p%"))
+
+
     #
     # Document manager
     #
@@ -793,7 +992,7 @@ class ApplicationWindow(QMainWindow):
 
     def _createDocument(self):
 
-        document = DocumentWidget()
+        document = DocumentWidget(self._asyncLoop)
 
         docWindow = DocumentWindow()
         docWindow.setWidget(document)
@@ -809,6 +1008,11 @@ class ApplicationWindow(QMainWindow):
         # Connections: Url
         document.urlChanged.connect(docWindow.documentUrlChanged)
         document.urlChanged.connect(self._documentUrlChanged)
+        # Connections: External changes
+        document.followChanged.connect(self._documentFollowChanged)
+        document.rowsAppended.connect(self._documentRowsAppended)
+        document.fileChangedExternally.connect(self._documentFileChangedExternally)
+        document.journalFailed.connect(self._documentJournalFailed)
         # Connections: Actions
         docWindow.actionCloseOtherSubWindows.connect(self._documentsArea.closeOtherSubWindows)
         docWindow.actionCopyPath.connect(document.copyPathToClipboard)
@@ -824,6 +1028,7 @@ class ApplicationWindow(QMainWindow):
         document.initTabBarAutoHide()
         document.initModified()
         document.initUrl()
+        document.initFollow()
 
         return document
 
@@ -848,19 +1053,83 @@ class ApplicationWindow(QMainWindow):
 
     def openDocument(self, url):
 
-        subWindow = self._documentsArea.findSubWindow(url)
-        if subWindow is not None:
+        if Profiler.isRunning():
+            Profiler.milestone("Open document: {0}".format(url.toString()))
+
+        with Tracer.span("Open document", url=url):
+
+            subWindow = self._documentsArea.findSubWindow(url)
+            if subWindow is not None:
 
-            # Given document is already loaded; activate the subwindow
-             self._documentsArea.setActiveSubWindow(subWindow)
-             return True
+                # Given document is already loaded; activate the subwindow
+                 self._documentsArea.setActiveSubWindow(subWindow)
+                 return True
 
-        return self._loadDocument(url)
+            return self._loadDocument(url)
+
+
+    def restoreSession(self):
+        """ Recreates the documents of the previous session as placeholders; each one is loaded when first activated. """
+        documents, active = self._documentsArea.loadSession()
+        if not documents:
+            return None
+
+        self._restoringSession = True
+
+        subWindows = []
+        for url, sheet, viewState in documents:
+            if self._documentsArea.findSubWindow(url) is not None:
+                continue
+
+            document = self._createDocument()
+            document.deferLoad(sheet, viewState)
+            document.show()
+            document.setUrl(url)
+            subWindows.append(self._documentsArea.findSubWindow(url))
+
+        self._documentCreated()
+
+        self._restoringSession = False
+
+        if subWindows:
+            subWindow = subWindows[active] if 0 <= active < len(subWindows) else subWindows[-1]
+            self._documentsArea.setActiveSubWindow(subWindow)
+            self._documentActivated(subWindow)
+
+
+    def recoverJournals(self):
+        """ Offers to replay the unsaved edits that a previous session left in its journals. """
+        for path in EditJournal.pendingJournals():
+            url, records = EditJournal.read(path)
+
+            if records:
+                url = QUrl(url)
+
+                title = self.tr("Recover unsaved changes")
+                text = self.tr("{0} has {1} unsaved changes from a previous session.\n"
+                               "Do you want to recover them?").format(url.fileName() or self.tr("Untitled"), len(records))
+                buttons = QMessageBox.Yes | QMessageBox.No
+                default = QMessageBox.Yes
+
+                if ConfirmationDialog.question(self, title, text, buttons, default) == QMessageBox.Yes:
+
+                    if not url.isEmpty() and self.openDocument(url):
+                        document = self._documentsArea.findSubWindow(url).widget()
+                        document.load()
+                    else:
+                        document = self._createDocument()
+                        document.show()
+                        self._documentCreated()
+
+                    document.replayJournal(records)
+
+            EditJournal.remove(path)
 
 
     def _loadDocument(self, url):
 
-        document = self._createDocument()
+        with Tracer.span("Create document"):
+            document = self._createDocument()
 
         if not True:
 
@@ -876,6 +1145,103 @@ class ApplicationWindow(QMainWindow):
         return True
 
 
+    def _modifiedDocuments(self):
+        """  """
+        return [subWindow.widget() for subWindow in self._documentsArea.subWindowList() if subWindow.widget().isModified()]
+
+
+    def _saveDocuments(self, documents):
+        """ Saves the documents concurrently on the task scheduler; documentsSaved is emitted when all are done. """
+        for document in documents:
+            url = document.getUrl()
+            if url in self._pendingSaves.values():
+                continue
+
+            if not url.isLocalFile():
+                caption = url.toDisplayString() if not url.isEmpty() else self.tr("Untitled")
+                self._saveErrors.append(self.tr("{0}: Only local files can be saved").format(caption))
+                continue
+
+            sheets = document.unsavableSheets()
+            if sheets:
+                self._saveErrors.append(self.tr("{0}: A delimited file holds only the first sheet; the edits of {1} cannot be saved").format(url.toDisplayString(QUrl.PreferLocalFile), ", ".join(sheets)))
+                continue
+
+            snapshot = document.snapshot()
+            if snapshot is None:
+                self._saveErrors.append(self.tr("{0}: The contents of the document are not available for saving").format(url.toDisplayString(QUrl.PreferLocalFile)))
+                continue
+
+            rows, editCount = snapshot
+            document.beginSave(editCount)
+            task = self._taskScheduler.submit(DocumentWidget.writeSnapshot, url.toLocalFile(), rows, priority=TaskScheduler.Interactive, owner=document)
+            task.finished.connect(self._documentSaved)
+            task.failed.connect(self._documentSaveFailed)
+            task.cancelled.connect(self._documentSaveCancelled)
+            self._pendingSaves[task] = url
+
+        if not self._pendingSaves:
+            self._documentsSavedAll()
+
+
+    def _saveDocumentsAndWait(self, documents):
+        """ Saves the documents and returns whether all of them were saved. """
+        self._saveErrors = []
+
+        loop = QEventLoop()
+        self.documentsSaved.connect(loop.quit)
+        self._saveDocuments(documents)
+        if self._pendingSaves:
+            loop.exec_()
+        self.documentsSaved.disconnect(loop.quit)
+
+        return not self._saveErrors
+
+
+    def _documentSaveDone(self, error=None):
+        """  """
+        url = self._pendingSaves.pop(self.sender(), None)
+        if url is None:
+            return None
+
+        subWindow = self._documentsArea.findSubWindow(url)
+        if subWindow is not None:
+            subWindow.widget().endSave(error is None)
+
+        if error is not None:
+            self._saveErrors.append(self.tr("{0}: {1}").format(url.toDisplayString(QUrl.PreferLocalFile), error))
+
+        if not self._pendingSaves:
+            self._documentsSavedAll()
+
+
+    def _documentSaved(self, path):
+        """  """
+        self._documentSaveDone()
+
+
+    def _documentSaveFailed(self, exception):
+        """  """
+        self._documentSaveDone(exception)
+
+
+    def _documentSaveCancelled(self):
+        """  """
+        self._documentSaveDone(self.tr("Cancelled"))
+
+
+    def _documentsSavedAll(self):
+        """  """
+        if self._saveErrors:
+            title = self.tr("Save documents")
+            text = self.tr("The following documents could not be saved:\n{0}").format("\n".join(self._saveErrors))
+            MessageBox.warning(self, title, text)
+        else:
+            self.statusBar().showMessage(self.tr("All documents saved"), 3000)
+
+        self.documentsSaved.emit()
+
+
     #
     #
     #
@@ -890,6 +1256,9 @@ class ApplicationWindow(QMainWindow):
 
         document = self._extractDocument(subWindow)
 
+        if document is not None and not document.isLoaded() and not self._restoringSession:
+            document.load()
+
         self._updateWindowModified()
         self._updateWindowTitle(self._actionShowPath.isChecked())
 
@@ -897,6 +1266,9 @@ class ApplicationWindow(QMainWindow):
         self._updateActionsSheetTabsPosition(document.getTabBarPosition() if document is not None else QTabWidget.South)
         self._updateActionSheetTabsAutoHide(document.isTabBarAutoHide() if document is not None else True)
 
+        self._updateActionReleaseInactiveSheets(document.isReleaseInactiveSheets() if document is not None else False)
+        self._updateActionFollow(document.isFollow() if document is not None else False)
+
         self._enableActions(document is not None)
         self._enableFileActions(not document.getUrl().isEmpty() if document is not None else False)
 
@@ -932,6 +1304,42 @@ class ApplicationWindow(QMainWindow):
             self._updateActionSheetTabsAutoHide(hide)
 
 
+    def _documentFollowChanged(self, follow):
+        """  """
+        if self.sender() == self._activeDocument():
+            self._updateActionFollow(follow)
+
+
+    def _documentRowsAppended(self, rows):
+        """  """
+        document = self.sender()
+        self.statusBar().showMessage(self.tr("{0} rows appended to {1}").format(len(rows), document.getUrl().fileName()), 3000)
+
+
+    def _documentFileChangedExternally(self, reloaded):
+        """ Offers to reload a rewritten file whose contents were edited. """
+        document = self.sender()
+
+        if reloaded:
+            self.statusBar().showMessage(self.tr("{0} was changed by another program and reloaded").format(document.getUrl().fileName()), 3000)
+            return None
+
+        title = self.tr("Reload document")
+        text = self.tr("{0} was changed by another program.\n"
+                       "Do you want to reload it and discard your changes?").format(document.getUrl().fileName())
+        buttons = QMessageBox.Yes | QMessageBox.No
+        default = QMessageBox.No
+
+        if ConfirmationDialog.question(self, title, text, buttons, default) == QMessageBox.Yes:
+            document.reloadContents()
+
+
+    def _documentJournalFailed(self, message):
+        """  """
+        document = self.sender()
+        self.statusBar().showMessage(self.tr("Unsaved changes of {0} cannot be journaled: {1}").format(document.getUrl().fileName() or self.tr("Untitled"), message))
+
+
     def _documentClosed(self):
         """  """
         self.documentCountChanged.emit(self._documentsArea.count)
@@ -944,18 +1352,24 @@ class ApplicationWindow(QMainWindow):
 
     def _slotAbout(self):
 
+        from about_dialog import AboutDialog
+
         dialog = AboutDialog(self)
         dialog.open()
 
 
     def _slotColophon(self):
 
+        from colophon_dialog import ColophonDialog
+
         dialog = ColophonDialog(self)
         dialog.open()
 
 
     def _slotPreferences(self):
 
+        from preferences_dialog import PreferencesDialog
+
         dialog = PreferencesDialog(self)
         dialog.open()
 
@@ -975,6 +1389,12 @@ class ApplicationWindow(QMainWindow):
             self.openDocument(url)
 
 
+    def _slotSaveAll(self):
+
+        self._saveErrors = []
+        self._saveDocuments(self._modifiedDocuments())
+
+
     def _slotCopyPath(self):
         """  """
         if self._hasActiveDocument():
@@ -1015,6 +1435,89 @@ class ApplicationWindow(QMainWindow):
                 self._documentsArea.closeAllSubWindows()
 
 
+    def _slotRecordTrace(self, checked):
+
+        if checked:
+            Tracer.setEnabled(True)
+            self.statusBar().showMessage(self.tr("Recording trace"), 3000)
+            return None
+
+        Tracer.setEnabled(False)
+
+        filename, _ = QFileDialog.getSaveFileName(self, self.tr("Save Trace"), "trace.json", self.tr("Chrome Trace Files (*.json)"))
+        if filename:
+            try:
+                Tracer.save(filename)
+            except OSError as error:
+                MessageBox.warning(self, self.tr("Save Trace"), self.tr("The trace could not be saved:\n{0}").format(error))
+
+
+    def _slotFollow(self, checked):
+        """  """
+        if self._hasActiveDocument():
+            self._activeDocument().setFollow(checked)
+
+
+    def _slotSplitSheet(self):
+        """  """
+        sheet = self._activeDocument().currentSheet() if self._hasActiveDocument() else None
+        if sheet is None:
+            return None
+
+        if sheet.isSplit():
+            sheet.unsplit()
+        else:
+            sheet.split()
+
+
+    def _slotFreezePanes(self):
+        """  """
+        sheet = self._activeDocument().currentSheet() if self._hasActiveDocument() else None
+        if sheet is None:
+            return None
+
+        if sheet.isFrozen():
+            sheet.setFrozen(0, 0)
+        else:
+            index = sheet.currentView().currentIndex()
+            sheet.setFrozen(max(0, index.row()), max(0, index.column()))
+
+
+    def _slotHideRows(self):
+        """  """
+        sheet = self._activeDocument().currentSheet() if self._hasActiveDocument() else None
+        if sheet is not None:
+            sheet.hideSelection(Qt.Vertical)
+
+
+    def _slotHideColumns(self):
+        """  """
+        sheet = self._activeDocument().currentSheet() if self._hasActiveDocument() else None
+        if sheet is not None:
+            sheet.hideSelection(Qt.Horizontal)
+
+
+    def _slotShowHidden(self):
+        """  """
+        sheet = self._activeDocument().currentSheet() if self._hasActiveDocument() else None
+        if sheet is not None:
+            sheet.showAll()
+
+
+    def _slotGroupRows(self):
+        """  """
+        sheet = self._activeDocument().currentSheet() if self._hasActiveDocument() else None
+        if sheet is not None:
+            sheet.groupSelection(Qt.Vertical)
+
+
+    def _slotToggleRowGroup(self):
+        """  """
+        sheet = self._activeDocument().currentSheet() if self._hasActiveDocument() else None
+        if sheet is not None:
+            sheet.toggleGroup(Qt.Vertical)
+
+
     def _slotShowPath(self, checked):
         """  """
         self._updateWindowTitle(checked)
@@ -1087,6 +1590,12 @@ class ApplicationWindow(QMainWindow):
             self._activeDocument().setTabBarAutoHide(checked)
 
 
+    def _slotReleaseInactiveSheets(self, checked):
+        """  """
+        if self._hasActiveDocument():
+            self._activeDocument().setReleaseInactiveSheets(checked)
+
+
     def _slotShowStatusbar(self, checked):
 
         self.statusBar().setVisible(checked)
@@ -0,0 +1,179 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import asyncio
+import threading
+
+from PySide2.QtCore import QObject, Signal
+
+
+class AsyncTask(QObject):
+
+    # Emitted from the asyncio thread; connections to main thread objects are queued
+    chunkReady = Signal(object)
+    finished = Signal(object)
+    failed = Signal(object)
+    cancelled = Signal()
+
+
+    def __init__(self, parent=None):
+        """  """
+        super().__init__(parent=parent)
+
+        self._future = None
+
+
+    def cancel(self):
+        """  """
+        if self._future is not None:
+            self._future.cancel()
+
+
+    def _emitChunk(self, chunk):
+        """ Chunk callback handed to the coroutine function. """
+        self.chunkReady.emit(chunk)
+
+
+    def _done(self, future):
+        """  """
+        if future.cancelled():
+            self.cancelled.emit()
+        elif future.exception() is not None:
+            self.failed.emit(future.exception())
+        else:
+            self.finished.emit(future.result())
+
+
+class AsyncLoop(QObject):
+
+    def __init__(self, parent=None):
+        """ Runs an asyncio event loop in a dedicated thread next to the Qt event loop.
+
+        The thread is started by the first coroutine scheduled. """
+        super().__init__(parent=parent)
+
+        self._loop = asyncio.new_event_loop()
+        self._owners = {}
+
+        self._thread = None
+        self._stopped = False
+
+
+    def isStarted(self):
+        """  """
+        return self._thread is not None
+
+
+    def run(self, function, *args, owner=None):
+        """ Schedules the coroutine function(emitChunk, *args) and returns its task.
+
+        Chunks passed to emitChunk arrive through chunkReady between UI events.
+        Tasks of an owner are cancelled when the owner is destroyed.
+        Raises RuntimeError once the loop is stopped. """
+        if self._stopped:
+            raise RuntimeError("AsyncLoop is stopped")
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="AsyncLoop", daemon=True)
+            self._thread.start()
+
+        task = AsyncTask(self)
+        task.finished.connect(self._taskFinished)
+        task.failed.connect(self._taskFinished)
+        task.cancelled.connect(self._taskFinished)
+
+        task._future = asyncio.run_coroutine_threadsafe(function(task._emitChunk, *args), self._loop)
+        task._future.add_done_callback(task._done)
+
+        if owner is not None:
+            key = id(owner)
+            if key not in self._owners:
+                self._owners[key] = []
+                owner.destroyed.connect(lambda obj=None, key=key: self._cancelOwner(key))
+            self._owners[key].append(task)
+
+        return task
+
+
+    def stop(self):
+        """ Cancels all pending coroutines, waits until they have unwound and stops the loop for good. """
+        if self._stopped:
+            return None
+
+        self._stopped = True
+        if self._thread is None:
+            self._loop.close()
+            return None
+
+        async def cancelAll():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+
+            # The cancelled coroutines run their finally blocks and their futures resolve
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._loop.shutdown_asyncgens()
+            self._loop.stop()
+
+        asyncio.run_coroutine_threadsafe(cancelAll(), self._loop)
+        self._thread.join()
+
+
+    @staticmethod
+    async def readChunks(path, chunkSize=1048576):
+        """ Yields the content of the given file in chunks; blocking reads run in the default executor. """
+        loop = asyncio.get_running_loop()
+
+        file = await loop.run_in_executor(None, open, path, "rb")
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, file.read, chunkSize)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            file.close()
+
+
+    def _run(self):
+        """ Thread function. """
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+        self._loop.close()
+
+
+    def _cancelOwner(self, key):
+        """  """
+        for task in self._owners.pop(key, []):
+            task.cancel()
+
+
+    def _taskFinished(self, result=None):
+        """  """
+        task = self.sender()
+
+        for tasks in self._owners.values():
+            if task in tasks:
+                tasks.remove(task)
+
+        task.deleteLater()
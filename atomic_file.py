@@ -0,0 +1,54 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import os
+import shutil
+import tempfile
+
+
+class AtomicFile:
+
+    @staticmethod
+    def write(path, writer, encoding="utf-8"):
+        """ Calls writer(file) on a temporary file next to path and renames it over path once it is synced.
+
+        Readers see either the old or the new content, never a partially written file. """
+        directory, name = os.path.split(os.path.abspath(path))
+
+        descriptor, temporary = tempfile.mkstemp(prefix=".{0}.".format(name), suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(descriptor, "w", newline="", encoding=encoding) as file:
+                writer(file)
+                file.flush()
+                os.fsync(file.fileno())
+
+            if os.path.exists(path):
+                shutil.copymode(path, temporary)
+
+            os.replace(temporary, path)
+        except BaseException:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,167 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import csv
+import os
+import sys
+
+from PySide2.QtCore import QCoreApplication
+
+from atomic_file import AtomicFile
+from tracer import Tracer
+
+
+class BatchProcessor:
+
+    commands = ("convert", "stats", "validate")
+
+
+    def __init__(self, out=None, err=None):
+        """ Prints to out and err, by default the standard output and error streams at the time of printing. """
+        self._out = out
+        self._err = err
+
+
+    def run(self, command, arguments):
+        """ Runs the given batch command and returns the process exit code. """
+        if command == "convert":
+            return self._convert(arguments)
+        elif command == "stats":
+            return self._stats(arguments)
+        elif command == "validate":
+            return self._validate(arguments)
+
+        self._error(self.tr("Unknown command: {0}").format(command))
+        return 2
+
+
+    def tr(self, text):
+        """  """
+        return QCoreApplication.translate("BatchProcessor", text)
+
+
+    def _print(self, text):
+        """  """
+        print(text, file=self._out if self._out is not None else sys.stdout)
+
+
+    def _error(self, text):
+        """  """
+        print(text, file=self._err if self._err is not None else sys.stderr)
+
+
+    #
+    # Files
+    #
+
+    def _delimiter(self, path):
+        """ Returns the field delimiter for the given file based on its extension. """
+        return "\t" if os.path.splitext(path)[1].lower() in (".tsv", ".tab") else ","
+
+
+    def _rows(self, path):
+        """ Yields the rows of the given file one by one. """
+        with open(path, newline="", encoding="utf-8") as file:
+            yield from csv.reader(file, delimiter=self._delimiter(path))
+
+
+    #
+    # Commands
+    #
+
+    def _convert(self, arguments):
+        """ Converts a document into another delimited format: convert <input> <output> """
+        if len(arguments) != 2:
+            self._error(self.tr("Usage: convert <input> <output>"))
+            return 2
+
+        source, target = arguments
+        try:
+            if os.path.exists(target) and os.path.samefile(source, target):
+                self._error(self.tr("{0}: Input and output are the same file").format(source))
+                return 2
+
+            # The source is opened before the target is touched; the target is replaced only
+            # once the whole source was read and written
+            with Tracer.span("Convert", source=source, target=target), open(source, newline="", encoding="utf-8") as file:
+                rows = csv.reader(file, delimiter=self._delimiter(source))
+                AtomicFile.write(target, lambda output: csv.writer(output, delimiter=self._delimiter(target)).writerows(rows))
+        except (OSError, UnicodeDecodeError, csv.Error) as error:
+            self._error(self.tr("{0}: {1}").format(source, error))
+            return 1
+
+        return 0
+
+
+    def _stats(self, arguments):
+        """ Prints the number of rows, columns and empty cells of each document: stats <files...> """
+        if not arguments:
+            self._error(self.tr("Usage: stats <files...>"))
+            return 2
+
+        result = 0
+        for path in arguments:
+            rows = columns = cells = empty = 0
+            try:
+                for row in self._rows(path):
+                    rows += 1
+                    columns = max(columns, len(row))
+                    cells += len(row)
+                    empty += row.count("")
+            except (OSError, UnicodeDecodeError, csv.Error) as error:
+                self._error(self.tr("{0}: {1}").format(path, error))
+                result = 1
+                continue
+
+            self._print(self.tr("{0}: {1} rows, {2} columns, {3} cells, {4} empty").format(path, rows, columns, cells, empty))
+
+        return result
+
+
+    def _validate(self, arguments):
+        """ Checks that every row of each document has the same number of columns: validate <files...> """
+        if not arguments:
+            self._error(self.tr("Usage: validate <files...>"))
+            return 2
+
+        result = 0
+        for path in arguments:
+            columns = None
+            valid = True
+            try:
+                for line, row in enumerate(self._rows(path), start=1):
+                    if columns is None:
+                        columns = len(row)
+                    elif len(row) != columns:
+                        self._error(self.tr("{0}:{1}: expected {2} columns, found {3}").format(path, line, columns, len(row)))
+                        valid = False
+            except (OSError, UnicodeDecodeError, csv.Error) as error:
+                self._error(self.tr("{0}: {1}").format(path, error))
+                valid = False
+
+            if valid:
+                self._print(self.tr("{0}: valid").format(path))
+            else:
+                result = 1
+
+        return result
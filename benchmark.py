@@ -0,0 +1,336 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide2.QtCore import QCommandLineOption, QCommandLineParser, QCoreApplication, QEvent, QSettings, QUrl
+from PySide2.QtWidgets import QApplication
+
+from application_window import ApplicationWindow
+from batch_processor import BatchProcessor
+from dataset_generator import DatasetGenerator
+from document_widget import DocumentWidget
+from sheet_model import SheetModel
+from table_document import TableDocument
+from task_scheduler import CancellationToken
+
+
+# Run in a new interpreter by the startup benchmark: imports, application and first show of the window
+_startupScript = """
+import os, sys
+from PySide2.QtCore import QSettings
+from PySide2.QtWidgets import QApplication
+from application_window import ApplicationWindow
+app = QApplication(sys.argv[:1])
+app.setOrganizationName("Beleta Labs")
+app.setApplicationName("PyTabelo Benchmark")
+QSettings.setDefaultFormat(QSettings.IniFormat)
+QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, sys.argv[1])
+window = ApplicationWindow()
+window.show()
+app.processEvents()
+os._exit(0)
+"""
+
+
+# Run in a new interpreter by the I/O benchmarks: reads a file and prints the peak resident set size in KiB
+_peakResidentScript = """
+import resource, sys
+from batch_processor import BatchProcessor
+operation, source = sys.argv[1:]
+rows = BatchProcessor()._rows(source)
+if operation == "eager":
+    rows = list(rows)
+else:
+    sum(1 for _ in rows)
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(peak // 1024 if sys.platform == "darwin" else peak)
+"""
+
+
+class Benchmark:
+
+    def __init__(self, repeat=5, settingsPath=""):
+        """  """
+        self._repeat = repeat
+        self._settingsPath = settingsPath
+        self._results = {}
+
+
+    def results(self):
+        """  """
+        return self._results
+
+
+    def _flush(self):
+        """ Processes pending events, including deferred deletions. """
+        QApplication.processEvents()
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+    def _measure(self, name, setup, function, teardown=None):
+        """ Runs the function several times and records the timings in milliseconds. """
+        runs = []
+        for _ in range(self._repeat):
+            state = setup() if setup is not None else None
+
+            start = time.perf_counter()
+            function(state)
+            runs.append((time.perf_counter() - start) * 1000)
+
+            if teardown is not None:
+                teardown(state)
+            self._flush()
+
+        self._results[name] = {
+            "min": min(runs),
+            "median": statistics.median(runs),
+            "runs": runs,
+        }
+        print("{0:40} {1:10.2f} ms (median {2:.2f} ms)".format(name, min(runs), statistics.median(runs)), file=sys.stderr)
+
+
+    #
+    # Helpers
+    #
+
+    def _newWindow(self):
+        """  """
+        window = ApplicationWindow()
+        window.show()
+        self._flush()
+        return window
+
+
+    def _closeWindow(self, window):
+        """ Closes the window and stops its threads, which would otherwise skew the following runs. """
+        window._documentsArea.closeAllSubWindows()
+        self._flush()
+        window.taskScheduler().shutdown()
+        window.asyncLoop().stop()
+        window.deleteLater()
+
+
+    def _startProcess(self):
+        """ Starts the application in a new interpreter, up to the first show of the window. """
+        subprocess.run([sys.executable, "-c", _startupScript, self._settingsPath],
+                       cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+
+    def _closeAllDocuments(self, window):
+        """  """
+        window._documentsArea.closeAllSubWindows()
+        self._flush()
+
+
+    def _openDocuments(self, window, count):
+        """  """
+        for i in range(count):
+            window.openDocument(QUrl.fromLocalFile("/tmp/pytabelo-benchmark/document-{0}.csv".format(i)))
+
+
+    #
+    # Benchmarks
+    #
+
+    def run(self):
+        """  """
+        self._measure("startup_process",
+                      None,
+                      lambda state: self._startProcess())
+
+        self._measure("window_construction",
+                      None,
+                      lambda state: self._closeWindow(self._newWindow()))
+
+        self._measure("create_document",
+                      self._newWindow,
+                      lambda window: window._createDocument(),
+                      self._closeWindow)
+
+        for count in (1, 10, 100, 1000):
+            self._measure("open_documents_{0}".format(count),
+                          self._newWindow,
+                          lambda window, count=count: self._openDocuments(window, count),
+                          self._closeWindow)
+
+        for count in (10, 100, 1000):
+
+            def setup(count=count):
+                window = self._newWindow()
+                self._openDocuments(window, count)
+                return window
+
+            self._measure("close_all_documents_{0}".format(count),
+                          setup,
+                          self._closeAllDocuments,
+                          self._closeWindow)
+
+        for count in (100, 1000, 10000):
+            self._measure("add_sheets_{0}".format(count),
+                          TableDocument,
+                          lambda document, count=count: document.slotAddTab(count),
+                          lambda document: document.deleteLater())
+
+
+    def _peakResidentSize(self, operation, source):
+        """ Runs the read operation in a new interpreter and returns its peak resident set size in KiB, or None.
+
+        The peak includes the interpreter and the imports; it is compared between formats and modes. """
+        try:
+            output = subprocess.run([sys.executable, "-c", _peakResidentScript, operation, source],
+                                    cwd=os.path.dirname(os.path.abspath(__file__)), check=True, capture_output=True, text=True).stdout
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+        return int(output) if output.strip() else None
+
+
+    def runIo(self, directory, rows, columns):
+        """ Times reading, scrolling and writing generated datasets for each delimited format. """
+        processor = BatchProcessor()
+        generator = DatasetGenerator(rows, columns, nullRatio=0.05, quoteRatio=0.1)
+
+        for extension in ("csv", "tsv"):
+            source = os.path.join(directory, "dataset.{0}".format(extension))
+            target = os.path.join(directory, "dataset-saved.{0}".format(extension))
+            generator.write(source)
+
+            self._measure("io_open_streamed_{0}".format(extension),
+                          None,
+                          lambda state, source=source: sum(1 for _ in processor._rows(source)))
+            self._results["io_open_streamed_{0}".format(extension)]["peak_rss_kib"] = self._peakResidentSize("streamed", source)
+
+            self._measure("io_open_eager_{0}".format(extension),
+                          None,
+                          lambda state, source=source: list(processor._rows(source)))
+            self._results["io_open_eager_{0}".format(extension)]["peak_rss_kib"] = self._peakResidentSize("eager", source)
+
+            # Cells of 1000 screens of 50 rows spread over the sheet, as painted
+            def scroll(model):
+                step = max(1, model.rowCount() // 1000)
+                for top in range(0, model.rowCount(), step):
+                    for row in range(top, min(top + 50, model.rowCount())):
+                        for column in range(model.columnCount()):
+                            model.data(model.index(row, column))
+
+            self._measure("io_scroll_{0}".format(extension),
+                          lambda source=source: SheetModel(list(processor._rows(source))),
+                          scroll,
+                          lambda model: model.deleteLater())
+
+            # The rows are read beforehand, only the write is timed
+            self._measure("io_save_{0}".format(extension),
+                          lambda source=source: list(processor._rows(source)),
+                          lambda data, target=target: DocumentWidget.writeSnapshot(CancellationToken(), lambda value: None, target, data))
+
+
+def compare(results, baseline, threshold):
+    """ Returns the benchmarks whose minimum time grew by more than the threshold ratio. """
+    regressions = []
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None or reference["min"] <= 0:
+            continue
+
+        ratio = result["min"] / reference["min"]
+        if ratio > 1 + threshold:
+            regressions.append((name, reference["min"], result["min"], ratio))
+
+    return regressions
+
+
+if __name__ == "__main__":
+
+    app = QApplication(sys.argv)
+    app.setOrganizationName("Beleta Labs")
+    app.setApplicationName("PyTabelo Benchmark")
+
+    # Keep the benchmark away from the user's settings
+    settingsPath = tempfile.mkdtemp(prefix="pytabelo-benchmark-")
+    QSettings.setDefaultFormat(QSettings.IniFormat)
+    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, settingsPath)
+
+    # Command line
+    parser = QCommandLineParser()
+    parser.setApplicationDescription("Performance benchmarks for PyTabelo, run on the offscreen platform")
+    parser.addHelpOption()
+    outputOption = QCommandLineOption("output", "Write the results as JSON to <file>.", "file")
+    parser.addOption(outputOption)
+    compareOption = QCommandLineOption("compare", "Compare the results against the baseline JSON <file>.", "file")
+    parser.addOption(compareOption)
+    thresholdOption = QCommandLineOption("threshold", "Allowed slowdown ratio before flagging a regression (default: 0.10).", "ratio", "0.10")
+    parser.addOption(thresholdOption)
+    repeatOption = QCommandLineOption("repeat", "Number of runs per benchmark (default: 5).", "count", "5")
+    parser.addOption(repeatOption)
+    ioOption = QCommandLineOption("io", "Also run the file I/O benchmarks on generated datasets.")
+    parser.addOption(ioOption)
+    ioRowsOption = QCommandLineOption("io-rows", "Number of rows of the I/O datasets (default: 100000).", "count", "100000")
+    parser.addOption(ioRowsOption)
+    ioColumnsOption = QCommandLineOption("io-columns", "Number of columns of the I/O datasets (default: 20).", "count", "20")
+    parser.addOption(ioColumnsOption)
+    parser.process(app)
+
+    benchmark = Benchmark(int(parser.value(repeatOption)), settingsPath)
+    try:
+        benchmark.run()
+
+        if parser.isSet(ioOption):
+            with tempfile.TemporaryDirectory(prefix="pytabelo-benchmark-io-") as directory:
+                benchmark.runIo(directory, int(parser.value(ioRowsOption)), int(parser.value(ioColumnsOption)))
+    finally:
+        shutil.rmtree(settingsPath, ignore_errors=True)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "benchmarks": benchmark.results(),
+    }
+
+    if parser.isSet(outputOption):
+        with open(parser.value(outputOption), "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if parser.isSet(compareOption):
+        with open(parser.value(compareOption), encoding="utf-8") as file:
+            baseline = json.load(file)["benchmarks"]
+
+        regressions = compare(benchmark.results(), baseline, float(parser.value(thresholdOption)))
+        for name, before, after, ratio in regressions:
+            print("REGRESSION {0}: {1:.2f} ms -> {2:.2f} ms ({3:+.0%})".format(name, before, after, ratio - 1), file=sys.stderr)
+
+        sys.exit(1 if regressions else 0)
+
+    sys.exit(0)
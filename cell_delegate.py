@@ -0,0 +1,155 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import collections
+
+from PySide2.QtCore import QPointF, Qt
+from PySide2.QtGui import QFontMetrics, QPalette, QStaticText, QTransform
+from PySide2.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+
+class CellDelegate(QStyledItemDelegate):
+
+    _cacheSize = 20000
+
+    # Shared by all sheets
+    _fontMetrics = {}
+    _staticTexts = collections.OrderedDict()
+    _displayTexts = collections.OrderedDict()
+    _hits = 0
+    _misses = 0
+
+
+    def __init__(self, parent=None):
+        """  """
+        super().__init__(parent=parent)
+
+
+    @staticmethod
+    def _cached(cache, key, create):
+        """ Returns the cached value for key, creating it on a miss and evicting the least recently used entry. """
+        value = cache.get(key)
+        if value is not None:
+            CellDelegate._hits += 1
+            cache.move_to_end(key)
+            return value
+
+        CellDelegate._misses += 1
+        value = create()
+        cache[key] = value
+        if len(cache) > CellDelegate._cacheSize:
+            cache.popitem(last=False)
+
+        return value
+
+
+    @staticmethod
+    def statistics():
+        """ Returns the number of hits and misses of the text caches and the number of cached texts. """
+        return CellDelegate._hits, CellDelegate._misses, len(CellDelegate._staticTexts) + len(CellDelegate._displayTexts)
+
+
+    @staticmethod
+    def fontMetrics(font):
+        """ Returns shared font metrics for the given font. """
+        key = font.key()
+
+        metrics = CellDelegate._fontMetrics.get(key)
+        if metrics is None:
+            metrics = QFontMetrics(font)
+            CellDelegate._fontMetrics[key] = metrics
+
+        return metrics
+
+
+    def displayText(self, value, locale):
+        """ Returns the formatted value; number formatting is done once per value and locale. """
+        if isinstance(value, str):
+            return value
+
+        return self._cached(CellDelegate._displayTexts, (type(value), value, locale.name()), lambda: super(CellDelegate, self).displayText(value, locale))
+
+
+    def _staticText(self, text, font, width):
+        """ Returns a prepared static text of the text elided to the given width. """
+        def create():
+            metrics = self.fontMetrics(font)
+            staticText = QStaticText(metrics.elidedText(text, Qt.ElideRight, width))
+            staticText.setTextFormat(Qt.PlainText)
+            staticText.prepare(QTransform(), font)
+            return staticText
+
+        return self._cached(CellDelegate._staticTexts, (text, font.key(), width), create)
+
+
+    def paint(self, painter, option, index):
+        """ Paints the cell with cached text layout instead of laying out the text again. """
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+
+        text = opt.text
+        opt.text = ""
+
+        widget = opt.widget
+        style = widget.style() if widget is not None else QApplication.style()
+
+        # Background, selection and focus
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, widget)
+
+        if not text:
+            return None
+
+        margin = style.pixelMetric(QStyle.PM_FocusFrameHMargin, None, widget) + 1
+        rect = style.subElementRect(QStyle.SE_ItemViewItemText, opt, widget).adjusted(margin, 0, -margin, 0)
+        if rect.width() <= 0:
+            return None
+
+        staticText = self._staticText(text.replace("\n", " "), opt.font, rect.width())
+        size = staticText.size()
+
+        # Leading and trailing resolve to left and right by the layout direction
+        alignment = QStyle.visualAlignment(opt.direction, opt.displayAlignment)
+
+        if alignment & Qt.AlignRight:
+            x = rect.right() - size.width() + 1
+        elif alignment & Qt.AlignHCenter:
+            x = rect.left() + (rect.width() - size.width()) // 2
+        else:
+            x = rect.left()
+
+        if alignment & Qt.AlignTop:
+            y = rect.top()
+        elif alignment & Qt.AlignBottom:
+            y = rect.bottom() - size.height() + 1
+        else:
+            y = rect.top() + (rect.height() - size.height()) / 2
+
+        group = QPalette.Normal if opt.state & QStyle.State_Enabled else QPalette.Disabled
+        role = QPalette.HighlightedText if opt.state & QStyle.State_Selected else QPalette.Text
+
+        painter.save()
+        painter.setClipRect(rect)
+        painter.setFont(opt.font)
+        painter.setPen(opt.palette.color(group, role))
+        painter.drawStaticText(QPointF(x, y), staticText)
+        painter.restore()
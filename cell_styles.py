@@ -0,0 +1,260 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import bisect
+import sys
+
+
+# End of unbounded runs
+_END = sys.maxsize
+
+
+class CellStyles:
+
+    def __init__(self):
+        """ Cell styles of a sheet, kept as interned style IDs in run-length encoded columns.
+
+        Each column holds sorted, disjoint runs of rows (first, last, styleId). Applying a style
+        to a range replaces the parts of the runs it covers, combining their attributes with the
+        new ones, so a whole column costs one run whatever its length, and lookups are a bisection.
+        Ranges without a right end also go to template columns, which columns styled later start from. """
+
+        # Style ID 0 is the empty style
+        self._styles = [()]
+        self._styleIds = {(): 0}
+        self._combinedIds = {}
+
+        # Runs per column as (firsts, lasts, styleIds)
+        self._columns = {}
+
+        # Runs of the columns without runs of their own, by first column
+        self._templateColumns = [0]
+        self._templates = [self._emptyRuns()]
+
+
+    #
+    # Interning
+    #
+
+    def intern(self, style):
+        """ Returns the ID of the style given as a dict of attributes. """
+        key = tuple(sorted(style.items()))
+
+        styleId = self._styleIds.get(key)
+        if styleId is None:
+            styleId = len(self._styles)
+            self._styles.append(key)
+            self._styleIds[key] = styleId
+
+        return styleId
+
+
+    def style(self, styleId):
+        """ Returns the attributes of the style ID as a dict. """
+        return dict(self._styles[styleId])
+
+
+    def styleCount(self):
+        """  """
+        return len(self._styles)
+
+
+    def combine(self, ids):
+        """ Returns the ID of the style combining the styles in order; later attributes win. """
+        ids = [styleId for styleId in ids if styleId]
+        if not ids:
+            return 0
+        if len(ids) == 1:
+            return ids[0]
+
+        key = tuple(ids)
+        combinedId = self._combinedIds.get(key)
+        if combinedId is None:
+            combined = {}
+            for styleId in ids:
+                combined.update(self._styles[styleId])
+            combinedId = self.intern(combined)
+            self._combinedIds[key] = combinedId
+
+        return combinedId
+
+
+    #
+    # Runs
+    #
+
+    @staticmethod
+    def _emptyRuns():
+        """  """
+        return ([], [], [])
+
+
+    @staticmethod
+    def _copyRuns(runs):
+        """  """
+        return tuple(list(values) for values in runs)
+
+
+    def _assign(self, runs, first, last, styleId):
+        """ Applies the style to the rows first to last of the runs of one column. O(log n + k) """
+        firsts, lasts, ids = runs
+
+        # Runs i to j - 1 overlap the rows
+        i = bisect.bisect_left(lasts, first)
+        j = bisect.bisect_right(firsts, last)
+
+        pieces = []
+        if i < j and firsts[i] < first:
+            pieces.append((firsts[i], first - 1, ids[i]))
+
+        position = first
+        for k in range(i, j):
+            start = max(firsts[k], first)
+            end = min(lasts[k], last)
+            if position < start:
+                pieces.append((position, start - 1, styleId))
+            pieces.append((start, end, self.combine([ids[k], styleId])))
+            position = end + 1
+        if position <= last:
+            pieces.append((position, last, styleId))
+
+        if i < j and lasts[j - 1] > last:
+            pieces.append((last + 1, lasts[j - 1], ids[j - 1]))
+
+        # Neighbouring runs of the same style are coalesced
+        if i > 0 and lasts[i - 1] + 1 == pieces[0][0] and ids[i - 1] == pieces[0][2]:
+            i -= 1
+            pieces[0] = (firsts[i], pieces[0][1], pieces[0][2])
+        if j < len(firsts) and pieces[-1][1] + 1 == firsts[j] and ids[j] == pieces[-1][2]:
+            pieces[-1] = (pieces[-1][0], lasts[j], pieces[-1][2])
+            j += 1
+
+        coalesced = []
+        for piece in pieces:
+            if coalesced and coalesced[-1][2] == piece[2] and coalesced[-1][1] + 1 == piece[0]:
+                coalesced[-1] = (coalesced[-1][0], piece[1], piece[2])
+            else:
+                coalesced.append(piece)
+
+        # Unstyled rows need no run
+        coalesced = [piece for piece in coalesced if piece[2]]
+
+        firsts[i:j] = [piece[0] for piece in coalesced]
+        lasts[i:j] = [piece[1] for piece in coalesced]
+        ids[i:j] = [piece[2] for piece in coalesced]
+
+
+    def _template(self, column):
+        """ Returns the runs that a column without runs of its own uses. """
+        return self._templates[bisect.bisect_right(self._templateColumns, column) - 1]
+
+
+    def _columnRuns(self, column):
+        """  """
+        runs = self._columns.get(column)
+        return runs if runs is not None else self._template(column)
+
+
+    #
+    # Changes
+    #
+
+    def apply(self, top, left, bottom, right, style):
+        """ Applies the style to the cells from top, left to bottom, right (inclusive); None is unbounded. """
+        styleId = style if isinstance(style, int) else self.intern(style)
+        bottom = _END if bottom is None else bottom
+
+        if right is None:
+            # Templates from the left column on
+            i = bisect.bisect_left(self._templateColumns, left)
+            if i == len(self._templateColumns) or self._templateColumns[i] != left:
+                self._templateColumns.insert(i, left)
+                self._templates.insert(i, self._copyRuns(self._templates[i - 1]))
+            for runs in self._templates[i:]:
+                self._assign(runs, top, bottom, styleId)
+
+            columns = [column for column in self._columns if column >= left]
+        else:
+            columns = range(left, right + 1)
+
+        for column in columns:
+            runs = self._columns.get(column)
+            if runs is None:
+                runs = self._copyRuns(self._template(column))
+                self._columns[column] = runs
+            self._assign(runs, top, bottom, styleId)
+
+        return styleId
+
+
+    def clear(self):
+        """  """
+        self._columns.clear()
+        self._templateColumns = [0]
+        self._templates = [self._emptyRuns()]
+
+
+    def runCount(self):
+        """ Returns the number of runs stored, templates included. """
+        return sum(len(runs[0]) for runs in self._columns.values()) + sum(len(runs[0]) for runs in self._templates)
+
+
+    #
+    # Lookup
+    #
+
+    def styleIdAt(self, row, column):
+        """ Returns the style ID of the cell. O(log n) """
+        firsts, lasts, ids = self._columnRuns(column)
+
+        i = bisect.bisect_right(firsts, row) - 1
+        return ids[i] if i >= 0 and row <= lasts[i] else 0
+
+
+    def styleAt(self, row, column):
+        """ Returns the attributes of the cell as a dict. """
+        return self.style(self.styleIdAt(row, column))
+
+
+    def columnRuns(self, column, top, bottom):
+        """ Returns the runs (first, last, styleId) of the column intersecting the rows top to bottom, clipped. """
+        firsts, lasts, ids = self._columnRuns(column)
+
+        runs = []
+        i = bisect.bisect_left(lasts, top)
+        while i < len(firsts) and firsts[i] <= bottom:
+            runs.append((max(firsts[i], top), min(lasts[i], bottom), ids[i]))
+            i += 1
+
+        return runs
+
+
+    def viewport(self, top, left, bottom, right):
+        """ Returns the style IDs of the visible cells as a list of rows, resolved run by run. """
+        result = [[0] * (right - left + 1) for _ in range(top, bottom + 1)]
+        for column in range(left, right + 1):
+            for first, last, styleId in self.columnRuns(column, top, bottom):
+                for row in range(first, last + 1):
+                    result[row - top][column - left] = styleId
+
+        return result
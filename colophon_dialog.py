@@ -24,7 +24,7 @@
 from PySide2.QtCore import Qt
 from PySide2.QtWidgets import QDialog, QDialogButtonBox, QTabWidget, QVBoxLayout
 
-from colophon_pages import ColophonPageAbout, ColophonPageAuthors, ColophonPageCredits, ColophonPageEnvironment, ColophonPageLicense
+from colophon_pages import ColophonPageAbout, ColophonPageAuthors, ColophonPageCredits, ColophonPageDiagnostics, ColophonPageEnvironment, ColophonPageLicense
 from dialog_header_box import DialogHeaderBox
 
 
@@ -46,6 +46,7 @@ class ColophonDialog(QDialog):
 
         pageAbout = ColophonPageAbout()
         pageEnvironment = ColophonPageEnvironment()
+        pageDiagnostics = ColophonPageDiagnostics()
         pageAuthors = ColophonPageAuthors()
         pageCredits = ColophonPageCredits()
         pageLicense = ColophonPageLicense()
@@ -53,6 +54,7 @@ class ColophonDialog(QDialog):
         tabBox = QTabWidget()
         tabBox.addTab(pageAbout, pageAbout.title())
         tabBox.addTab(pageEnvironment, pageEnvironment.title())
+        tabBox.addTab(pageDiagnostics, pageDiagnostics.title())
         tabBox.addTab(pageAuthors, pageAuthors.title())
         tabBox.addTab(pageCredits, pageCredits.title())
         tabBox.addTab(pageLicense, pageLicense.title())
@@ -22,10 +22,18 @@
 #
 
 import sys
+import time
+import tracemalloc
 import PySide2.QtCore
 
-from PySide2.QtCore import QSysInfo
-from PySide2.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget
+from PySide2.QtCore import QSysInfo, QTimer
+from PySide2.QtWidgets import QApplication, QLabel, QPushButton, QVBoxLayout, QWidget
+
+from cell_delegate import CellDelegate
+from document_widget import DocumentWidget
+from icon_cache import IconCache
+from stall_detector import StallDetector
+from task_scheduler import TaskScheduler
 
 
 #
@@ -215,6 +223,229 @@ class ColophonPageEnvironment(QWidget):
         return self.tr("Environment")
 
 
+#
+#
+# Colophon page: Diagnostics
+#
+
+class ColophonPageDiagnostics(QWidget):
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+
+        self._memory = QLabel()
+        self._memory.setWordWrap(True)
+
+        self._allocators = QLabel()
+        self._allocators.setWordWrap(True)
+
+        self._buttonTracing = QPushButton()
+        self._buttonTracing.clicked.connect(self._slotTracing)
+
+        # Snapshots are taken on demand; they walk the whole heap and all sheets
+        self._buttonSnapshot = QPushButton(self.tr("Take Memory Snapshot"))
+        self._buttonSnapshot.clicked.connect(self._slotSnapshot)
+
+        self._sheets = QLabel()
+        self._sheets.setWordWrap(True)
+
+        self._documents = QLabel()
+        self._documents.setWordWrap(True)
+
+        self._caches = QLabel()
+        self._caches.setWordWrap(True)
+
+        self._tasks = QLabel()
+        self._tasks.setWordWrap(True)
+
+        self._stalls = QLabel()
+        self._stalls.setWordWrap(True)
+
+        # Refresh while the page is visible
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self._update)
+
+        # Main layout
+        mainLayout = QVBoxLayout()
+        mainLayout.addWidget(self._memory)
+        mainLayout.addWidget(self._allocators)
+        mainLayout.addWidget(self._buttonTracing)
+        mainLayout.addWidget(self._buttonSnapshot)
+        mainLayout.addWidget(self._sheets)
+        mainLayout.addWidget(self._documents)
+        mainLayout.addWidget(self._caches)
+        mainLayout.addWidget(self._tasks)
+        mainLayout.addWidget(self._stalls)
+        mainLayout.addStretch()
+        self.setLayout(mainLayout)
+
+        self._setSnapshotText(self.tr("No snapshot taken"), self.tr("No snapshot taken"))
+        self._update()
+
+
+    def title(self):
+
+        return self.tr("Diagnostics")
+
+
+    def showEvent(self, event):
+
+        self._update()
+        self._timer.start()
+        super().showEvent(event)
+
+
+    def hideEvent(self, event):
+
+        self._timer.stop()
+        super().hideEvent(event)
+
+
+    def _processMemory(self):
+        """ Returns the current resident set size as text, else the peak one, or None if neither can be determined. """
+        try:
+            with open("/proc/self/status") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        return self.tr("{0:,} KiB resident").format(int(line.split()[1]))
+        except OSError:
+            pass
+
+        try:
+            import resource
+            # In KiB on Linux, in bytes on macOS
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return self.tr("{0:,} KiB peak resident").format(rss // 1024 if sys.platform == "darwin" else rss)
+        except ImportError:
+            return None
+
+
+    def _openDocuments(self):
+        """  """
+        return [widget for widget in QApplication.allWidgets() if isinstance(widget, DocumentWidget)]
+
+
+    def _update(self):
+
+        # Memory
+        memory = self._processMemory() or self.tr("Unavailable")
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            memory += self.tr("; {0:,} KiB traced, {1:,} KiB traced peak").format(current // 1024, peak // 1024)
+            self._buttonTracing.setText(self.tr("Stop Tracing Allocations"))
+        else:
+            self._buttonTracing.setText(self.tr("Start Tracing Allocations"))
+
+        self._memory.setText(self.tr(
+            "<dl>"
+                "<dt><strong>Process memory</strong></dt>"
+                "<dd>{0}</dd>"
+            "</dl>"
+        ).format(memory))
+
+        # Documents
+        documents = self._openDocuments()
+        items = "".join("<li>{0}: {1}</li>".format(
+            document.getUrl().fileName() or self.tr("Untitled"),
+            self.tr("{0} sheets").format(document.sheetCount()) if document.isLoaded() else self.tr("not loaded yet")
+        ) for document in documents)
+
+        self._documents.setText(self.tr(
+            "<dl>"
+                "<dt><strong>Open documents</strong></dt>"
+                "<dd><ul>{0}</ul></dd>"
+            "</dl>"
+        ).format(items or "<li>{0}</li>".format(self.tr("None"))))
+
+        # Caches
+        formats = [model.conditionalFormats().statistics() for document in documents for _, model in document.loadedSheetModels()]
+        caches = [
+            (self.tr("Icons"), IconCache.statistics()),
+            (self.tr("Cell texts"), CellDelegate.statistics()),
+            (self.tr("Conditional formats"), tuple(sum(values) for values in zip((0, 0, 0), *formats))),
+        ]
+        items = "".join(self.tr("<li>{0}: {1} cached, {2} hits, {3} misses ({4:.0%} hit rate)</li>").format(
+            name, size, hits, misses, hits / (hits + misses) if hits + misses else 0.0
+        ) for name, (hits, misses, size) in caches)
+
+        self._caches.setText(self.tr(
+            "<dl>"
+                "<dt><strong>Caches</strong></dt>"
+                "<dd><ul>{0}</ul></dd>"
+            "</dl>"
+        ).format(items))
+
+        # Task scheduler
+        schedulers = [scheduler for widget in QApplication.topLevelWidgets() for scheduler in widget.findChildren(TaskScheduler)]
+        self._tasks.setText(self.tr(
+            "<dl>"
+                "<dt><strong>Background tasks</strong></dt>"
+                "<dd>{0} active, {1} waiting for a worker</dd>"
+            "</dl>"
+        ).format(sum(scheduler.activeTasks() for scheduler in schedulers), sum(scheduler.queueDepth() for scheduler in schedulers)))
+
+        # Slow UI events
+        stalls = StallDetector.recentStalls()[-5:]
+        items = "".join("<li>{0}: {1:.0f} ms</li>".format(time.strftime("%H:%M:%S", time.localtime(timestamp)), duration) for timestamp, duration, _ in reversed(stalls))
+        self._stalls.setText(self.tr(
+            "<dl>"
+                "<dt><strong>Slow UI events</strong></dt>"
+                "<dd><ul>{0}</ul></dd>"
+            "</dl>"
+        ).format(items or "<li>{0}</li>".format(self.tr("None recorded; start with --detect-stalls to record them"))))
+
+
+    def _setSnapshotText(self, allocators, sheets):
+        """  """
+        self._allocators.setText(self.tr(
+            "<dl>"
+                "<dt><strong>Top allocators</strong></dt>"
+                "<dd><ul>{0}</ul></dd>"
+            "</dl>"
+        ).format(allocators))
+
+        self._sheets.setText(self.tr(
+            "<dl>"
+                "<dt><strong>Sheet memory</strong></dt>"
+                "<dd><ul>{0}</ul></dd>"
+            "</dl>"
+        ).format(sheets))
+
+
+    def _slotSnapshot(self):
+
+        # Top allocators
+        if tracemalloc.is_tracing():
+            statistics = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            allocators = "".join("<li>{0:,} KiB in {1} blocks: {2}</li>".format(stat.size // 1024, stat.count, stat.traceback[0]) for stat in statistics)
+        else:
+            allocators = "<li>{0}</li>".format(self.tr("Allocation tracing is off"))
+
+        # Estimated size of each loaded sheet and of its largest columns
+        sheets = []
+        for document in self._openDocuments():
+            names = document.sheetNames()
+            for index, model in document.loadedSheetModels():
+                rowBytes, columnBytes = model.memoryUsage()
+                largest = sorted(range(len(columnBytes)), key=lambda column: columnBytes[column], reverse=True)[:5]
+                columns = ", ".join("{0} {1:,} KiB".format(model.columnName(column), columnBytes[column] // 1024) for column in largest)
+                sheets.append(self.tr("<li>{0} - {1}: {2:,} KiB ({3})</li>").format(
+                    document.getUrl().fileName() or self.tr("Untitled"), names[index], (rowBytes + sum(columnBytes)) // 1024, columns or self.tr("empty")))
+
+        self._setSnapshotText(allocators, "".join(sheets) or "<li>{0}</li>".format(self.tr("No sheets loaded")))
+
+
+    def _slotTracing(self):
+
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        else:
+            tracemalloc.start()
+
+        self._update()
+
+
 #
 #
 # Colophon page: License
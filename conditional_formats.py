@@ -0,0 +1,425 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import bisect
+import collections
+import heapq
+import math
+import operator
+
+
+def _number(value):
+    """ Returns the value as a finite number, or None if it is not numeric; NaN and infinities are not. """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+
+    return number if math.isfinite(number) else None
+
+
+class ThresholdRule:
+
+    _operators = {
+        "<": operator.lt,
+        "<=": operator.le,
+        ">": operator.gt,
+        ">=": operator.ge,
+        "=": operator.eq,
+        "!=": operator.ne,
+    }
+
+
+    def __init__(self, column, op, value, style):
+        """ Formats the numeric cells of the column compared with the value. """
+        self.column = column
+        self._operator = self._operators[op]
+        self._value = value
+        self._style = style
+
+
+    def cacheKey(self, formats):
+        """  """
+        return None
+
+
+    def evaluate(self, formats, chunk, values, numbers):
+        """  """
+        test = self._operator
+        value = self._value
+        style = self._style
+        return [style if number is not None and test(number, value) else None for number in numbers]
+
+
+class ColorScaleRule:
+
+    _steps = 64
+
+
+    def __init__(self, column, minimumColor, maximumColor):
+        """ Colors the background of the numeric cells of the column between two colors, from the minimum to the maximum. """
+        self.column = column
+        self._minimumColor = self._rgb(minimumColor)
+        self._maximumColor = self._rgb(maximumColor)
+
+
+    @staticmethod
+    def _rgb(color):
+        """  """
+        color = color.lstrip("#")
+        return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+    def cacheKey(self, formats):
+        """  """
+        return formats.columnRange(self.column)
+
+
+    def evaluate(self, formats, chunk, values, numbers):
+        """  """
+        columnRange = formats.columnRange(self.column)
+        if columnRange is None:
+            return [None] * len(numbers)
+
+        minimum, maximum = columnRange
+        span = maximum - minimum or 1.0
+
+        # Colors are quantized so that few distinct styles are interned
+        styles = []
+        for step in range(self._steps + 1):
+            ratio = step / self._steps
+            rgb = (round(low + (high - low) * ratio) for low, high in zip(self._minimumColor, self._maximumColor))
+            styles.append({"background": "#{:02x}{:02x}{:02x}".format(*rgb)})
+
+        steps = self._steps
+        return [styles[round((number - minimum) / span * steps)] if number is not None else None for number in numbers]
+
+
+class DuplicatesRule:
+
+    def __init__(self, column, style):
+        """ Formats the cells of the column whose value occurs more than once. """
+        self.column = column
+        self._style = style
+
+
+    def cacheKey(self, formats):
+        """  """
+        return formats.duplicatesVersion(self.column)
+
+
+    def evaluate(self, formats, chunk, values, numbers):
+        """  """
+        counts = formats.valueCounts(self.column)
+        style = self._style
+        return [style if value and counts[value] > 1 else None for value in values]
+
+
+class TopRule:
+
+    def __init__(self, column, style, count=None, percent=None, bottom=False):
+        """ Formats the count, or percent, largest (or smallest) numeric cells of the column. """
+        self.column = column
+        self._style = style
+        self._count = count
+        self._percent = percent
+        self._bottom = bottom
+
+
+    def _threshold(self, formats):
+        """ Returns the threshold value from the cached column quantiles. """
+        if self._percent is not None:
+            quantile = self._percent / 100 if self._bottom else 1 - self._percent / 100
+            return formats.quantile(self.column, quantile)
+
+        return formats.nthValue(self.column, self._count, largest=not self._bottom)
+
+
+    def cacheKey(self, formats):
+        """  """
+        return self._threshold(formats)
+
+
+    def evaluate(self, formats, chunk, values, numbers):
+        """  """
+        threshold = self._threshold(formats)
+        if threshold is None:
+            return [None] * len(numbers)
+
+        test = operator.le if self._bottom else operator.ge
+        style = self._style
+        return [style if number is not None and test(number, threshold) else None for number in numbers]
+
+
+class ConditionalFormats:
+
+    def __init__(self, rows, cellStyles, chunkSize=4096):
+        """ Conditional formatting rules of a sheet, evaluated lazily per chunk of rows of a column.
+
+        A chunk is evaluated as a whole the first time one of its cells is painted; the result is
+        cached with the column statistics it used. Edits only drop the caches of their chunk;
+        other chunks are evaluated again only if a statistic they depend on changed. """
+        self._rows = rows
+        self._cellStyles = cellStyles
+        self._chunkSize = chunkSize
+
+        self._rules = collections.defaultdict(list)
+
+        # Per (column, chunk)
+        self._numbers = {}
+        self._sortedNumbers = {}
+        self._results = {}
+
+        # Per column
+        self._columnSorted = {}
+        self._valueCounts = {}
+        self._duplicatesVersions = collections.Counter()
+
+        # Lookups answered from a cached chunk, and chunks evaluated
+        self._hits = 0
+        self._misses = 0
+
+
+    #
+    # Rules
+    #
+
+    def addRule(self, rule):
+        """  """
+        self._rules[rule.column].append(rule)
+        self._dropResults(rule.column)
+
+
+    def removeRules(self, column):
+        """  """
+        self._rules.pop(column, None)
+        self._dropResults(column)
+
+
+    def rules(self, column):
+        """  """
+        return list(self._rules.get(column, []))
+
+
+    def hasRules(self):
+        """  """
+        return bool(self._rules)
+
+
+    def _dropResults(self, column):
+        """  """
+        for key in [key for key in self._results if key[0] == column]:
+            del self._results[key]
+
+
+    #
+    # Chunk values
+    #
+
+    def _values(self, column, chunk):
+        """  """
+        first = chunk * self._chunkSize
+        return [row[column] if column < len(row) else "" for row in self._rows[first:first + self._chunkSize]]
+
+
+    def _chunkNumbers(self, column, chunk):
+        """ Returns the cells of the chunk parsed as numbers, parsed once. """
+        numbers = self._numbers.get((column, chunk))
+        if numbers is None:
+            numbers = [_number(value) for value in self._values(column, chunk)]
+            self._numbers[(column, chunk)] = numbers
+
+        return numbers
+
+
+    #
+    # Column statistics
+    #
+
+    def sortedNumbers(self, column):
+        """ Returns the numeric cells of the column in ascending order, merged from sorted chunks. """
+        merged = self._columnSorted.get(column)
+        if merged is None:
+            chunks = []
+            for chunk in range((len(self._rows) + self._chunkSize - 1) // self._chunkSize):
+                numbers = self._sortedNumbers.get((column, chunk))
+                if numbers is None:
+                    numbers = sorted(number for number in self._chunkNumbers(column, chunk) if number is not None)
+                    self._sortedNumbers[(column, chunk)] = numbers
+                chunks.append(numbers)
+
+            merged = list(heapq.merge(*chunks))
+            self._columnSorted[column] = merged
+
+        return merged
+
+
+    def columnRange(self, column):
+        """ Returns the minimum and maximum of the numeric cells of the column, or None. """
+        numbers = self.sortedNumbers(column)
+        return (numbers[0], numbers[-1]) if numbers else None
+
+
+    def quantile(self, column, quantile):
+        """ Returns the quantile (0 to 1) of the numeric cells of the column, or None. """
+        numbers = self.sortedNumbers(column)
+        if not numbers:
+            return None
+
+        return numbers[min(len(numbers) - 1, max(0, round(quantile * (len(numbers) - 1))))]
+
+
+    def nthValue(self, column, n, largest=True):
+        """ Returns the n-th largest (or smallest) numeric cell of the column, or None. """
+        numbers = self.sortedNumbers(column)
+        if not numbers or n <= 0:
+            return None
+
+        n = min(n, len(numbers))
+        return numbers[-n] if largest else numbers[n - 1]
+
+
+    def valueCounts(self, column):
+        """ Returns the number of occurrences of each value of the column. """
+        counts = self._valueCounts.get(column)
+        if counts is None:
+            counts = collections.Counter(row[column] for row in self._rows if column < len(row))
+            self._valueCounts[column] = counts
+
+        return counts
+
+
+    def duplicatesVersion(self, column):
+        """ Returns a number that changes whenever a value of the column starts or stops being a duplicate. """
+        return self._duplicatesVersions[column]
+
+
+    def _countValue(self, column, value, delta):
+        """  """
+        counts = self._valueCounts.get(column)
+        if counts is None or not value:
+            return None
+
+        before = counts[value]
+        counts[value] += delta
+        if (before > 1) != (counts[value] > 1):
+            self._duplicatesVersions[column] += 1
+
+
+    #
+    # Changes
+    #
+
+    def cellChanged(self, row, column, oldValue):
+        """ Drops the caches of the chunk holding the edited cell; the sorted column is updated in place. """
+        chunk = row // self._chunkSize
+        for cache in (self._numbers, self._sortedNumbers, self._results):
+            cache.pop((column, chunk), None)
+
+        merged = self._columnSorted.get(column)
+        if merged is not None:
+            number = _number(oldValue)
+            if number is not None:
+                index = bisect.bisect_left(merged, number)
+                if index < len(merged) and merged[index] == number:
+                    del merged[index]
+
+            number = _number(self._rows[row][column])
+            if number is not None:
+                bisect.insort(merged, number)
+
+        self._countValue(column, oldValue, -1)
+        self._countValue(column, self._rows[row][column], 1)
+
+
+    def rowsAppended(self, first, last):
+        """ Drops the caches of the chunks holding the rows first to last (exclusive). """
+        chunks = range(first // self._chunkSize, (last - 1) // self._chunkSize + 1)
+        for cache in (self._numbers, self._sortedNumbers, self._results):
+            for key in [key for key in cache if key[1] in chunks]:
+                del cache[key]
+
+        # The new numbers are merged into the sorted columns
+        for column, merged in self._columnSorted.items():
+            numbers = sorted(number for number in (_number(row[column]) for row in self._rows[first:last] if column < len(row)) if number is not None)
+            if len(numbers) < 64:
+                for number in numbers:
+                    bisect.insort(merged, number)
+            else:
+                merged[:] = heapq.merge(merged, numbers)
+
+        for column in self._valueCounts:
+            for row in self._rows[first:last]:
+                if column < len(row):
+                    self._countValue(column, row[column], 1)
+
+
+    #
+    # Lookup
+    #
+
+    def statistics(self):
+        """ Returns the number of cache hits and misses and the number of cached chunk results. """
+        return self._hits, self._misses, len(self._results)
+
+
+    def styleIdAt(self, row, column):
+        """ Returns the ID of the conditional style of the cell, evaluating its chunk if needed. """
+        rules = self._rules.get(column)
+        if not rules:
+            return 0
+
+        chunk = row // self._chunkSize
+        keys = tuple(rule.cacheKey(self) for rule in rules)
+
+        cached = self._results.get((column, chunk))
+        if cached is None or cached[0] != keys:
+            self._misses += 1
+            cached = (keys, self._evaluate(rules, column, chunk))
+            self._results[(column, chunk)] = cached
+        else:
+            self._hits += 1
+
+        styleIds = cached[1]
+        offset = row - chunk * self._chunkSize
+        return styleIds[offset] if offset < len(styleIds) else 0
+
+
+    def _evaluate(self, rules, column, chunk):
+        """ Evaluates the rules on the whole chunk and returns a style ID per row. """
+        values = self._values(column, chunk)
+        numbers = self._chunkNumbers(column, chunk)
+
+        results = [rule.evaluate(self, chunk, values, numbers) for rule in rules]
+
+        styleIds = []
+        interned = {}
+        for styles in zip(*results):
+            key = tuple(id(style) for style in styles if style is not None)
+            styleId = interned.get(key)
+            if styleId is None:
+                styleId = self._cellStyles.combine([self._cellStyles.intern(style) for style in styles if style is not None])
+                interned[key] = styleId
+            styleIds.append(styleId)
+
+        return styleIds
@@ -0,0 +1,155 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import csv
+import datetime
+import os
+import random
+import sys
+
+from PySide2.QtCore import QCommandLineOption, QCommandLineParser, QCoreApplication
+
+
+class DatasetGenerator:
+
+    shapes = {
+        "tall": (1000000, 10),
+        "wide": (1000, 1000),
+        "square": (10000, 100),
+    }
+
+    types = ("integer", "float", "text", "date", "boolean")
+
+
+    def __init__(self, rows=1000, columns=10, nullRatio=0.0, quoteRatio=0.0, seed=0):
+        """  """
+        self._rows = rows
+        self._columns = columns
+        self._nullRatio = nullRatio
+        self._quoteRatio = quoteRatio
+        self._seed = seed
+
+
+    def columnType(self, column):
+        """ Returns the value type of the given column; types cycle through the columns. """
+        return self.types[column % len(self.types)]
+
+
+    def header(self):
+        """  """
+        return ["{0}_{1}".format(self.columnType(column), column + 1) for column in range(self._columns)]
+
+
+    def rows(self, sheet=0):
+        """ Yields the data rows of the given sheet; the same seed always yields the same data. """
+        rng = random.Random("{0}:{1}".format(self._seed, sheet))
+        epoch = datetime.date(2000, 1, 1)
+
+        for _ in range(self._rows):
+            row = []
+            for column in range(self._columns):
+                if rng.random() < self._nullRatio:
+                    row.append("")
+                    continue
+
+                kind = self.columnType(column)
+                if kind == "integer":
+                    value = str(rng.randint(-1000000, 1000000))
+                elif kind == "float":
+                    value = "{0:.4f}".format(rng.uniform(-1000000, 1000000))
+                elif kind == "date":
+                    value = (epoch + datetime.timedelta(days=rng.randint(0, 10000))).isoformat()
+                elif kind == "boolean":
+                    value = "true" if rng.random() < 0.5 else "false"
+                else:
+                    value = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(rng.randint(1, 24)))
+                    if rng.random() < self._quoteRatio:
+                        # Fields that need quoting: delimiters, quotes and line breaks
+                        value = rng.choice(("{0}, {0}", "\"{0}\"", "{0}\n{0}", "{0}\t{0}")).format(value)
+
+                row.append(value)
+
+            yield row
+
+
+    def write(self, path, sheets=1):
+        """ Writes the dataset and returns the written paths; each additional sheet goes into its own file. """
+        base, extension = os.path.splitext(path)
+        delimiter = "\t" if extension.lower() in (".tsv", ".tab") else ","
+
+        paths = []
+        for sheet in range(sheets):
+            sheetPath = path if sheets == 1 else "{0}-sheet{1}{2}".format(base, sheet + 1, extension)
+            with open(sheetPath, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file, delimiter=delimiter)
+                writer.writerow(self.header())
+                writer.writerows(self.rows(sheet))
+            paths.append(sheetPath)
+
+        return paths
+
+
+if __name__ == "__main__":
+
+    app = QCoreApplication(sys.argv)
+    app.setApplicationName("PyTabelo Dataset Generator")
+
+    # Command line
+    parser = QCommandLineParser()
+    parser.setApplicationDescription("Writes reproducible synthetic datasets as delimited text files")
+    parser.addHelpOption()
+    parser.addPositionalArgument("file", "Output file; the extension .csv or .tsv selects the format.")
+    shapeOption = QCommandLineOption("shape", "Preset shape: {0}.".format(", ".join(DatasetGenerator.shapes)), "shape")
+    parser.addOption(shapeOption)
+    rowsOption = QCommandLineOption("rows", "Number of data rows (default: 1000).", "count", "1000")
+    parser.addOption(rowsOption)
+    columnsOption = QCommandLineOption("columns", "Number of columns (default: 10).", "count", "10")
+    parser.addOption(columnsOption)
+    sheetsOption = QCommandLineOption("sheets", "Number of sheets (default: 1).", "count", "1")
+    parser.addOption(sheetsOption)
+    nullsOption = QCommandLineOption("nulls", "Ratio of empty cells (default: 0).", "ratio", "0")
+    parser.addOption(nullsOption)
+    quotedOption = QCommandLineOption("quoted", "Ratio of text cells that need quoting (default: 0).", "ratio", "0")
+    parser.addOption(quotedOption)
+    seedOption = QCommandLineOption("seed", "Random seed (default: 0).", "seed", "0")
+    parser.addOption(seedOption)
+    parser.process(app)
+
+    if len(parser.positionalArguments()) != 1:
+        parser.showHelp(1)
+
+    rows, columns = int(parser.value(rowsOption)), int(parser.value(columnsOption))
+    if parser.isSet(shapeOption):
+        if parser.isSet(rowsOption) or parser.isSet(columnsOption):
+            print("--shape cannot be combined with --rows or --columns", file=sys.stderr)
+            sys.exit(2)
+        if parser.value(shapeOption) not in DatasetGenerator.shapes:
+            print("Unknown shape: {0}".format(parser.value(shapeOption)), file=sys.stderr)
+            sys.exit(2)
+        rows, columns = DatasetGenerator.shapes[parser.value(shapeOption)]
+
+    generator = DatasetGenerator(rows, columns, float(parser.value(nullsOption)), float(parser.value(quotedOption)), int(parser.value(seedOption)))
+    for path in generator.write(parser.positionalArguments()[0], int(parser.value(sheetsOption))):
+        print(path)
+
+    sys.exit(0)
@@ -21,7 +21,9 @@
 # along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from PySide2.QtCore import Property, Signal, Qt, QSettings
+import json
+
+from PySide2.QtCore import Property, Signal, Qt, QSettings, QUrl
 from PySide2.QtWidgets import QMdiArea, QTabBar, QTabWidget
 
 
@@ -67,6 +69,50 @@ class DocumentManager(QMdiArea):
         settings.setValue("DocumentManager/DocumentTabsAutoHide", hide)
 
 
+    def saveSession(self):
+        """ Stores the urls, the active sheets with their scroll positions and the order of the open documents. """
+        settings = QSettings()
+
+        subWindows = [subWindow for subWindow in self.subWindowList(QMdiArea.CreationOrder) if not subWindow.widget().getUrl().isEmpty()]
+        activeSubWindow = self.activeSubWindow()
+
+        settings.remove("Session")
+        settings.beginWriteArray("Session/Documents", len(subWindows))
+        for i, subWindow in enumerate(subWindows):
+            settings.setArrayIndex(i)
+            settings.setValue("Url", subWindow.widget().getUrl().toString())
+            settings.setValue("ActiveSheet", subWindow.widget().getCurrentSheetIndex())
+            viewState = subWindow.widget().currentViewState()
+            settings.setValue("ViewState", json.dumps(viewState) if viewState is not None else "")
+        settings.endArray()
+
+        active = subWindows.index(activeSubWindow) if activeSubWindow in subWindows else -1
+        settings.setValue("Session/ActiveDocument", active)
+
+
+    def loadSession(self):
+        """ Returns the stored documents as (url, sheet index, view state or None) tuples and the index of the active one. """
+        settings = QSettings()
+
+        documents = []
+        count = settings.beginReadArray("Session/Documents")
+        for i in range(count):
+            settings.setArrayIndex(i)
+            url = QUrl(settings.value("Url", "", type=str))
+            sheet = settings.value("ActiveSheet", 0, type=int)
+            try:
+                viewState = json.loads(settings.value("ViewState", "", type=str) or "null")
+            except ValueError:
+                viewState = None
+            if not url.isEmpty():
+                documents.append((url, sheet, viewState))
+        settings.endArray()
+
+        active = settings.value("Session/ActiveDocument", -1, type=int)
+
+        return documents, active
+
+
     #
     # Property helper functions
     #
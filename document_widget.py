@@ -21,28 +21,62 @@
 # along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import asyncio
+import csv
+import io
+
+from async_loop import AsyncLoop
+from atomic_file import AtomicFile
+from edit_journal import EditJournal, JournalWriter
+from file_tail import FileTail
 from table_document import TableDocument
+from tracer import Tracer
 
-from PySide2.QtCore import Property, Signal, Qt, QUrl
+from PySide2.QtCore import Property, Signal, Qt, QFileInfo, QFileSystemWatcher, QUrl
 from PySide2.QtGui import QClipboard
 from PySide2.QtWidgets import QApplication
 
 
 class DocumentWidget(TableDocument):
 
-    def __init__(self, parent=None):
-        """  """
+    def __init__(self, asyncLoop, parent=None):
+        """ Reads its file through the given asyncio loop. """
         super().__init__(parent=parent)
 
+        self._asyncLoop = asyncLoop
+        self._readTask = None
+        self._readViewState = None
+
         self._modified = False
         self._url = QUrl()
 
+        self._journal = None
+        self.cellEdited.connect(self._slotCellEdited)
+
+        self._follow = False
+        self._tail = None
+        self._saving = False
+        self._contentsLoaded = False
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._slotFileChanged)
+
+        self._loaded = True
+        self._deferredSheetIndex = 0
+
+        # Edits recorded so far, per sheet; a save only clears the modified flag if no edit came in meanwhile
+        self._editCount = 0
+        self._editedSheets = set()
+        self._saveEditCount = 0
+        self._deferredViewState = None
+        self._documentCount = 0
+
         self.setAttribute(Qt.WA_DeleteOnClose)
 
 
     def closeEvent(self, event):
         """  """
         self.saveSettings()
+        self._discardJournal()
         event.accept()
 
 
@@ -61,11 +95,17 @@ class DocumentWidget(TableDocument):
             self._modified = modified
             self.modifiedChanged.emit(modified)
 
+        if not modified:
+            self._editedSheets.clear()
+            self._discardJournal()
+
 
     def resetModified(self):
         """  """
         self._modified = False
         self.modifiedChanged.emit(False)
+        self._editedSheets.clear()
+        self._discardJournal()
 
 
     def initModified(self):
@@ -90,12 +130,15 @@ class DocumentWidget(TableDocument):
         """  """
         if url != self._url:
             self._url = url
+            self._loadContents()
+            self._watchUrl()
             self.urlChanged.emit(url)
 
 
     def resetUrl(self):
         """  """
         self._url = QUrl()
+        self._watchUrl()
         self.urlChanged.emit(QUrl())
 
 
@@ -108,13 +151,354 @@ class DocumentWidget(TableDocument):
     url = Property(QUrl, getUrl, setUrl, notify=urlChanged)
 
 
+    #
+    # Property: follow
+    #
+
+    def isFollow(self):
+        """  """
+        return self._follow
+
+
+    def setFollow(self, follow):
+        """  """
+        if follow != self._follow:
+            self._follow = follow
+            self.followChanged.emit(follow)
+
+
+    def initFollow(self):
+        """  """
+        self.followChanged.emit(self._follow)
+
+
+    followChanged = Signal(bool)
+    follow = Property(bool, isFollow, setFollow, notify=followChanged)
+
+
+    #
+    # External changes
+    #
+
+    rowsAppended = Signal(object)
+    # Whether the contents were reloaded; edited contents are kept
+    fileChangedExternally = Signal(bool)
+
+
+    def _watchUrl(self):
+        """ Watches the local file of the document for changes by other processes. """
+        if self._watcher.files():
+            self._watcher.removePaths(self._watcher.files())
+        self._tail = None
+
+        if self._url.isLocalFile() and QFileInfo.exists(self._url.toLocalFile()):
+            path = self._url.toLocalFile()
+            delimiter = "\t" if QFileInfo(path).suffix().lower() in ("tsv", "tab") else ","
+
+            self._tail = FileTail(path, delimiter)
+            self._tail.skipToEnd()
+            self._watcher.addPath(path)
+
+
+    def _slotFileChanged(self, path):
+        """  """
+        if self._tail is None:
+            return None
+
+        # Replaced files drop out of the watcher
+        replaced = path not in self._watcher.files()
+        if replaced and QFileInfo.exists(path):
+            self._watcher.addPath(path)
+
+        # Written by our own save, or read once the contents are in
+        if self._saving or self._readTask is not None:
+            return None
+
+        rows = self._tail.readAppended() if not replaced else None
+        if rows is None:
+            # Not a pure append; unedited contents are reloaded, edits are only dropped on request
+            reload = 0 not in self._editedSheets
+            if reload:
+                self.reloadContents()
+            else:
+                self._tail.skipToEnd()
+            self.fileChangedExternally.emit(reload)
+        elif rows:
+            self._appendRows(rows)
+            self.rowsAppended.emit(rows)
+
+
+    def _appendRows(self, rows):
+        """ Appends rows written by another program to the first sheet; following keeps them in view. """
+        if not self.sheetCount():
+            return None
+
+        self.sheetModel(0).appendRows(rows)
+
+        sheet = self.currentSheet()
+        if self._follow and sheet is not None and self.getCurrentSheetIndex() == 0:
+            for view in sheet.views():
+                view.scrollToBottom()
+
+
     #
     # Document
     #
 
     def documentCountChanged(self, count):
         """  """
-        self.slotAddTab(count)
+        self._documentCount = count
+
+        if self._loaded:
+            self.slotAddTab(count)
+            self._loadContents()
+
+
+    #
+    # Loading
+    #
+
+    def _loadContents(self):
+        """ Reads the rows of the local file into the first sheet, once the sheets exist.
+
+        The file is read and parsed off the UI thread; the rows are applied when they arrive. """
+        if self._contentsLoaded or self._readTask is not None or not self._loaded or not self.sheetCount():
+            return None
+
+        if self._url.isLocalFile() and QFileInfo.exists(self._url.toLocalFile()):
+            path = self._url.toLocalFile()
+            delimiter = "\t" if QFileInfo(path).suffix().lower() in ("tsv", "tab") else ","
+
+            self._readTask = self._asyncLoop.run(DocumentWidget._readContents, path, delimiter, owner=self)
+            self._readTask.finished.connect(self._contentsRead)
+            self._readTask.failed.connect(self._contentsReadFailed)
+            self._readTask.cancelled.connect(self._contentsReadFailed)
+            return None
+
+        self._contentsLoaded = True
+
+
+    @staticmethod
+    async def _readContents(emitChunk, path, delimiter):
+        """ Returns the rows of the file and the number of bytes they were read from; runs in the asyncio thread. """
+        data = b"".join([chunk async for chunk in AsyncLoop.readChunks(path)])
+
+        # Parsing is CPU-bound and would hold up the other coroutines
+        rows = await asyncio.get_running_loop().run_in_executor(None, DocumentWidget._parseContents, path, data, delimiter)
+        return rows, len(data)
+
+
+    @staticmethod
+    def _parseContents(path, data, delimiter):
+        """  """
+        with Tracer.span("Read document", url=path):
+            return list(csv.reader(io.StringIO(data.decode("utf-8"), newline=""), delimiter=delimiter))
+
+
+    def _contentsRead(self, result):
+        """ Applies the rows read in the background to the first sheet. """
+        rows, size = result
+        self._readTask = None
+
+        self.sheetModel(0).appendRows(rows)
+        self._contentsLoaded = True
+
+        viewState = self._readViewState
+        self._readViewState = None
+        if viewState is not None:
+            self._restoreViewState(viewState)
+
+        # Rows appended while the file was read follow its contents
+        if self._tail is not None:
+            self._tail.reset(size)
+            self._slotFileChanged(self._tail.path())
+
+
+    def _contentsReadFailed(self, error=None):
+        """ Not readable as delimited text; the document cannot be saved over it. """
+        self._readTask = None
+        self._readViewState = None
+
+
+    def _restoreViewState(self, viewState):
+        """ Restores the view state on the current sheet; on the first sheet only once its contents are in. """
+        if self._readTask is not None and self.getCurrentSheetIndex() == 0:
+            self._readViewState = viewState
+            return None
+
+        sheet = self.currentSheet()
+        if sheet is not None:
+            sheet.views()[0].restoreViewState(viewState)
+
+
+    def reloadContents(self):
+        """ Reads the first sheet again from the file, dropping its edits; the view keeps its position. """
+        if not self._contentsLoaded:
+            return None
+
+        viewState = self.currentViewState() if self.getCurrentSheetIndex() == 0 else None
+
+        self.resetSheet(0)
+        self._contentsLoaded = False
+        self._loadContents()
+
+        if viewState is not None:
+            self._restoreViewState(viewState)
+
+        # The edits of the first sheet are gone; those of other sheets stay modified
+        self._editedSheets.discard(0)
+        if not self._editedSheets:
+            self.setModified(False)
+
+
+    #
+    # Saving
+    #
+
+    def beginSave(self, editCount):
+        """ Ignores the file changes of the document's own save until endSave(); editCount is that of the snapshot. """
+        self._saving = True
+        self._saveEditCount = editCount
+
+
+    def endSave(self, saved):
+        """ Marks the document unmodified if it was saved and not edited since its snapshot. """
+        self._saving = False
+
+        # The saved file replaced the watched one; watch it again from its end
+        self._watchUrl()
+
+        # Later edits are not in the file; they stay modified and journaled
+        if saved and self._saveEditCount == self._editCount:
+            self.resetModified()
+
+
+    def unsavableSheets(self):
+        """ Returns the names of the edited sheets that a delimited file cannot hold, all but the first. """
+        names = self.sheetNames()
+        return [names[sheet] for sheet in sorted(self._editedSheets) if sheet != 0 and sheet < len(names)]
+
+
+    def snapshot(self):
+        """ Returns a copy of the rows of the first sheet to save and the edit count it contains,
+        or None if the file contents were never read. """
+        if not self._contentsLoaded:
+            return None
+
+        return [list(row) for row in self.sheetModel(0).rows()], self._editCount
+
+
+    @staticmethod
+    def writeSnapshot(token, progress, path, rows):
+        """ Writes a snapshot to path atomically; runs in a worker thread. """
+        delimiter = "\t" if path.lower().endswith((".tsv", ".tab")) else ","
+
+        def write(file):
+            writer = csv.writer(file, delimiter=delimiter)
+            for number, row in enumerate(rows, start=1):
+                if token.isCancelled():
+                    raise InterruptedError(path)
+                writer.writerow(row)
+                if number % 10000 == 0:
+                    progress(number * 100 // len(rows))
+
+        AtomicFile.write(path, write)
+        progress(100)
+
+        return path
+
+
+    #
+    # Journal
+    #
+
+    journalFailed = Signal(str)
+
+
+    def recordEdit(self, record):
+        """ Appends an edit record to the document's journal and marks the document modified. """
+        if self._journal is None:
+            self._journal = EditJournal(self._url.toString())
+            JournalWriter.instance().failed.connect(self._slotJournalFailed)
+
+        self._journal.append(record)
+        self._editCount += 1
+        self._editedSheets.add(record.get("sheet", 0))
+        self.setModified(True)
+
+
+    def _slotCellEdited(self, sheet, row, column, value):
+        """  """
+        self.recordEdit({"sheet": sheet, "row": row, "column": column, "value": value})
+
+
+    def replayJournal(self, records):
+        """ Replays recovered edit records; they are journaled again until the document is saved. """
+        for record in records:
+            sheet = record.get("sheet", -1)
+            if 0 <= sheet < self.sheetCount():
+                self.sheetModel(sheet).setCellValue(record["row"], record["column"], record["value"])
+            self.recordEdit(record)
+
+
+    def _discardJournal(self):
+        """  """
+        if self._journal is not None:
+            JournalWriter.instance().failed.disconnect(self._slotJournalFailed)
+            self._journal.discard()
+            self._journal = None
+
+
+    def _slotJournalFailed(self, path, message):
+        """ The edits are no longer safe from a crash once the journal cannot be written. """
+        if self._journal is not None and path == self._journal.path():
+            self.journalFailed.emit(message)
+
+
+    #
+    # Lazy loading
+    #
+
+    def isLoaded(self):
+        """  """
+        return self._loaded
+
+
+    def deferLoad(self, sheetIndex=0, viewState=None):
+        """ Keeps the document as a lightweight placeholder until load() is called; the view state is restored on the sheet then. """
+        self._loaded = False
+        self._deferredSheetIndex = sheetIndex
+        self._deferredViewState = viewState
+
+
+    def load(self):
+        """ Builds the sheets of a deferred document. """
+        if self._loaded:
+            return None
+
+        with Tracer.span("Load deferred document", url=self._url):
+            self._loaded = True
+            self.slotAddTab(self._documentCount)
+            self._loadContents()
+            self.setCurrentSheetIndex(self._deferredSheetIndex)
+
+            if self._deferredViewState is not None:
+                self._restoreViewState(self._deferredViewState)
+            self._deferredViewState = None
+
+
+    def getCurrentSheetIndex(self):
+        """  """
+        return super().getCurrentSheetIndex() if self._loaded else self._deferredSheetIndex
+
+
+    def currentViewState(self):
+        """ Returns the view state of the current sheet, see SheetView.viewState, or None. """
+        if not self._loaded:
+            return self._deferredViewState
+
+        sheet = self.currentSheet()
+        return sheet.currentView().viewState() if sheet is not None else None
 
 
     #
@@ -26,6 +26,7 @@ from PySide2.QtGui import QIcon
 from PySide2.QtWidgets import QAction, QMdiSubWindow, QMessageBox
 
 from confirmation_dialog import ConfirmationDialog
+from icon_cache import IconCache
 
 
 class DocumentWindow(QMdiSubWindow):
@@ -54,32 +55,32 @@ class DocumentWindow(QMdiSubWindow):
 
         self._actionClose = QAction(self.tr("&Close"), self)
         self._actionClose.setObjectName("actionClose")
-        self._actionClose.setIcon(QIcon.fromTheme("window-close", QIcon(":/icons/actions/16/window-close.svg")))
+        self._actionClose.setIcon(IconCache.themeIcon("window-close"))
         self._actionClose.setToolTip(self.tr("Close document"))
         self._actionClose.triggered.connect(self.close)
 
         self._actionCloseOther = QAction(self.tr("Close Ot&her"), self)
         self._actionCloseOther.setObjectName("actionCloseOther")
-        self._actionCloseOther.setIcon(QIcon.fromTheme("window-close", QIcon(":/icons/actions/16/window-close.svg")))
+        self._actionCloseOther.setIcon(IconCache.themeIcon("window-close"))
         self._actionCloseOther.setToolTip(self.tr("Close other open documents"))
         self._actionCloseOther.triggered.connect(self._slotCloseOther)
 
         self._actionShowPath = QAction(self.tr("Show &Path"), self)
         self._actionShowPath.setObjectName("actionShowPath")
         self._actionShowPath.setCheckable(True)
-        self._actionShowPath.setIcon(QIcon.fromTheme("show-path", QIcon(":/icons/actions/16/show-path.svg")))
+        self._actionShowPath.setIcon(IconCache.themeIcon("show-path"))
         self._actionShowPath.setToolTip(self.tr("Show document path in the tab caption"))
         self._actionShowPath.toggled.connect(self._updateWindowTitle)
 
         self._actionCopyPath = QAction(self.tr("Cop&y Path"), self)
         self._actionCopyPath.setObjectName("actionCopyPath")
-        self._actionCopyPath.setIcon(QIcon.fromTheme("edit-copy-path", QIcon(":/icons/actions/16/edit-copy-path.svg")))
+        self._actionCopyPath.setIcon(IconCache.themeIcon("edit-copy-path"))
         self._actionCopyPath.setToolTip(self.tr("Copy document path to clipboard"))
         self._actionCopyPath.triggered.connect(self.actionCopyPath)
 
         self._actionCopyFilename = QAction(self.tr("Copy &Filename"), self)
         self._actionCopyFilename.setObjectName("actionCopyFilename")
-        self._actionCopyFilename.setIcon(QIcon.fromTheme("edit-copy-path", QIcon(":/icons/actions/16/edit-copy-path.svg")))
+        self._actionCopyFilename.setIcon(IconCache.themeIcon("edit-copy-path"))
         self._actionCopyFilename.setToolTip(self.tr("Copy document filename to clipboard"))
         self._actionCopyFilename.triggered.connect(self.actionCopyFilename)
 
@@ -170,7 +171,7 @@ class DocumentWindow(QMdiSubWindow):
 
     def _updateWindowIcon(self, modified):
         """  """
-        icon = QIcon.fromTheme("document-save", QIcon(":/icons/actions/16/document-save.svg")) if modified else QIcon()
+        icon = IconCache.themeIcon("document-save") if modified else QIcon()
         self.setWindowIcon(icon)
 
 
@@ -0,0 +1,230 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import json
+import os
+import queue
+import threading
+import uuid
+
+from PySide2.QtCore import QLockFile, QObject, QStandardPaths, Signal
+
+
+class JournalWriter(QObject):
+
+    _instance = None
+
+    # Emitted from the writer thread with the journal path and the error message
+    failed = Signal(str, str)
+
+
+    @staticmethod
+    def instance():
+        """ Returns the writer shared by all journals, starting it on first use. """
+        if JournalWriter._instance is None:
+            JournalWriter._instance = JournalWriter()
+
+        return JournalWriter._instance
+
+
+    def __init__(self):
+        """  """
+        super().__init__()
+
+        self._queue = queue.Queue()
+
+        self._thread = threading.Thread(target=self._run, name="JournalWriter", daemon=True)
+        self._thread.start()
+
+
+    def append(self, path, record):
+        """ Queues a record; returns immediately. """
+        self._queue.put((path, record, None))
+
+
+    def remove(self, path, lock=None):
+        """ Queues the removal of a journal after its pending records, then unlocks its lock. """
+        self._queue.put((path, None, lock))
+
+
+    def flush(self):
+        """ Blocks until all queued operations are written. """
+        self._queue.join()
+
+
+    def _run(self):
+        """ Writer thread: writes queued records in batches, one fsync per journal and batch. """
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Any error must not end the thread, or flush() would never return
+            try:
+                self._write(batch)
+            except Exception as error:
+                for path in sorted({path for path, _, _ in batch}):
+                    self.failed.emit(path, str(error))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+    def _write(self, batch):
+        """  """
+        lines = {}
+        for path, record, lock in batch:
+            if record is None:
+                self._flushLines(lines)
+                lines = {}
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as error:
+                    self.failed.emit(path, error.strerror or str(error))
+                if lock is not None:
+                    lock.unlock()
+            else:
+                lines.setdefault(path, []).append(json.dumps(record, separators=(",", ":")) + "\n")
+
+        self._flushLines(lines)
+
+
+    def _flushLines(self, lines):
+        """  """
+        for path, chunk in lines.items():
+            try:
+                with open(path, "a", encoding="utf-8") as file:
+                    file.writelines(chunk)
+                    file.flush()
+                    os.fsync(file.fileno())
+            except OSError as error:
+                self.failed.emit(path, error.strerror or str(error))
+
+
+class EditJournal:
+
+    # Locks of the journals being recovered, by path
+    _recoveryLocks = {}
+
+
+    def __init__(self, url):
+        """ Creates a write-ahead journal for the document at the given url.
+
+        The journal is locked while it is in use, so that other running instances leave it alone. """
+        self._path = os.path.join(EditJournal.directory(), "{0}.journal".format(uuid.uuid4().hex))
+
+        self._lock = EditJournal._lockFile(self._path)
+        self._lock.tryLock(0)
+
+        JournalWriter.instance().append(self._path, {"url": url})
+
+
+    def path(self):
+        """  """
+        return self._path
+
+
+    @staticmethod
+    def _lockFile(path):
+        """ Returns the lock of the journal; a lock left behind by a process that is gone counts as stale. """
+        lock = QLockFile(path + ".lock")
+        lock.setStaleLockTime(0)
+        return lock
+
+
+    @staticmethod
+    def directory():
+        """  """
+        path = os.path.join(QStandardPaths.writableLocation(QStandardPaths.AppDataLocation), "journals")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+
+    @staticmethod
+    def pendingJournals():
+        """ Returns the paths of journals left behind by a previous session, locking them until they are removed.
+
+        Journals locked by another running instance are skipped. """
+        directory = EditJournal.directory()
+
+        paths = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.endswith(".journal") or path in EditJournal._recoveryLocks:
+                continue
+
+            lock = EditJournal._lockFile(path)
+            if lock.tryLock(0):
+                EditJournal._recoveryLocks[path] = lock
+                paths.append(path)
+
+        return paths
+
+
+    @staticmethod
+    def read(path):
+        """ Returns the document url and the edit records of a journal; a torn last record is ignored. """
+        url = ""
+        records = []
+
+        with open(path, encoding="utf-8") as file:
+            for number, line in enumerate(file):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+
+                if number == 0:
+                    url = record.get("url", "")
+                else:
+                    records.append(record)
+
+        return url, records
+
+
+    @staticmethod
+    def remove(path):
+        """ Removes a journal returned by pendingJournals. """
+        JournalWriter.instance().remove(path, EditJournal._recoveryLocks.pop(path, None))
+
+
+    @staticmethod
+    def flush():
+        """ Blocks until all journal writes and removals are done. """
+        if JournalWriter._instance is not None:
+            JournalWriter._instance.flush()
+
+
+    def append(self, record):
+        """ Appends an edit record; the write happens in the background. """
+        JournalWriter.instance().append(self._path, record)
+
+
+    def discard(self):
+        """ Removes the journal, e.g. after the document was saved. """
+        JournalWriter.instance().remove(self._path, self._lock)
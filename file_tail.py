@@ -0,0 +1,135 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import csv
+import hashlib
+import io
+import os
+
+
+class FileTail:
+
+    # Bytes before the read offset that must be unchanged for the file to count as appended to
+    checkedLength = 4096
+
+
+    def __init__(self, path, delimiter=","):
+        """ Follows a delimited text file that other processes append to. """
+        self._path = path
+        self._delimiter = delimiter
+        self._offset = 0
+        self._remainder = b""
+        self._check(b"")
+
+
+    def path(self):
+        """  """
+        return self._path
+
+
+    def reset(self, offset=0):
+        """ Starts reading again at the given byte offset. """
+        self._offset = offset
+        self._remainder = b""
+        self._check(b"")
+
+        if offset:
+            try:
+                with open(self._path, "rb") as file:
+                    file.seek(max(0, offset - self.checkedLength))
+                    self._check(file.read(min(offset, self.checkedLength)))
+            except OSError:
+                self._offset = 0
+
+
+    def skipToEnd(self):
+        """ Marks the current content as already read. """
+        try:
+            self.reset(os.path.getsize(self._path))
+        except OSError:
+            self.reset()
+
+
+    def readAppended(self):
+        """ Returns the rows appended since the last call, or None if the file was rewritten and must be reloaded.
+
+        The file counts as rewritten if it shrank or the bytes before the read offset changed.
+        Only complete records are parsed; a partially written last record is kept until it is finished. """
+        try:
+            size = os.path.getsize(self._path)
+        except OSError:
+            return []
+
+        if size < self._offset:
+            return None
+
+        if size == self._offset:
+            return []
+
+        with open(self._path, "rb") as file:
+            file.seek(self._offset - self._checkedLength)
+            data = file.read(size - self._offset + self._checkedLength)
+
+        if hashlib.blake2b(data[:self._checkedLength]).digest() != self._checksum:
+            return None
+
+        appended = data[self._checkedLength:]
+        self._offset = size
+        self._check(data[-self.checkedLength:])
+
+        data = self._remainder + appended
+        end = self._recordsEnd(data)
+        self._remainder = data[end:]
+        if not end:
+            return []
+
+        text = data[:end].decode("utf-8", errors="replace")
+        return list(csv.reader(io.StringIO(text, newline=""), delimiter=self._delimiter))
+
+
+    def _check(self, data):
+        """ Remembers the checksum of the bytes just before the read offset. """
+        self._checksum = hashlib.blake2b(data).digest()
+        self._checkedLength = len(data)
+
+
+    @staticmethod
+    def _recordsEnd(data):
+        """ Returns the end of the last complete record; line breaks inside quoted fields do not end a record. """
+        end = 0
+        quoted = False
+
+        start = 0
+        while True:
+            newline = data.find(b"\n", start)
+            if newline < 0:
+                break
+
+            # Escaped quotes come in pairs and leave the quoting as is
+            if data.count(b'"', start, newline) % 2:
+                quoted = not quoted
+            start = newline + 1
+            if not quoted:
+                end = start
+
+        return end
@@ -0,0 +1,74 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from PySide2.QtGui import QIcon
+
+
+class IconCache:
+
+    _icons = {}
+    _hits = 0
+    _misses = 0
+
+
+    @staticmethod
+    def themeIcon(name):
+        """ Returns the shared theme icon, falling back to the bundled action icon. """
+        key = "theme:" + name
+
+        icon = IconCache._icons.get(key)
+        if icon is None:
+            IconCache._misses += 1
+            icon = QIcon.fromTheme(name, IconCache.resourceIcon(":/icons/actions/16/{0}.svg".format(name)))
+            IconCache._icons[key] = icon
+        else:
+            IconCache._hits += 1
+
+        return icon
+
+
+    @staticmethod
+    def resourceIcon(path):
+        """ Returns the shared icon loaded from the given resource path. """
+        icon = IconCache._icons.get(path)
+        if icon is None:
+            IconCache._misses += 1
+            icon = QIcon(path)
+            IconCache._icons[path] = icon
+        else:
+            IconCache._hits += 1
+
+        return icon
+
+
+    @staticmethod
+    def clear():
+        """ Drops all cached icons, e.g. after the icon theme changed. """
+        IconCache._icons.clear()
+
+
+    @staticmethod
+    def statistics():
+        """ Returns the number of cache hits, misses and cached icons. """
+        return IconCache._hits, IconCache._misses, len(IconCache._icons)
@@ -0,0 +1,200 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import bisect
+
+
+class IntervalSet:
+
+    def __init__(self, intervals=()):
+        """ A set of integers kept as sorted, disjoint, non-adjacent intervals (first, last), both inclusive.
+
+        Adding or removing a range is one interval operation whatever its length; counting the
+        members before a position and finding the n-th non-member are O(log k) for k intervals. """
+        self._firsts = []
+        self._lasts = []
+        self._cumulative = None
+
+        for first, last in intervals:
+            self.add(first, last)
+
+
+    def __bool__(self):
+        """  """
+        return bool(self._firsts)
+
+
+    def __eq__(self, other):
+        """  """
+        return isinstance(other, IntervalSet) and self._firsts == other._firsts and self._lasts == other._lasts
+
+
+    def intervals(self):
+        """  """
+        return list(zip(self._firsts, self._lasts))
+
+
+    def copy(self):
+        """  """
+        other = IntervalSet()
+        other._firsts = list(self._firsts)
+        other._lasts = list(self._lasts)
+        return other
+
+
+    #
+    # Changes
+    #
+
+    def add(self, first, last):
+        """ Adds the integers first to last. """
+        if first > last:
+            return None
+
+        # Intervals overlapping or adjacent to the range are merged into it
+        start = bisect.bisect_left(self._lasts, first - 1)
+        end = bisect.bisect_right(self._firsts, last + 1)
+        if start < end:
+            first = min(first, self._firsts[start])
+            last = max(last, self._lasts[end - 1])
+
+        self._firsts[start:end] = [first]
+        self._lasts[start:end] = [last]
+        self._cumulative = None
+
+
+    def remove(self, first, last):
+        """ Removes the integers first to last. """
+        if first > last:
+            return None
+
+        start = bisect.bisect_left(self._lasts, first)
+        end = bisect.bisect_right(self._firsts, last)
+        if start >= end:
+            return None
+
+        firsts = []
+        lasts = []
+        if self._firsts[start] < first:
+            firsts.append(self._firsts[start])
+            lasts.append(first - 1)
+        if self._lasts[end - 1] > last:
+            firsts.append(last + 1)
+            lasts.append(self._lasts[end - 1])
+
+        self._firsts[start:end] = firsts
+        self._lasts[start:end] = lasts
+        self._cumulative = None
+
+
+    def clear(self):
+        """  """
+        self._firsts.clear()
+        self._lasts.clear()
+        self._cumulative = None
+
+
+    #
+    # Set operations
+    #
+
+    def union(self, other):
+        """  """
+        result = self.copy()
+        for first, last in other.intervals():
+            result.add(first, last)
+
+        return result
+
+
+    def difference(self, other):
+        """ Returns the intervals of the members not in the other set. """
+        result = self.copy()
+        for first, last in other.intervals():
+            result.remove(first, last)
+
+        return result.intervals()
+
+
+    def clipped(self, count):
+        """ Returns the set restricted to 0 to count - 1. """
+        result = self.copy()
+        if result._lasts and result._lasts[-1] >= count:
+            result.remove(count, result._lasts[-1])
+
+        return result
+
+
+    #
+    # Queries
+    #
+
+    def contains(self, value):
+        """  """
+        i = bisect.bisect_right(self._firsts, value) - 1
+        return i >= 0 and value <= self._lasts[i]
+
+
+    def length(self):
+        """ Returns the number of members. """
+        cumulative = self._cumulativeLengths()
+        return cumulative[-1]
+
+
+    def _cumulativeLengths(self):
+        """ Returns the number of members in the intervals before each interval, and in total. """
+        if self._cumulative is None:
+            cumulative = [0]
+            for first, last in zip(self._firsts, self._lasts):
+                cumulative.append(cumulative[-1] + last - first + 1)
+            self._cumulative = cumulative
+
+        return self._cumulative
+
+
+    def countBefore(self, value):
+        """ Returns the number of members less than the value. """
+        cumulative = self._cumulativeLengths()
+
+        i = bisect.bisect_left(self._firsts, value)
+        count = cumulative[i]
+        if i and self._lasts[i - 1] >= value:
+            count -= self._lasts[i - 1] - value + 1
+
+        return count
+
+
+    def nthAbsent(self, n):
+        """ Returns the n-th (0-based) non-negative integer that is not a member. """
+        cumulative = self._cumulativeLengths()
+
+        # Interval i starts right after the (firsts[i] - cumulative[i])-th non-member
+        low, high = 0, len(self._firsts)
+        while low < high:
+            middle = (low + high) // 2
+            if self._firsts[middle] - cumulative[middle] <= n:
+                low = middle + 1
+            else:
+                high = middle
+
+        return n + cumulative[low]
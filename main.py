@@ -23,39 +23,135 @@
 
 import sys
 
-from PySide2.QtCore import QCommandLineParser, QDir, QUrl
+from profiler import Profiler
+
+# Profiling starts before the heavy imports, which make up most of the startup
+if any(argument in ("--profile", "--profile-startup") or argument.startswith("--profile=") for argument in sys.argv[1:]):
+    Profiler.start()
+
+from PySide2.QtCore import QCommandLineOption, QCommandLineParser, QCoreApplication, QDir, QTimer, QUrl
 from PySide2.QtWidgets import QApplication
 
-from application_window import ApplicationWindow
+from batch_processor import BatchProcessor
+from stall_detector import StallDetector
+from tracer import Tracer
 
 
-if __name__ == "__main__":
+def setupApplication(app):
 
-    app = QApplication(sys.argv)
     app.setOrganizationName("Beleta Labs")
     app.setOrganizationDomain("https://beletalabs.github.io")
     app.setApplicationName("PyTabelo")
-    app.setApplicationDisplayName("PyTabelo")
     app.setApplicationVersion("0.1.0")
 
+
+if __name__ == "__main__":
+
+    #
+    # Batch mode
+
+    if len(sys.argv) >= 2 and sys.argv[1] in BatchProcessor.commands:
+
+        app = QCoreApplication(sys.argv)
+        setupApplication(app)
+
+        # Command line
+        parser = QCommandLineParser()
+        parser.setApplicationDescription("{0} - A table editor based on Qt for Python".format(app.applicationName()))
+        parser.addHelpOption()
+        parser.addVersionOption()
+        parser.addPositionalArgument("command", QCoreApplication.translate("main", "Batch command to run: {0}.").format(", ".join(BatchProcessor.commands)))
+        parser.addPositionalArgument("files", QCoreApplication.translate("main", "Documents to process."), "[files...]")
+        traceOption = QCommandLineOption("trace", QCoreApplication.translate("main", "Write a Chrome trace of the run to <file>."), "file")
+        parser.addOption(traceOption)
+        parser.process(app)
+
+        Tracer.setEnabled(parser.isSet(traceOption))
+
+        arguments = parser.positionalArguments()
+        result = BatchProcessor().run(arguments[0], arguments[1:])
+
+        if parser.isSet(traceOption):
+            try:
+                Tracer.save(parser.value(traceOption))
+            except OSError as error:
+                print(QCoreApplication.translate("main", "{0}: {1}").format(parser.value(traceOption), error), file=sys.stderr)
+                result = result or 1
+
+        sys.exit(result)
+
+
+    from application_window import ApplicationWindow
+
+    Profiler.milestone("Imports done")
+
+    app = QApplication(sys.argv)
+    setupApplication(app)
+    app.setApplicationDisplayName("PyTabelo")
+
     # Command line
     parser = QCommandLineParser()
     parser.setApplicationDescription("{0} - A table editor based on Qt for Python".format(app.applicationName()))
     parser.addHelpOption()
     parser.addVersionOption()
     parser.addPositionalArgument("urls", QApplication.translate("main", "Documents to open."), "[urls...]")
+    profileOption = QCommandLineOption("profile", QApplication.translate("main", "Profile the session and write the statistics to <file>."), "file")
+    parser.addOption(profileOption)
+    profileStartupOption = QCommandLineOption("profile-startup", QApplication.translate("main", "Profile the startup only."))
+    parser.addOption(profileStartupOption)
+    detectStallsOption = QCommandLineOption("detect-stalls", QApplication.translate("main", "Log the main thread's stack whenever the event loop is blocked longer than <ms> milliseconds."), "ms")
+    parser.addOption(detectStallsOption)
     parser.process(app)
 
+    profileFilename = ""
+    if parser.isSet(profileStartupOption) or parser.isSet(profileOption):
+        profileFilename = parser.value(profileOption) or "pytabelo-startup.prof"
+        Profiler.start()
+    elif Profiler.isRunning():
+        Profiler.stop(None)
+
+    if parser.isSet(detectStallsOption):
+        try:
+            threshold = int(parser.value(detectStallsOption))
+        except ValueError:
+            threshold = 0
+        if threshold < 1:
+            print(QApplication.translate("main", "--detect-stalls: expected a whole number of milliseconds of at least 1, got {0}").format(parser.value(detectStallsOption)), file=sys.stderr)
+            sys.exit(2)
+
+        stallDetector = StallDetector(threshold, app)
+        stallDetector.start()
+
 
     #
     # Application window
 
     window = ApplicationWindow()
     window.show()
+    Profiler.milestone("First show")
+    window.restoreSession()
+    window.recoverJournals()
 
     urls = parser.positionalArguments()
     for url in urls:
         window.openDocument(QUrl.fromUserInput(url, QDir.currentPath(), QUrl.AssumeLocalFile))
 
+    if parser.isSet(profileStartupOption):
+
+        def stopStartupProfile():
+            Profiler.milestone("Event loop started")
+            Profiler.stop(profileFilename)
+
+        QTimer.singleShot(0, stopStartupProfile)
+
+
+    result = app.exec_()
+
+    if parser.isSet(detectStallsOption):
+        stallDetector.stop()
+
+    if Profiler.isRunning():
+        Profiler.milestone("Event loop finished")
+        Profiler.stop(profileFilename)
 
-    sys.exit(app.exec_())
+    sys.exit(result)
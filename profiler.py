@@ -0,0 +1,91 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import cProfile
+import sys
+import time
+
+
+class Profiler:
+
+    _origin = time.perf_counter()
+    _milestones = []
+    _profile = None
+
+
+    @staticmethod
+    def milestone(name):
+        """ Records a named point in time on the timeline while profiling. """
+        if Profiler._profile is None:
+            return None
+
+        Profiler._milestones.append((time.perf_counter() - Profiler._origin, name))
+
+
+    @staticmethod
+    def isRunning():
+        """  """
+        return Profiler._profile is not None
+
+
+    @staticmethod
+    def start():
+        """ Starts collecting cProfile statistics. """
+        if Profiler._profile is None:
+            Profiler._profile = cProfile.Profile()
+            Profiler._profile.enable()
+
+
+    @staticmethod
+    def stop(filename):
+        """ Stops collecting and writes the pstats file and a human-readable timeline next to it, unless filename is None. """
+        if Profiler._profile is None:
+            return None
+
+        Profiler._profile.disable()
+        profile = Profiler._profile
+        Profiler._profile = None
+
+        if filename is None:
+            Profiler._milestones.clear()
+            return None
+
+        profile.dump_stats(filename)
+
+        timeline = Profiler.timeline()
+        with open(filename + ".timeline.txt", "w", encoding="utf-8") as file:
+            file.write(timeline)
+
+        print(timeline, end="", file=sys.stderr)
+
+
+    @staticmethod
+    def timeline():
+        """ Returns the recorded milestones, one per line, in milliseconds since startup. """
+        lines = []
+        previous = 0.0
+        for elapsed, name in Profiler._milestones:
+            lines.append("{0:10.1f} ms  (+{1:8.1f} ms)  {2}\n".format(elapsed * 1000, (elapsed - previous) * 1000, name))
+            previous = elapsed
+
+        return "".join(lines)
@@ -0,0 +1,219 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+class RangeIndex:
+
+    _nodeCapacity = 16
+    _bufferCapacity = 256
+
+
+    def __init__(self):
+        """ Spatial index of values attached to rectangular cell ranges: merged regions, comments, hyperlinks, ...
+
+        Ranges live in R-trees packed by sort-tile-recursive bulk loading, so that a query visits
+        O(log n + k) nodes per tree. New ranges go to a small buffer scanned linearly; a full buffer
+        becomes a tree of its own, and trees of similar size are packed together, so that there are
+        O(log n) trees and each range is packed O(log n) times. Removed ranges are skipped until
+        enough of them accumulate to pack everything again. """
+        self._entries = {}
+        self._nextKey = 0
+
+        # Trees as (keys, root), largest first
+        self._trees = []
+        self._buffer = []
+        self._removed = set()
+
+
+    def __len__(self):
+        """  """
+        return len(self._entries)
+
+
+    #
+    # Changes
+    #
+
+    def insert(self, top, left, bottom, right, value=None):
+        """ Adds the value for the cells from top, left to bottom, right (inclusive) and returns its key. """
+        key = self._nextKey
+        self._nextKey += 1
+
+        self._entries[key] = (top, left, bottom, right, value)
+        self._buffer.append(key)
+        if len(self._buffer) > self._bufferCapacity:
+            self._packBuffer()
+
+        return key
+
+
+    def insertMany(self, ranges):
+        """ Adds the (top, left, bottom, right, value) ranges at once, packing once, and returns their keys. """
+        keys = []
+        for top, left, bottom, right, value in ranges:
+            key = self._nextKey
+            self._nextKey += 1
+
+            self._entries[key] = (top, left, bottom, right, value)
+            keys.append(key)
+
+        if keys:
+            self._buffer.extend(keys)
+            self._packBuffer()
+
+        return keys
+
+
+    def remove(self, key):
+        """  """
+        if self._entries.pop(key, None) is None:
+            return None
+
+        if key in self._buffer:
+            self._buffer.remove(key)
+            return
+
+        self._removed.add(key)
+        if len(self._removed) > max(self._bufferCapacity, len(self._entries) // 4):
+            self._pack()
+
+
+    def clear(self):
+        """  """
+        self._entries.clear()
+        self._trees.clear()
+        self._buffer.clear()
+        self._removed.clear()
+
+
+    def entry(self, key):
+        """ Returns (top, left, bottom, right, value) of the key. """
+        return self._entries[key]
+
+
+    #
+    # Packing
+    #
+
+    def _pack(self):
+        """ Packs all entries into a single tree. """
+        keys = list(self._entries)
+
+        self._trees = [(keys, self._packTree(keys))] if keys else []
+        self._buffer.clear()
+        self._removed.clear()
+
+
+    def _packBuffer(self):
+        """ Turns the buffer into a tree, packing it together with the smaller trees of similar size. """
+        keys = self._buffer
+        self._buffer = []
+
+        while self._trees and len(self._trees[-1][0]) <= 2 * len(keys):
+            keys = self._trees.pop()[0] + keys
+
+        # Removed ranges are dropped for good
+        self._removed.difference_update(keys)
+        keys = [key for key in keys if key in self._entries]
+        if keys:
+            self._trees.append((keys, self._packTree(keys)))
+
+
+    def _packTree(self, keys):
+        """ Builds the R-tree of the entries of the keys by sort-tile-recursive packing. """
+        capacity = self._nodeCapacity
+
+        # Leaf level: (top, left, bottom, right, key)
+        level = [self._entries[key][:4] + (key,) for key in keys]
+        level = self._packLevel(level, True)
+        while len(level) > capacity:
+            level = self._packLevel(level, False)
+
+        return level[0] if len(level) == 1 else self._node(level, False)
+
+
+    def _packLevel(self, items, leaf):
+        """ Groups the items into nodes of sibling rectangles close to each other. """
+        capacity = self._nodeCapacity
+
+        nodeCount = -(-len(items) // capacity)
+        sliceCount = max(1, round(nodeCount ** 0.5))
+        sliceSize = -(-len(items) // sliceCount)
+
+        items = sorted(items, key=lambda item: item[0] + item[2])
+
+        nodes = []
+        for start in range(0, len(items), sliceSize):
+            band = sorted(items[start:start + sliceSize], key=lambda item: item[1] + item[3])
+            for first in range(0, len(band), capacity):
+                nodes.append(self._node(band[first:first + capacity], leaf))
+
+        return nodes
+
+
+    @staticmethod
+    def _node(children, leaf):
+        """ Returns a node (top, left, bottom, right, leaf, children) bounding the children. """
+        return (min(child[0] for child in children), min(child[1] for child in children),
+                max(child[2] for child in children), max(child[3] for child in children),
+                leaf, children)
+
+
+    #
+    # Queries
+    #
+
+    def intersecting(self, top, left, bottom, right):
+        """ Returns the keys of the ranges intersecting the cells from top, left to bottom, right. """
+        keys = []
+
+        stack = [root for _, root in self._trees]
+        while stack:
+            nodeTop, nodeLeft, nodeBottom, nodeRight, leaf, children = stack.pop()
+            if nodeTop > bottom or nodeBottom < top or nodeLeft > right or nodeRight < left:
+                continue
+
+            for child in children:
+                if child[0] > bottom or child[2] < top or child[1] > right or child[3] < left:
+                    continue
+                if not leaf:
+                    stack.append(child)
+                elif child[4] not in self._removed:
+                    keys.append(child[4])
+
+        for key in self._buffer:
+            entry = self._entries.get(key)
+            if entry is not None and not (entry[0] > bottom or entry[2] < top or entry[1] > right or entry[3] < left):
+                keys.append(key)
+
+        return keys
+
+
+    def at(self, row, column):
+        """ Returns the keys of the ranges covering the cell. """
+        return self.intersecting(row, column, row, column)
+
+
+    def values(self, top, left, bottom, right):
+        """ Returns the entries (top, left, bottom, right, value) intersecting the cells, in insertion order. """
+        return [self._entries[key] for key in sorted(self.intersecting(top, left, bottom, right))]
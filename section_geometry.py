@@ -0,0 +1,231 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+class SectionGeometry:
+
+    def __init__(self, count=0, defaultSize=30, chunkSize=4096):
+        """ Sizes and positions of rows or columns.
+
+        Sections are grouped into chunks; a Fenwick tree over the chunk lengths and, for chunks
+        with resized sections only, a Fenwick tree over the section sizes give O(log n) updates
+        and position queries. Untouched chunks cost no memory beyond their tree entry. """
+        self._defaultSize = defaultSize
+        self._chunkSize = chunkSize
+        self._count = 0
+        self._chunkTree = [0]
+        self._chunks = {}
+
+        self.setCount(count)
+
+
+    #
+    # Fenwick tree helpers
+    #
+
+    @staticmethod
+    def _build(values):
+        """ Returns a Fenwick tree (1-based) over the values, built in O(n). """
+        tree = [0] + list(values)
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+
+        return tree
+
+
+    @staticmethod
+    def _add(tree, index, delta):
+        """ Adds delta to the value at the 0-based index. """
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+
+    @staticmethod
+    def _prefix(tree, count):
+        """ Returns the sum of the first count values. """
+        total = 0
+        i = count
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+
+        return total
+
+
+    @staticmethod
+    def _search(tree, value):
+        """ Returns the number of leading values whose sum does not exceed value, and that sum. """
+        index = 0
+        total = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nextIndex = index + step
+            if nextIndex < len(tree) and total + tree[nextIndex] <= value:
+                index = nextIndex
+                total += tree[nextIndex]
+            step >>= 1
+
+        return index, total
+
+
+    #
+    # Geometry
+    #
+
+    def _chunkCount(self, chunk):
+        """ Returns the number of sections in the given chunk. """
+        return min(self._chunkSize, self._count - chunk * self._chunkSize)
+
+
+    def count(self):
+        """  """
+        return self._count
+
+
+    def setCount(self, count):
+        """ Resizes to count sections; new sections get the default size. O(n / chunk size) """
+        self._count = count
+        chunkCount = -(-count // self._chunkSize)
+
+        # Drop, truncate or extend the resized sections of the affected chunks
+        for chunk in list(self._chunks):
+            if chunk >= chunkCount:
+                del self._chunks[chunk]
+                continue
+
+            sizes = self._chunks[chunk][0]
+            if len(sizes) != self._chunkCount(chunk):
+                sizes = sizes[:self._chunkCount(chunk)]
+                sizes += [self._defaultSize] * (self._chunkCount(chunk) - len(sizes))
+                self._chunks[chunk] = (sizes, self._build(sizes))
+
+        self._chunkTree = self._build(self._chunkLength(chunk) for chunk in range(chunkCount))
+
+
+    def insertSections(self, first, count):
+        """ Inserts count sections of the default size before the first; later sections keep their sizes. """
+        self._moveSections(first, count)
+
+
+    def removeSections(self, first, count):
+        """ Removes count sections from the first on; later sections keep their sizes. """
+        self._moveSections(first, -count)
+
+
+    def _moveSections(self, first, delta):
+        """ Shifts the resized sections from the first on by delta. O(n / chunk size + resized sections) """
+        resized = list(self.resizedSections())
+
+        self._chunks = {}
+        self.setCount(self._count + delta)
+
+        for section, size in resized:
+            if section >= first:
+                if section < first - delta:
+                    continue
+                section += delta
+            self.setSize(section, size)
+
+
+    def _chunkLength(self, chunk):
+        """  """
+        if chunk in self._chunks:
+            tree = self._chunks[chunk][1]
+            return self._prefix(tree, len(tree) - 1)
+
+        return self._chunkCount(chunk) * self._defaultSize
+
+
+    def length(self):
+        """ Returns the total length of all sections. """
+        return self._prefix(self._chunkTree, len(self._chunkTree) - 1)
+
+
+    def size(self, section):
+        """  """
+        chunk, offset = divmod(section, self._chunkSize)
+        if chunk in self._chunks:
+            return self._chunks[chunk][0][offset]
+
+        return self._defaultSize
+
+
+    def setSize(self, section, size):
+        """ Resizes one section. O(log n) """
+        chunk, offset = divmod(section, self._chunkSize)
+
+        if chunk not in self._chunks:
+            if size == self._defaultSize:
+                return None
+            sizes = [self._defaultSize] * self._chunkCount(chunk)
+            self._chunks[chunk] = (sizes, self._build(sizes))
+
+        sizes, tree = self._chunks[chunk]
+        delta = size - sizes[offset]
+        if delta:
+            sizes[offset] = size
+            self._add(tree, offset, delta)
+            self._add(self._chunkTree, chunk, delta)
+
+
+    def resizedSections(self, first=0, last=None):
+        """ Yields (section, size) for the sections first to last not of the default size. """
+        last = self._count - 1 if last is None else last
+
+        for chunk in sorted(self._chunks):
+            start = chunk * self._chunkSize
+            if start > last or start + self._chunkSize <= first:
+                continue
+
+            for offset, size in enumerate(self._chunks[chunk][0]):
+                if size != self._defaultSize and first <= start + offset <= last:
+                    yield start + offset, size
+
+
+    def position(self, section):
+        """ Returns the start position of the section. O(log n) """
+        chunk, offset = divmod(section, self._chunkSize)
+
+        position = self._prefix(self._chunkTree, chunk)
+        if chunk in self._chunks:
+            return position + self._prefix(self._chunks[chunk][1], offset)
+
+        return position + offset * self._defaultSize
+
+
+    def sectionAt(self, position):
+        """ Returns the section covering the position, or -1 if it lies outside. O(log n) """
+        if position < 0 or position >= self.length():
+            return -1
+
+        chunk, start = self._search(self._chunkTree, position)
+        if chunk in self._chunks:
+            offset, _ = self._search(self._chunks[chunk][1], position - start)
+        else:
+            offset = (position - start) // self._defaultSize
+
+        return chunk * self._chunkSize + offset
@@ -0,0 +1,495 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import heapq
+import random
+import sys
+
+from PySide2.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+from PySide2.QtGui import QBrush, QColor, QFont
+
+from cell_styles import CellStyles
+from conditional_formats import ConditionalFormats
+from interval_set import IntervalSet
+from range_index import RangeIndex
+
+
+class SheetModel(QAbstractTableModel):
+
+    chunkSize = 4096
+
+    rangeKinds = ("merges", "comments", "hyperlinks", "validations")
+
+    cellsMerged = Signal(int, int, int, int)
+
+    # Sheet row, column and new value of a cell edited by the user
+    cellEdited = Signal(int, int, object)
+
+
+    def __init__(self, rows=None, parent=None):
+        """  """
+        super().__init__(parent=parent)
+
+        self._rows = rows if rows is not None else []
+        self._columnCount = max((len(row) for row in self._rows), default=0)
+
+        # Per column and chunk of rows: (text length, row) of the longest cell
+        self._longest = {}
+        self._updateLongest(0, len(self._rows))
+
+        self._cellStyles = CellStyles()
+        self._conditionalFormats = ConditionalFormats(self._rows, self._cellStyles, self.chunkSize)
+        self._styleRoles = {}
+
+        # Range-attached metadata
+        self._rangeIndexes = {kind: RangeIndex() for kind in self.rangeKinds}
+
+        # Hidden sections, by hand and by collapsed groups, remap view indexes to sheet indexes
+        self._hiddenSections = {Qt.Vertical: IntervalSet(), Qt.Horizontal: IntervalSet()}
+        self._groups = {Qt.Vertical: [], Qt.Horizontal: []}
+        self._hidden = {Qt.Vertical: IntervalSet(), Qt.Horizontal: IntervalSet()}
+
+
+    @staticmethod
+    def columnName(column):
+        """ Returns the spreadsheet name of the given column: A, B, ..., Z, AA, AB, ... """
+        name = ""
+        column += 1
+        while column:
+            column, remainder = divmod(column - 1, 26)
+            name = chr(ord("A") + remainder) + name
+
+        return name
+
+
+    def rows(self):
+        """  """
+        return self._rows
+
+
+    def memoryUsage(self, sampleSize=10000):
+        """ Returns the estimated bytes of the row lists and of the cells of each column.
+
+        Large sheets are estimated from a random sample of rows. """
+        rows = self._rows
+        sample = rows if len(rows) <= sampleSize else random.sample(rows, sampleSize)
+        scale = len(rows) / len(sample) if sample else 0
+
+        rowBytes = 0
+        columnBytes = [0] * self._columnCount
+        for row in sample:
+            rowBytes += sys.getsizeof(row)
+            for column, value in enumerate(row):
+                columnBytes[column] += sys.getsizeof(value)
+
+        return int(rowBytes * scale + sys.getsizeof(rows)), [int(size * scale) for size in columnBytes]
+
+
+    def appendRows(self, rows):
+        """  """
+        if not rows:
+            return None
+
+        # Appended rows and columns are visible, after the last visible ones
+        columnCount = max(self._columnCount, max(len(row) for row in rows))
+        if columnCount > self._columnCount:
+            self.beginInsertColumns(QModelIndex(), self.columnCount(), self.columnCount() + columnCount - self._columnCount - 1)
+            self._columnCount = columnCount
+            self.endInsertColumns()
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount() + len(rows) - 1)
+        self._rows.extend(rows)
+        self._updateLongest(first, len(self._rows))
+        self._conditionalFormats.rowsAppended(first, len(self._rows))
+        self.endInsertRows()
+
+
+    def rowCount(self, parent=QModelIndex()):
+        """  """
+        return len(self._rows) - self._hidden[Qt.Vertical].length() if not parent.isValid() else 0
+
+
+    def columnCount(self, parent=QModelIndex()):
+        """  """
+        return self._columnCount - self._hidden[Qt.Horizontal].length() if not parent.isValid() else 0
+
+
+    def data(self, index, role=Qt.DisplayRole):
+        """  """
+        if not index.isValid():
+            return None
+
+        rowIndex = self.sourceSection(Qt.Vertical, index.row())
+        column = self.sourceSection(Qt.Horizontal, index.column())
+
+        if role in (Qt.FontRole, Qt.ForegroundRole, Qt.BackgroundRole, Qt.TextAlignmentRole):
+            styleId = self._cellStyles.styleIdAt(rowIndex, column)
+            if self._conditionalFormats.hasRules():
+                styleId = self._cellStyles.combine([styleId, self._conditionalFormats.styleIdAt(rowIndex, column)])
+            return self._styleRole(styleId, role)
+
+        if role == Qt.ToolTipRole:
+            return self._toolTip(rowIndex, column)
+
+        if role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+
+        row = self._rows[rowIndex]
+        return row[column] if column < len(row) else ""
+
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """  """
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+
+        rowIndex = self.sourceSection(Qt.Vertical, index.row())
+        column = self.sourceSection(Qt.Horizontal, index.column())
+
+        if not self.isValidValue(rowIndex, column, value):
+            return False
+
+        self._setCell(rowIndex, column, value)
+
+        # Only the edited cell is repainted
+        self.dataChanged.emit(index, index, [role])
+        self.cellEdited.emit(rowIndex, column, value)
+        return True
+
+
+    def setCellValue(self, row, column, value):
+        """ Sets a cell by sheet row and column, growing the sheet if needed; used to replay edits. """
+        if row >= len(self._rows):
+            self.appendRows([[] for _ in range(row + 1 - len(self._rows))])
+
+        if column >= self._columnCount:
+            self.beginInsertColumns(QModelIndex(), self.columnCount(), self.columnCount() + column - self._columnCount)
+            self._columnCount = column + 1
+            self.endInsertColumns()
+
+        self._setCell(row, column, value)
+
+        viewRow = self.viewSection(Qt.Vertical, row)
+        viewColumn = self.viewSection(Qt.Horizontal, column)
+        if viewRow >= 0 and viewColumn >= 0:
+            index = self.index(viewRow, viewColumn)
+            self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+
+
+    def _setCell(self, rowIndex, column, value):
+        """  """
+        row = self._rows[rowIndex]
+        if column >= len(row):
+            row.extend([""] * (column + 1 - len(row)))
+        oldValue = row[column]
+        row[column] = value
+        self._updateLongestCell(rowIndex, column)
+        self._conditionalFormats.cellChanged(rowIndex, column, oldValue)
+
+
+    def flags(self, index):
+        """  """
+        return super().flags(index) | Qt.ItemIsEditable if index.isValid() else Qt.NoItemFlags
+
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """  """
+        if role != Qt.DisplayRole:
+            return None
+
+        # Sheet numbering, so that hidden sections show as gaps
+        section = self.sourceSection(orientation, section)
+        return self.columnName(section) if orientation == Qt.Horizontal else str(section + 1)
+
+
+    #
+    # Hidden sections and groups
+    #
+
+    def sourceSection(self, orientation, section):
+        """ Returns the sheet row or column shown at the view row or column. """
+        hidden = self._hidden[orientation]
+        return hidden.nthAbsent(section) if hidden else section
+
+
+    def viewSection(self, orientation, section):
+        """ Returns the view row or column showing the sheet row or column, or -1 if it is hidden. """
+        hidden = self._hidden[orientation]
+        if not hidden:
+            return section
+
+        return section - hidden.countBefore(section) if not hidden.contains(section) else -1
+
+
+    def viewSpan(self, orientation, first, last):
+        """ Returns the first and last view sections showing the sheet sections first to last; last < first if none. """
+        hidden = self._hidden[orientation]
+        return first - hidden.countBefore(first), last - hidden.countBefore(last + 1)
+
+
+    def hiddenSections(self, orientation):
+        """ Returns the hidden rows (Qt.Vertical) or columns (Qt.Horizontal) as an interval set. """
+        return self._hidden[orientation]
+
+
+    def isSectionHidden(self, orientation, section):
+        """  """
+        return self._hidden[orientation].contains(section)
+
+
+    def setSectionsHidden(self, orientation, first, last, hidden):
+        """ Hides or shows the sheet rows or columns first to last, one interval operation. """
+        if hidden:
+            self._hiddenSections[orientation].add(first, last)
+        else:
+            self._hiddenSections[orientation].remove(first, last)
+
+        self._updateHidden(orientation)
+
+
+    def showAllSections(self, orientation):
+        """ Shows the sections hidden by hand and expands all groups. """
+        self._hiddenSections[orientation].clear()
+        for group in self._groups[orientation]:
+            group[2] = False
+
+        self._updateHidden(orientation)
+
+
+    def groups(self, orientation):
+        """ Returns the outline groups as (first, last, collapsed) of sheet sections. """
+        return [tuple(group) for group in self._groups[orientation]]
+
+
+    def addGroup(self, orientation, first, last):
+        """ Adds an expanded outline group and returns its index. """
+        self._groups[orientation].append([first, last, False])
+        return len(self._groups[orientation]) - 1
+
+
+    def removeGroup(self, orientation, group):
+        """  """
+        del self._groups[orientation][group]
+        self._updateHidden(orientation)
+
+
+    def setGroupCollapsed(self, orientation, group, collapsed):
+        """ Collapses or expands an outline group, one interval operation whatever its size. """
+        self._groups[orientation][group][2] = collapsed
+        self._updateHidden(orientation)
+
+
+    def groupAt(self, orientation, section):
+        """ Returns the index of the innermost group containing the sheet section, or ending right before it, or -1. """
+        best = -1
+        for index, (first, last, collapsed) in enumerate(self._groups[orientation]):
+            if first <= section <= last + 1 and (best < 0 or last - first < self._groups[orientation][best][1] - self._groups[orientation][best][0]):
+                best = index
+
+        return best
+
+
+    def _updateHidden(self, orientation):
+        """ Hides and shows the sections that changed, as contiguous view ranges. """
+        count = len(self._rows) if orientation == Qt.Vertical else self._columnCount
+
+        target = self._hiddenSections[orientation].copy()
+        for first, last, collapsed in self._groups[orientation]:
+            if collapsed:
+                target.add(first, last)
+        target = target.clipped(count)
+
+        hidden = self._hidden[orientation]
+        begin, end = (self.beginRemoveRows, self.endRemoveRows) if orientation == Qt.Vertical else (self.beginRemoveColumns, self.endRemoveColumns)
+        for first, last in target.difference(hidden):
+            viewFirst, viewLast = self.viewSpan(orientation, first, last)
+            begin(QModelIndex(), viewFirst, viewLast)
+            hidden.add(first, last)
+            end()
+
+        begin, end = (self.beginInsertRows, self.endInsertRows) if orientation == Qt.Vertical else (self.beginInsertColumns, self.endInsertColumns)
+        for first, last in hidden.difference(target):
+            viewFirst = first - hidden.countBefore(first)
+            begin(QModelIndex(), viewFirst, viewFirst + last - first)
+            hidden.remove(first, last)
+            end()
+
+
+    #
+    # Cell styles
+    #
+
+    def cellStyles(self):
+        """  """
+        return self._cellStyles
+
+
+    def setCellStyle(self, top, left, bottom, right, style):
+        """ Applies the style (a dict of attributes) to a range of cells; None for bottom or right is unbounded.
+
+        Attributes are bold, italic, underline, foreground, background (color names) and alignment (Qt.Alignment). """
+        self._cellStyles.apply(top, left, bottom, right, style)
+
+        # Repaint the visible part of the range
+        bottom = len(self._rows) - 1 if bottom is None else min(bottom, len(self._rows) - 1)
+        right = self._columnCount - 1 if right is None else min(right, self._columnCount - 1)
+        top, bottom = self.viewSpan(Qt.Vertical, top, bottom)
+        left, right = self.viewSpan(Qt.Horizontal, left, right)
+        if top <= bottom and left <= right:
+            self.dataChanged.emit(self.index(top, left), self.index(bottom, right), [Qt.FontRole, Qt.ForegroundRole, Qt.BackgroundRole, Qt.TextAlignmentRole])
+
+
+    def conditionalFormats(self):
+        """  """
+        return self._conditionalFormats
+
+
+    def addConditionalRule(self, rule):
+        """ Adds a conditional formatting rule (see conditional_formats) and repaints its column. """
+        self._conditionalFormats.addRule(rule)
+
+        column = self.viewSection(Qt.Horizontal, rule.column) if rule.column < self._columnCount else -1
+        if column >= 0 and self.rowCount():
+            self.dataChanged.emit(self.index(0, column), self.index(self.rowCount() - 1, column), [Qt.FontRole, Qt.ForegroundRole, Qt.BackgroundRole, Qt.TextAlignmentRole])
+
+
+    def _styleRole(self, styleId, role):
+        """ Returns the value of the role for the style; the Qt objects are created once per style. """
+        if not styleId:
+            return None
+
+        values = self._styleRoles.get(styleId)
+        if values is None:
+            style = self._cellStyles.style(styleId)
+            values = {}
+
+            if style.get("bold") or style.get("italic") or style.get("underline"):
+                font = QFont()
+                font.setBold(bool(style.get("bold")))
+                font.setItalic(bool(style.get("italic")))
+                font.setUnderline(bool(style.get("underline")))
+                values[Qt.FontRole] = font
+            if style.get("foreground"):
+                values[Qt.ForegroundRole] = QBrush(QColor(style["foreground"]))
+            if style.get("background"):
+                values[Qt.BackgroundRole] = QBrush(QColor(style["background"]))
+            if style.get("alignment") is not None:
+                values[Qt.TextAlignmentRole] = int(style["alignment"])
+
+            self._styleRoles[styleId] = values
+
+        return values.get(role)
+
+
+    #
+    # Range metadata
+    #
+
+    def rangeIndex(self, kind):
+        """ Returns the range index of the given kind, one of rangeKinds. """
+        return self._rangeIndexes[kind]
+
+
+    def mergeCells(self, top, left, bottom, right):
+        """  """
+        self._rangeIndexes["merges"].insert(top, left, bottom, right)
+        self.cellsMerged.emit(top, left, bottom, right)
+
+
+    def mergedRegionAt(self, row, column):
+        """ Returns (top, left, bottom, right) of the merged region covering the cell, or None. """
+        entries = self._rangeIndexes["merges"].values(row, column, row, column)
+        return entries[-1][:4] if entries else None
+
+
+    def addComment(self, row, column, text):
+        """  """
+        self._rangeIndexes["comments"].insert(row, column, row, column, text)
+
+
+    def addHyperlink(self, top, left, bottom, right, url):
+        """  """
+        self._rangeIndexes["hyperlinks"].insert(top, left, bottom, right, url)
+
+
+    def addValidation(self, top, left, bottom, right, validator):
+        """ Rejects edits of the cells whose value the validator, a callable, does not accept. """
+        self._rangeIndexes["validations"].insert(top, left, bottom, right, validator)
+
+
+    def isValidValue(self, row, column, value):
+        """  """
+        return all(entry[4](value) for entry in self._rangeIndexes["validations"].values(row, column, row, column))
+
+
+    def _toolTip(self, row, column):
+        """ Returns the comments of the cell, or else its hyperlink. """
+        comments = self._rangeIndexes["comments"].values(row, column, row, column)
+        if comments:
+            return "\n".join(entry[4] for entry in comments)
+
+        hyperlinks = self._rangeIndexes["hyperlinks"].values(row, column, row, column)
+        return hyperlinks[-1][4] if hyperlinks else None
+
+
+    #
+    # Column statistics
+    #
+
+    def _updateLongest(self, first, last):
+        """ Updates the longest cells for the rows first to last (exclusive). """
+        for rowIndex in range(first, last):
+            chunk = rowIndex // self.chunkSize
+            for column, value in enumerate(self._rows[rowIndex]):
+                chunks = self._longest.setdefault(column, [])
+                if len(chunks) <= chunk:
+                    chunks.extend([(-1, -1)] * (chunk + 1 - len(chunks)))
+                if len(str(value)) > chunks[chunk][0]:
+                    chunks[chunk] = (len(str(value)), rowIndex)
+
+
+    def _updateLongestCell(self, rowIndex, column):
+        """  """
+        chunk = rowIndex // self.chunkSize
+        chunks = self._longest.setdefault(column, [])
+        if len(chunks) <= chunk:
+            chunks.extend([(-1, -1)] * (chunk + 1 - len(chunks)))
+
+        length = len(str(self._rows[rowIndex][column]))
+        if length > chunks[chunk][0]:
+            chunks[chunk] = (length, rowIndex)
+
+        elif chunks[chunk][1] == rowIndex:
+            # The longest cell got shorter; rescan its chunk
+            chunks[chunk] = (-1, -1)
+            for candidate in range(chunk * self.chunkSize, min(len(self._rows), (chunk + 1) * self.chunkSize)):
+                row = self._rows[candidate]
+                if column < len(row) and len(str(row[column])) > chunks[chunk][0]:
+                    chunks[chunk] = (len(str(row[column])), candidate)
+
+
+    def longestRows(self, column, count):
+        """ Returns up to count rows holding the longest texts of the column, one per chunk of rows. """
+        chunks = self._longest.get(column, [])
+        return [row for length, row in heapq.nlargest(count, chunks) if row >= 0]
@@ -0,0 +1,207 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from PySide2.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt, Signal
+from PySide2.QtWidgets import QAbstractItemView, QHBoxLayout, QLineEdit, QListView, QMenu, QWidget
+
+
+class SheetListModel(QAbstractListModel):
+
+    def __init__(self, parent=None):
+        """  """
+        super().__init__(parent=parent)
+
+        self._names = []
+
+
+    def names(self):
+        """  """
+        return list(self._names)
+
+
+    def insertNames(self, row, names):
+        """  """
+        if not names:
+            return None
+
+        self.beginInsertRows(QModelIndex(), row, row + len(names) - 1)
+        self._names[row:row] = names
+        self.endInsertRows()
+
+
+    def removeName(self, row):
+        """  """
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._names[row]
+        self.endRemoveRows()
+
+
+    def rowCount(self, parent=QModelIndex()):
+        """  """
+        return len(self._names) if not parent.isValid() else 0
+
+
+    def data(self, index, role=Qt.DisplayRole):
+        """  """
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole, Qt.ToolTipRole):
+            return None
+
+        return self._names[index.row()]
+
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """  """
+        if not index.isValid() or role != Qt.EditRole or not value.strip():
+            return False
+
+        self._names[index.row()] = value.strip()
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole, Qt.ToolTipRole])
+        return True
+
+
+    def flags(self, index):
+        """  """
+        return super().flags(index) | Qt.ItemIsEditable if index.isValid() else Qt.NoItemFlags
+
+
+class SheetNavigator(QWidget):
+
+    currentChanged = Signal(int)
+    closeRequested = Signal(int)
+
+
+    def __init__(self, model, parent=None):
+        """ A searchable strip of sheet names.
+
+        The list view is virtualized: it creates no widget per sheet and only lays out and paints
+        the visible names, so that workbooks with thousands of sheets stay responsive. """
+        super().__init__(parent=parent)
+
+        self._model = model
+
+        # The shown sheet; filtering moves the current item of the list but never switches the sheet
+        self._currentIndex = -1
+        self._filtering = False
+
+        self._proxy = QSortFilterProxyModel(self)
+        self._proxy.setSourceModel(model)
+        self._proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+        self._search = QLineEdit()
+        self._search.setPlaceholderText(self.tr("Find Sheet"))
+        self._search.setClearButtonEnabled(True)
+        self._search.setMaximumWidth(self.fontMetrics().averageCharWidth() * 20)
+        self._search.textChanged.connect(self._slotSearch)
+        self._search.returnPressed.connect(self._slotActivateFirstMatch)
+
+        self._list = QListView()
+        self._list.setModel(self._proxy)
+        self._list.setFlow(QListView.LeftToRight)
+        self._list.setWrapping(False)
+        self._list.setUniformItemSizes(True)
+        self._list.setLayoutMode(QListView.Batched)
+        self._list.setTextElideMode(Qt.ElideMiddle)
+        self._list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self._list.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        self._list.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self._list.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self._list.setFixedHeight(self.fontMetrics().height() * 2 + 4)
+        self._list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self._list.customContextMenuRequested.connect(self._slotContextMenu)
+        self._list.selectionModel().currentChanged.connect(self._slotCurrentChanged)
+
+        # Main layout
+        mainLayout = QHBoxLayout()
+        mainLayout.setContentsMargins(0, 0, 0, 0)
+        mainLayout.addWidget(self._search)
+        mainLayout.addWidget(self._list, 1)
+        self.setLayout(mainLayout)
+
+
+    def currentIndex(self):
+        """ Returns the current sheet index, or -1. """
+        return self._currentIndex
+
+
+    def setCurrentIndex(self, index):
+        """  """
+        proxyIndex = self._proxy.mapFromSource(self._model.index(index, 0))
+        if not proxyIndex.isValid():
+            # Filtered out; the search would hide the current sheet
+            self._search.clear()
+            proxyIndex = self._proxy.mapFromSource(self._model.index(index, 0))
+
+        self._currentIndex = index
+        self._list.setCurrentIndex(proxyIndex)
+        self._list.scrollTo(proxyIndex)
+
+
+    def _slotCurrentChanged(self, current, previous):
+        """ Switches the sheet when the user moves to another name, not when the filter moves the current item. """
+        if self._filtering:
+            return None
+
+        index = self._proxy.mapToSource(current).row()
+        if index >= 0 and index != self._currentIndex:
+            self._currentIndex = index
+            self.currentChanged.emit(index)
+
+
+    def _slotSearch(self, text):
+        """ Filters the names; the current item stays on the shown sheet, or none if it is filtered out. """
+        self._filtering = True
+        try:
+            self._proxy.setFilterFixedString(text)
+
+            proxyIndex = self._proxy.mapFromSource(self._model.index(self._currentIndex, 0))
+            if proxyIndex.isValid():
+                self._list.setCurrentIndex(proxyIndex)
+            else:
+                self._list.selectionModel().clear()
+        finally:
+            self._filtering = False
+
+
+    def _slotActivateFirstMatch(self):
+        """  """
+        if self._proxy.rowCount():
+            self._list.setCurrentIndex(self._proxy.index(0, 0))
+            self._list.scrollTo(self._proxy.index(0, 0))
+
+
+    def _slotContextMenu(self, pos):
+        """  """
+        proxyIndex = self._list.indexAt(pos)
+        if not proxyIndex.isValid():
+            return None
+
+        menu = QMenu(self)
+        actionRename = menu.addAction(self.tr("&Rename Sheet"))
+        actionClose = menu.addAction(self.tr("&Close Sheet"))
+        actionClose.setEnabled(self._model.rowCount() > 1)
+
+        action = menu.exec_(self._list.viewport().mapToGlobal(pos))
+        if action == actionRename:
+            self._list.edit(proxyIndex)
+        elif action == actionClose:
+            self.closeRequested.emit(self._proxy.mapToSource(proxyIndex).row())
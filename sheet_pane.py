@@ -0,0 +1,241 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from PySide2.QtCore import QItemSelection, QItemSelectionModel, Qt
+from PySide2.QtWidgets import QSplitter
+
+from sheet_model import SheetModel
+from sheet_view import SheetView
+
+
+class SheetPane(QSplitter):
+
+    def __init__(self, model=None, parent=None):
+        """ A sheet page: one sheet model and selection, shown by one view or two split views. """
+        super().__init__(parent=parent)
+
+        self.setChildrenCollapsible(False)
+
+        self._model = model if model is not None else SheetModel(parent=self)
+        self._selectionModel = QItemSelectionModel(self._model, self)
+
+        self.addWidget(self._createView())
+
+
+    def _createView(self):
+        """  """
+        view = SheetView(self._model)
+
+        selectionModel = view.selectionModel()
+        view.setSelectionModel(self._selectionModel)
+        selectionModel.deleteLater()
+
+        return view
+
+
+    def model(self):
+        """  """
+        return self._model
+
+
+    def selectionModel(self):
+        """  """
+        return self._selectionModel
+
+
+    def views(self):
+        """  """
+        return [self.widget(i) for i in range(self.count())]
+
+
+    def currentView(self):
+        """ Returns the view having the focus, or else the first view. """
+        for view in self.views():
+            if view.hasFocus():
+                return view
+
+        return self.widget(0)
+
+
+    #
+    # State
+    #
+
+    def saveState(self):
+        """ Returns the state of the views and the selection; the model keeps the data. """
+        current = self._selectionModel.currentIndex()
+        selection = [(selectionRange.top(), selectionRange.left(), selectionRange.bottom(), selectionRange.right()) for selectionRange in self._selectionModel.selection()]
+
+        return {
+            "orientation": self.orientation(),
+            "sizes": self.sizes(),
+            "views": [view.viewState() for view in self.views()],
+            "current": (current.row(), current.column()) if current.isValid() else None,
+            "selection": selection,
+        }
+
+
+    def restoreState(self, state):
+        """ Restores a state returned by saveState on a new pane of the same model. """
+        if len(state["views"]) > 1:
+            self.split(state["orientation"])
+            self.setSizes(state["sizes"])
+
+        for view, viewState in zip(self.views(), state["views"]):
+            view.restoreViewState(viewState)
+
+        if state["current"] is not None:
+            self._selectionModel.setCurrentIndex(self._model.index(*state["current"]), QItemSelectionModel.NoUpdate)
+
+        selection = QItemSelection()
+        for top, left, bottom, right in state["selection"]:
+            selection.select(self._model.index(top, left), self._model.index(bottom, right))
+        self._selectionModel.select(selection, QItemSelectionModel.ClearAndSelect)
+
+
+    #
+    # Split
+    #
+
+    def isSplit(self):
+        """  """
+        return self.count() > 1
+
+
+    def split(self, orientation=Qt.Vertical):
+        """ Splits the sheet into two views of the same model and selection.
+
+        Views stacked vertically share their horizontal scrolling, views side by side their vertical scrolling. """
+        if self.isSplit():
+            return None
+
+        first = self.widget(0)
+        second = self._createView()
+
+        for column in range(self._model.columnCount()):
+            second.setColumnWidth(column, first.columnWidth(column))
+
+        second.setFrozen(first.frozenRows(), first.frozenColumns())
+
+        self.setOrientation(orientation)
+        self.addWidget(second)
+
+        if orientation == Qt.Vertical:
+            first.horizontalScrollBar().valueChanged.connect(second.horizontalScrollBar().setValue)
+            second.horizontalScrollBar().valueChanged.connect(first.horizontalScrollBar().setValue)
+            first.horizontalHeader().sectionResized.connect(second.slotColumnResized)
+            second.horizontalHeader().sectionResized.connect(first.slotColumnResized)
+            second.horizontalScrollBar().setValue(first.horizontalScrollBar().value())
+        else:
+            first.verticalScrollBar().valueChanged.connect(second.verticalScrollBar().setValue)
+            second.verticalScrollBar().valueChanged.connect(first.verticalScrollBar().setValue)
+            second.verticalScrollBar().setValue(first.verticalScrollBar().value())
+
+        self.setSizes([1, 1])
+
+
+    def unsplit(self):
+        """ Removes the second view. """
+        if not self.isSplit():
+            return None
+
+        # Connections from the second view go with it, those from the first view are dropped here
+        first = self.widget(0)
+        view = self.widget(1)
+        if self.orientation() == Qt.Vertical:
+            first.horizontalScrollBar().valueChanged.disconnect(view.horizontalScrollBar().setValue)
+            first.horizontalHeader().sectionResized.disconnect(view.slotColumnResized)
+        else:
+            first.verticalScrollBar().valueChanged.disconnect(view.verticalScrollBar().setValue)
+
+        view.hide()
+        view.setParent(None)
+        view.deleteLater()
+
+
+    #
+    # Frozen panes
+    #
+
+    def isFrozen(self):
+        """  """
+        view = self.widget(0)
+        return bool(view.frozenRows() or view.frozenColumns())
+
+
+    def setFrozen(self, rows, columns):
+        """ Freezes the first rows and columns in all views. """
+        for view in self.views():
+            view.setFrozen(rows, columns)
+
+
+    #
+    # Hidden sections and groups
+    #
+
+    def _selectedSections(self, orientation):
+        """ Returns the sheet sections of the selection, or of the current cell, as (first, last) ranges. """
+        ranges = []
+        for selectionRange in self._selectionModel.selection():
+            if orientation == Qt.Vertical:
+                ranges.append((selectionRange.top(), selectionRange.bottom()))
+            else:
+                ranges.append((selectionRange.left(), selectionRange.right()))
+
+        current = self._selectionModel.currentIndex()
+        if not ranges and current.isValid():
+            section = current.row() if orientation == Qt.Vertical else current.column()
+            ranges.append((section, section))
+
+        return [(self._model.sourceSection(orientation, first), self._model.sourceSection(orientation, last)) for first, last in ranges]
+
+
+    def hideSelection(self, orientation):
+        """ Hides the selected rows (Qt.Vertical) or columns (Qt.Horizontal). """
+        for first, last in self._selectedSections(orientation):
+            self._model.setSectionsHidden(orientation, first, last, True)
+
+
+    def showAll(self):
+        """ Shows all hidden rows and columns. """
+        self._model.showAllSections(Qt.Vertical)
+        self._model.showAllSections(Qt.Horizontal)
+
+
+    def groupSelection(self, orientation):
+        """ Groups the selected rows or columns, as one outline group. """
+        ranges = self._selectedSections(orientation)
+        if ranges:
+            self._model.addGroup(orientation, min(first for first, last in ranges), max(last for first, last in ranges))
+
+
+    def toggleGroup(self, orientation):
+        """ Collapses or expands the group at the current row or column. """
+        current = self._selectionModel.currentIndex()
+        if not current.isValid():
+            return None
+
+        section = self._model.sourceSection(orientation, current.row() if orientation == Qt.Vertical else current.column())
+        group = self._model.groupAt(orientation, section)
+        if group >= 0:
+            self._model.setGroupCollapsed(orientation, group, not self._model.groups(orientation)[group][2])
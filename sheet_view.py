@@ -0,0 +1,512 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import random
+
+from PySide2.QtCore import QModelIndex, Qt, QTimer
+from PySide2.QtWidgets import QAbstractItemView, QFrame, QHeaderView, QTableView
+
+from cell_delegate import CellDelegate
+from section_geometry import SectionGeometry
+from sheet_model import SheetModel
+
+
+class SheetView(QTableView):
+
+    def __init__(self, model=None, parent=None):
+        """  """
+        super().__init__(parent=parent)
+
+        # Frozen rows and columns are shown by overlay views
+        self._frozenRows = 0
+        self._frozenColumns = 0
+        self._frozenViews = {}
+
+        self.setItemDelegate(CellDelegate(self))
+        self.setWordWrap(False)
+
+        # Fixed row heights, rows are never measured one by one
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 6)
+
+        # Row and column positions for O(log n) hit-testing with variable sizes
+        self._rowGeometry = SectionGeometry(0, self.verticalHeader().defaultSectionSize())
+        self._columnGeometry = SectionGeometry(0, self.horizontalHeader().defaultSectionSize())
+        self.verticalHeader().sectionResized.connect(self._rowResized)
+        self.horizontalHeader().sectionResized.connect(self._columnResized)
+
+        # Sizes of the resized rows and columns while they are hidden, by sheet row or column
+        self._hiddenSizes = {Qt.Vertical: {}, Qt.Horizontal: {}}
+
+        # Auto-fitted columns widen as more rows arrive
+        self._autoFitWidths = {}
+        self._autoFitTimer = QTimer(self)
+        self._autoFitTimer.setSingleShot(True)
+        self._autoFitTimer.setInterval(250)
+        self._autoFitTimer.timeout.connect(self._refineAutoFit)
+
+        # Scroll position of a restored view state, applied once the view is laid out
+        self._pendingScroll = None
+
+        self.setModel(model if model is not None else SheetModel(parent=self))
+
+
+    def setModel(self, model):
+        """  """
+        previous = self.model()
+        if previous is not None:
+            for signal, slot in self._modelConnections(previous):
+                signal.disconnect(slot)
+
+        super().setModel(model)
+
+        for signal, slot in self._modelConnections(model):
+            signal.connect(slot)
+        self._resetGeometry()
+
+        if isinstance(model, SheetModel):
+            for top, left, bottom, right, value in model.rangeIndex("merges").values(0, 0, model.rowCount(), model.columnCount()):
+                self._setMergedSpan(top, left, bottom, right)
+
+        if self._frozenViews:
+            self.setFrozen(self._frozenRows, self._frozenColumns)
+
+
+    def setSelectionModel(self, selectionModel):
+        """  """
+        super().setSelectionModel(selectionModel)
+
+        for view in self._frozenViews.values():
+            view.setSelectionModel(selectionModel)
+
+
+    def _modelConnections(self, model):
+        """ Returns the (signal, slot) pairs by which the view follows the model. """
+        connections = [
+            (model.modelReset, self._resetGeometry),
+            (model.rowsInserted, self._rowsInserted),
+            (model.rowsAboutToBeRemoved, self._rowsAboutToBeRemoved),
+            (model.rowsRemoved, self._rowsRemoved),
+            (model.columnsInserted, self._columnsInserted),
+            (model.columnsAboutToBeRemoved, self._columnsAboutToBeRemoved),
+            (model.columnsRemoved, self._columnsRemoved),
+            (model.rowsInserted, self._autoFitTimer.start),
+        ]
+        if isinstance(model, SheetModel):
+            connections.append((model.cellsMerged, self._setMergedSpan))
+
+        return connections
+
+
+    def _mergedSpan(self, top, left, bottom, right):
+        """ Returns the row, column, row span and column span of the visible part of the merged sheet range, or None. """
+        top, bottom = self.model().viewSpan(Qt.Vertical, top, bottom)
+        left, right = self.model().viewSpan(Qt.Horizontal, left, right)
+        if top <= bottom and left <= right:
+            return top, left, bottom - top + 1, right - left + 1
+
+        return None
+
+
+    def _setMergedSpan(self, top, left, bottom, right):
+        """ Spans the visible part of the merged sheet range, in the sheet and in the frozen overlays. """
+        span = self._mergedSpan(top, left, bottom, right)
+        if span is not None:
+            self.setSpan(*span)
+            for view in self._frozenViews.values():
+                view.setSpan(*span)
+
+
+    #
+    # Geometry
+    #
+
+    def _resetGeometry(self):
+        """ Takes the sizes from the headers; rows have fixed heights, the few columns are measured. """
+        self._rowGeometry = SectionGeometry(self.model().rowCount(), self.verticalHeader().defaultSectionSize())
+
+        header = self.horizontalHeader()
+        self._columnGeometry = SectionGeometry(self.model().columnCount(), header.defaultSectionSize())
+        for column in range(self.model().columnCount()):
+            self._columnGeometry.setSize(column, header.sectionSize(column))
+
+        self._hiddenSizes = {Qt.Vertical: {}, Qt.Horizontal: {}}
+
+
+    def _rowsInserted(self, parent, first, last):
+        """  """
+        self._rowGeometry.insertSections(first, last - first + 1)
+        self._restoreHiddenSizes(Qt.Vertical, first, last)
+
+
+    def _rowsAboutToBeRemoved(self, parent, first, last):
+        """  """
+        self._keepHiddenSizes(Qt.Vertical, self._rowGeometry, first, last)
+
+
+    def _rowsRemoved(self, parent, first, last):
+        """ Hidden rows are removed from the view; the rows after them keep their sizes. """
+        self._rowGeometry.removeSections(first, last - first + 1)
+
+
+    def _columnsInserted(self, parent, first, last):
+        """  """
+        self._columnGeometry.insertSections(first, last - first + 1)
+        self._restoreHiddenSizes(Qt.Horizontal, first, last)
+
+
+    def _columnsAboutToBeRemoved(self, parent, first, last):
+        """  """
+        self._keepHiddenSizes(Qt.Horizontal, self._columnGeometry, first, last)
+
+
+    def _columnsRemoved(self, parent, first, last):
+        """  """
+        self._columnGeometry.removeSections(first, last - first + 1)
+
+
+    def _keepHiddenSizes(self, orientation, geometry, first, last):
+        """ Remembers the sizes of the resized view sections first to last that are about to be hidden. """
+        if not isinstance(self.model(), SheetModel):
+            return None
+
+        for section, size in geometry.resizedSections(first, last):
+            self._hiddenSizes[orientation][self.model().sourceSection(orientation, section)] = size
+
+
+    def _restoreHiddenSizes(self, orientation, first, last):
+        """ Gives the view sections first to last that are shown again their sizes from before they were hidden. """
+        if not isinstance(self.model(), SheetModel):
+            return None
+
+        sizes = self._hiddenSizes[orientation]
+        for section in [section for section in sizes if first <= self.model().viewSection(orientation, section) <= last]:
+            viewSection = self.model().viewSection(orientation, section)
+            if orientation == Qt.Vertical:
+                self.setRowHeight(viewSection, sizes.pop(section))
+            else:
+                self.setColumnWidth(viewSection, sizes.pop(section))
+
+
+    def _rowResized(self, row, oldSize, newSize):
+        """  """
+        if row < self._rowGeometry.count():
+            self._rowGeometry.setSize(row, newSize)
+
+        for view in self._frozenViews.values():
+            view.setRowHeight(row, newSize)
+        self._updateFrozenGeometry()
+
+
+    def _columnResized(self, column, oldSize, newSize):
+        """  """
+        if column < self._columnGeometry.count():
+            self._columnGeometry.setSize(column, newSize)
+
+        for view in self._frozenViews.values():
+            view.setColumnWidth(column, newSize)
+        self._updateFrozenGeometry()
+
+        # Resized by hand
+        if newSize != self._autoFitWidths.get(column):
+            self._autoFitWidths.pop(column, None)
+
+
+    def slotColumnResized(self, column, oldSize, newSize):
+        """ Follows the column widths of another view of the same sheet. """
+        if self.columnWidth(column) != newSize:
+            self.setColumnWidth(column, newSize)
+
+
+    #
+    # Auto-fit
+    #
+
+    def sizeHintForColumn(self, column):
+        """ Returns the width for auto-fitting the column, measured on a sample of its cells.
+
+        The sample holds the first and last rows, the longest text of each chunk of rows
+        and random rows; the header is measured by the header view. """
+        model = self.model()
+        rows = model.rowCount()
+
+        sample = set(range(min(rows, 20)))
+        sample.update(range(max(0, rows - 20), rows))
+        if isinstance(model, SheetModel):
+            longest = (model.viewSection(Qt.Vertical, row) for row in model.longestRows(model.sourceSection(Qt.Horizontal, column), 50))
+            sample.update(row for row in longest if row >= 0)
+        sample.update(random.sample(range(rows), min(rows, 50)))
+
+        width = max((self.sizeHintForIndex(model.index(row, column)).width() for row in sample), default=0)
+        width += 1 if self.showGrid() else 0
+
+        self._autoFitWidths[column] = max(width, self.horizontalHeader().sectionSizeHint(column))
+
+        return width
+
+
+    def _refineAutoFit(self):
+        """ Widens auto-fitted columns that new rows do not fit in. """
+        for column in list(self._autoFitWidths):
+            current = self.columnWidth(column)
+            self.sizeHintForColumn(column)
+            if self._autoFitWidths[column] > current:
+                self.setColumnWidth(column, self._autoFitWidths[column])
+            else:
+                self._autoFitWidths[column] = current
+
+
+    #
+    # Frozen panes
+    #
+
+    def frozenRows(self):
+        """  """
+        return self._frozenRows
+
+
+    def frozenColumns(self):
+        """  """
+        return self._frozenColumns
+
+
+    def setFrozen(self, rows, columns):
+        """ Freezes the first rows and columns.
+
+        They are shown by overlay views on the same model, selection model and delegate, sized
+        to the frozen strips, so that only the cells of the strips are fetched and painted. """
+        self._frozenRows = max(0, rows)
+        self._frozenColumns = max(0, columns)
+
+        for view in self._frozenViews.values():
+            view.deleteLater()
+        self._frozenViews = {}
+
+        # Created in stacking order, the corner on top
+        if self._frozenColumns:
+            self._frozenViews["columns"] = self._createFrozenView(True, False)
+        if self._frozenRows:
+            self._frozenViews["rows"] = self._createFrozenView(False, True)
+        if self._frozenColumns and self._frozenRows:
+            self._frozenViews["corner"] = self._createFrozenView(True, False)
+
+        self._updateFrozenGeometry()
+        self._syncFrozenScroll()
+
+
+    def _createFrozenView(self, horizontalHeader, verticalHeader):
+        """  """
+        view = QTableView(self)
+        view.setModel(self.model())
+
+        # Merged cells span the frozen strips as well
+        model = self.model()
+        if isinstance(model, SheetModel):
+            for top, left, bottom, right, value in model.rangeIndex("merges").values(0, 0, model.rowCount(), model.columnCount()):
+                span = self._mergedSpan(top, left, bottom, right)
+                if span is not None:
+                    view.setSpan(*span)
+
+        selectionModel = view.selectionModel()
+        view.setSelectionModel(self.selectionModel())
+        selectionModel.deleteLater()
+
+        view.setItemDelegate(self.itemDelegate())
+        view.setWordWrap(False)
+        view.setFocusPolicy(Qt.NoFocus)
+        view.setFrameShape(QFrame.NoFrame)
+        view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        view.setHorizontalScrollMode(self.horizontalScrollMode())
+        view.setVerticalScrollMode(self.verticalScrollMode())
+
+        view.horizontalHeader().setVisible(horizontalHeader)
+        view.verticalHeader().setVisible(verticalHeader)
+        view.horizontalHeader().setDefaultSectionSize(self.horizontalHeader().defaultSectionSize())
+        view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        view.verticalHeader().setDefaultSectionSize(self.verticalHeader().defaultSectionSize())
+
+        # Only the resized sections differ from the defaults
+        for row, size in self._rowGeometry.resizedSections():
+            view.setRowHeight(row, size)
+        for column, size in self._columnGeometry.resizedSections():
+            view.setColumnWidth(column, size)
+
+        # Scrolling an overlay scrolls the sheet along the axis they share
+        view.horizontalScrollBar().valueChanged.connect(lambda value: self._frozenScrolled(view, Qt.Horizontal, value))
+        view.verticalScrollBar().valueChanged.connect(lambda value: self._frozenScrolled(view, Qt.Vertical, value))
+
+        view.show()
+        return view
+
+
+    def _frozenScrolled(self, view, orientation, value):
+        """  """
+        if orientation == Qt.Horizontal and view is self._frozenViews.get("rows"):
+            self.horizontalScrollBar().setValue(value)
+        elif orientation == Qt.Vertical and view is self._frozenViews.get("columns"):
+            self.verticalScrollBar().setValue(value)
+        else:
+            # Frozen along this axis
+            self._syncFrozenScroll()
+
+
+    def _syncFrozenScroll(self):
+        """  """
+        for name, view in self._frozenViews.items():
+            view.horizontalScrollBar().setValue(self.horizontalScrollBar().value() if name == "rows" else 0)
+            view.verticalScrollBar().setValue(self.verticalScrollBar().value() if name == "columns" else 0)
+
+
+    def _updateFrozenGeometry(self):
+        """ Places the overlay views over the frozen strips. """
+        if not self._frozenViews:
+            return None
+
+        frame = self.frameWidth()
+        headerWidth = self.verticalHeader().width() if self.verticalHeader().isVisible() else 0
+        headerHeight = self.horizontalHeader().height() if self.horizontalHeader().isVisible() else 0
+
+        width = self._columnGeometry.position(min(self._frozenColumns, self._columnGeometry.count()))
+        height = self._rowGeometry.position(min(self._frozenRows, self._rowGeometry.count()))
+
+        for name, view in self._frozenViews.items():
+            if name == "columns":
+                view.setGeometry(frame + headerWidth, frame, width, headerHeight + self.viewport().height())
+                view.horizontalHeader().setFixedHeight(headerHeight)
+            elif name == "rows":
+                view.setGeometry(frame, frame + headerHeight, headerWidth + self.viewport().width(), height)
+                view.verticalHeader().setFixedWidth(headerWidth)
+            else:
+                view.setGeometry(frame + headerWidth, frame, width, headerHeight + height)
+                view.horizontalHeader().setFixedHeight(headerHeight)
+
+
+    def updateGeometries(self):
+        """  """
+        super().updateGeometries()
+        self._updateFrozenGeometry()
+
+
+    def scrollTo(self, index, hint=QAbstractItemView.EnsureVisible):
+        """ Scrolls to the index without moving the frozen axes, keeping it out from under the frozen strips. """
+        horizontal = self.horizontalScrollBar().value()
+        vertical = self.verticalScrollBar().value()
+
+        super().scrollTo(index, hint)
+
+        if index.isValid() and self._frozenViews:
+            if index.column() < self._frozenColumns:
+                self.horizontalScrollBar().setValue(horizontal)
+            if index.row() < self._frozenRows:
+                self.verticalScrollBar().setValue(vertical)
+            self._uncover(index)
+
+
+    def moveCursor(self, cursorAction, modifiers):
+        """  """
+        current = super().moveCursor(cursorAction, modifiers)
+
+        if current.isValid() and self._frozenViews:
+            self._uncover(current)
+
+        return current
+
+
+    def _uncover(self, index):
+        """ Scrolls back until the cell of the index is right of and below the frozen strips. """
+        width = self._columnGeometry.position(min(self._frozenColumns, self._columnGeometry.count()))
+        height = self._rowGeometry.position(min(self._frozenRows, self._rowGeometry.count()))
+
+        if index.column() >= self._frozenColumns:
+            self._uncoverAlong(self.horizontalScrollBar(), self.horizontalScrollMode(), lambda: self.visualRect(index).left(), width)
+        if index.row() >= self._frozenRows:
+            self._uncoverAlong(self.verticalScrollBar(), self.verticalScrollMode(), lambda: self.visualRect(index).top(), height)
+
+
+    @staticmethod
+    def _uncoverAlong(scrollBar, scrollMode, start, extent):
+        """  """
+        while start() < extent and scrollBar.value() > scrollBar.minimum():
+            step = extent - start() if scrollMode == QAbstractItemView.ScrollPerPixel else 1
+            scrollBar.setValue(scrollBar.value() - step)
+
+
+    #
+    # State
+    #
+
+    def viewState(self):
+        """ Returns the scroll position, resized columns and frozen panes, for rebuilding the view later. """
+        return {
+            "scroll": (self.horizontalScrollBar().value(), self.verticalScrollBar().value()),
+            "columnWidths": list(self._columnGeometry.resizedSections()),
+            "frozen": (self._frozenRows, self._frozenColumns),
+        }
+
+
+    def restoreViewState(self, state):
+        """  """
+        for column, width in state["columnWidths"]:
+            self.setColumnWidth(column, width)
+
+        self.setFrozen(*state["frozen"])
+
+        # The scroll ranges are known once the view is laid out
+        self._pendingScroll = state["scroll"]
+        QTimer.singleShot(0, self._restoreScroll)
+
+
+    def _restoreScroll(self):
+        """  """
+        if self._pendingScroll is None:
+            return None
+
+        horizontal, vertical = self._pendingScroll
+        self._pendingScroll = None
+        self.horizontalScrollBar().setValue(horizontal)
+        self.verticalScrollBar().setValue(vertical)
+
+
+    #
+    # Hit-testing
+    #
+
+    def indexAt(self, point):
+        """ Returns the index at the position in viewport coordinates. O(log n) """
+        row = self._rowGeometry.sectionAt(point.y() + self.verticalOffset())
+        column = self._columnGeometry.sectionAt(point.x() + self.horizontalOffset())
+        if row < 0 or column < 0:
+            return QModelIndex()
+
+        # Merged cells answer with their top left cell
+        if self.rowSpan(row, column) > 1 or self.columnSpan(row, column) > 1:
+            return super().indexAt(point)
+
+        return self.model().index(row, column)
+
+
+    def scrollContentsBy(self, dx, dy):
+        """ Scrolls the sheet and the overlays along the axes that are not frozen. """
+        super().scrollContentsBy(dx, dy)
+        self._syncFrozenScroll()
@@ -0,0 +1,116 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import collections
+import sys
+import threading
+import time
+import traceback
+
+from PySide2.QtCore import QObject, QTimer
+
+
+class StallDetector(QObject):
+
+    _stalls = collections.deque(maxlen=20)
+
+
+    def __init__(self, threshold=200, parent=None):
+        """ Watches the event loop of the calling thread; threshold in milliseconds, at least 1. """
+        super().__init__(parent=parent)
+
+        if threshold < 1:
+            raise ValueError("The stall threshold must be at least 1 ms")
+
+        self._threshold = threshold / 1000
+        self._heartbeat = time.monotonic()
+        self._mainThreadId = threading.get_ident()
+        self._running = False
+        self._thread = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(1, threshold // 4))
+        self._timer.timeout.connect(self._beat)
+
+
+    @staticmethod
+    def recentStalls():
+        """ Returns the latest stalls as (time, duration in milliseconds, stack) tuples, oldest first. """
+        return list(StallDetector._stalls)
+
+
+    def start(self):
+        """  """
+        if self._running:
+            return None
+
+        self._running = True
+        self._heartbeat = time.monotonic()
+        self._timer.start()
+
+        self._thread = threading.Thread(target=self._watch, name="StallDetector", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        """  """
+        self._running = False
+        self._timer.stop()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+    def _beat(self):
+        """ Heartbeat, delivered by the event loop. """
+        self._heartbeat = time.monotonic()
+
+
+    def _watch(self):
+        """ Watchdog thread: captures the main thread's stack once the heartbeat is overdue. """
+        stalledSince = None
+        stack = ""
+
+        while self._running:
+            time.sleep(max(0.001, self._threshold / 4))
+
+            heartbeat = self._heartbeat
+            if stalledSince is None:
+                if time.monotonic() - heartbeat >= self._threshold:
+                    stalledSince = heartbeat
+                    frame = sys._current_frames().get(self._mainThreadId)
+                    stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+
+            elif heartbeat != stalledSince:
+                # Wall clock time of the last heartbeat before the stall
+                started = time.time() - (time.monotonic() - stalledSince)
+                self._report(started, (heartbeat - stalledSince) * 1000, stack)
+                stalledSince = None
+
+
+    def _report(self, timestamp, duration, stack):
+        """  """
+        StallDetector._stalls.append((timestamp, duration, stack))
+
+        print("Event loop stalled for {0:.0f} ms from {1}:\n{2}".format(duration, time.strftime("%H:%M:%S", time.localtime(timestamp)), stack), end="", file=sys.stderr)
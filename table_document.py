@@ -21,31 +21,59 @@
 # along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from PySide2.QtCore import Property, Signal, Qt, QSettings
-from PySide2.QtWidgets import QTabWidget, QVBoxLayout, QWidget
+import collections
+
+from PySide2.QtCore import Property, Signal, QSettings
+from PySide2.QtWidgets import QStackedWidget, QTabWidget, QVBoxLayout, QWidget
+
+from sheet_model import SheetModel
+from sheet_navigator import SheetListModel, SheetNavigator
+from sheet_pane import SheetPane
+from tracer import Tracer
 
 
 class TableDocument(QWidget):
 
+    # Number of sheet pages kept alive, the current one included
+    _pageCacheSize = 8
+
+    # Sheet index, sheet row, column and new value of a cell edited by the user
+    cellEdited = Signal(int, int, int, object)
+
+
     def __init__(self, parent=None):
         """  """
         super().__init__(parent=parent)
 
         self._tabBarVisible = True
+        self._tabBarPosition = QTabWidget.South
+        self._tabBarAutoHide = True
+        self._releaseInactiveSheets = False
 
-        self._tabBox = QTabWidget()
-        self._tabBox.setDocumentMode(True)
-        self._tabBox.setMovable(True)
-#        self._tabBox.setTabsClosable(True)
-        self._tabBox.tabCloseRequested.connect(self._slotCloseTab)
+        # Sheets: names for the navigator, models created on first display
+        self._sheetNames = SheetListModel(self)
+        self._sheetModels = []
+        self._currentSheetIndex = -1
 
-        self._loadSettings()
+        # Pages of recently displayed sheets, least recently displayed first
+        self._sheetPages = collections.OrderedDict()
+        self._pageStack = QStackedWidget()
+
+        # View states of sheets whose pages were released
+        self._sheetStates = {}
+
+        self._navigator = SheetNavigator(self._sheetNames)
+        self._navigator.currentChanged.connect(self._showSheet)
+        self._navigator.closeRequested.connect(self._slotCloseTab)
 
         # Main layout
         mainLayout = QVBoxLayout()
-        mainLayout.addWidget(self._tabBox)
+        mainLayout.addWidget(self._pageStack)
+        mainLayout.addWidget(self._navigator)
         self.setLayout(mainLayout)
 
+        self._loadSettings()
+
 
     def _loadSettings(self):
         """  """
@@ -54,17 +82,22 @@ class TableDocument(QWidget):
         # Sheet Tab Bar Visible
         visible = settings.value("Document/SheetTabBarVisible", True, type=bool)
         self._tabBarVisible = visible
-        self._setTabBarVisible(visible)
 
         # Sheet Tab Bar Position
         value = settings.value("Document/SheetTabBarPosition", QTabWidget.South, type=int)
         values = (int(QTabWidget.North), int(QTabWidget.South))
-        position = QTabWidget.TabPosition(value) if value in values else QTabWidget.South
-        self._tabBox.setTabPosition(position)
+        self._tabBarPosition = QTabWidget.TabPosition(value) if value in values else QTabWidget.South
 
         # Sheet Tab Bar Auto Hide
         enabled = settings.value("Document/SheetTabBarAutoHide", True, type=bool)
-        self._tabBox.setTabBarAutoHide(enabled)
+        self._tabBarAutoHide = enabled
+
+        # Release Inactive Sheets
+        enabled = settings.value("Document/ReleaseInactiveSheets", False, type=bool)
+        self._releaseInactiveSheets = enabled
+
+        self._updateNavigatorPosition()
+        self._updateNavigatorVisible()
 
 
     def saveSettings(self):
@@ -75,6 +108,21 @@ class TableDocument(QWidget):
         visible = self._tabBarVisible
         settings.setValue("Document/SheetTabBarVisible", visible)
 
+        # Release Inactive Sheets
+        settings.setValue("Document/ReleaseInactiveSheets", self._releaseInactiveSheets)
+
+
+    def _updateNavigatorVisible(self):
+        """  """
+        self._navigator.setVisible(self._tabBarVisible and not (self._tabBarAutoHide and self.sheetCount() <= 1))
+
+
+    def _updateNavigatorPosition(self):
+        """  """
+        layout = self.layout()
+        layout.removeWidget(self._navigator)
+        layout.insertWidget(0 if self._tabBarPosition == QTabWidget.North else 1, self._navigator)
+
 
     #
     # Property: tabBarVisible
@@ -89,20 +137,20 @@ class TableDocument(QWidget):
         """  """
         if visible != self._tabBarVisible:
             self._tabBarVisible = visible
-            self._setTabBarVisible(self._tabBarVisible)
+            self._updateNavigatorVisible()
             self.tabBarVisibleChanged.emit(self._tabBarVisible)
 
 
     def resetTabBarVisible(self):
         """  """
         self._tabBarVisible = True
-        self._setTabBarVisible(self._tabBarVisible)
+        self._updateNavigatorVisible()
         self.tabBarVisibleChanged.emit(self._tabBarVisible)
 
 
     def initTabBarVisible(self):
         """  """
-        self._setTabBarVisible(self._tabBarVisible)
+        self._updateNavigatorVisible()
         self.tabBarVisibleChanged.emit(self._tabBarVisible)
 
 
@@ -110,32 +158,28 @@ class TableDocument(QWidget):
     tabBarVisible = Property(bool, isTabBarVisible, setTabBarVisible, notify=tabBarVisibleChanged)
 
 
-    def _setTabBarVisible(self, visible):
-        """  """
-        if not (self._tabBox.count() <= 1 and self._tabBox.tabBarAutoHide()):
-            self._tabBox.tabBar().setVisible(visible)
-
-
     #
     # Property: tabBarPosition
     #
 
     def getTabBarPosition(self):
         """  """
-        return self._tabBox.tabPosition()
+        return self._tabBarPosition
 
 
     def setTabBarPosition(self, position):
         """  """
-        if position != self.getTabBarPosition():
-            self._tabBox.setTabPosition(position)
-            self.tabBarPositionChanged.emit(self.getTabBarPosition())
+        if position != self._tabBarPosition:
+            self._tabBarPosition = position
+            self._updateNavigatorPosition()
+            self.tabBarPositionChanged.emit(self._tabBarPosition)
 
 
     def resetTabBarPosition(self):
         """  """
-        self._tabBox.setTabPosition(QTabWidget.South)
-        self.tabsPositionChanged.emit(self.getTabBarPosition())
+        self._tabBarPosition = QTabWidget.South
+        self._updateNavigatorPosition()
+        self.tabBarPositionChanged.emit(self._tabBarPosition)
 
 
     def initTabBarPosition(self):
@@ -153,20 +197,22 @@ class TableDocument(QWidget):
 
     def isTabBarAutoHide(self):
         """  """
-        return self._tabBox.tabBarAutoHide()
+        return self._tabBarAutoHide
 
 
     def setTabBarAutoHide(self, enabled):
         """  """
-        if enabled != self.isTabBarAutoHide():
-            self._tabBox.setTabBarAutoHide(enabled)
-            self.tabBarAutoHideChanged.emit(self.isTabBarAutoHide())
+        if enabled != self._tabBarAutoHide:
+            self._tabBarAutoHide = enabled
+            self._updateNavigatorVisible()
+            self.tabBarAutoHideChanged.emit(self._tabBarAutoHide)
 
 
     def resetTabBarAutoHide(self):
         """  """
-        self._tabBox.setTabBarAutoHide(True)
-        self.tabBarAutoHideChanged.emit(self.isTabBarAutoHide())
+        self._tabBarAutoHide = True
+        self._updateNavigatorVisible()
+        self.tabBarAutoHideChanged.emit(self._tabBarAutoHide)
 
 
     def initTabBarAutoHide(self):
@@ -178,29 +224,192 @@ class TableDocument(QWidget):
     tabBarAutoHide = Property(bool, isTabBarAutoHide, setTabBarAutoHide, notify=tabBarAutoHideChanged)
 
 
+    #
+    # Property: releaseInactiveSheets
+    #
+
+    def isReleaseInactiveSheets(self):
+        """  """
+        return self._releaseInactiveSheets
+
+
+    def setReleaseInactiveSheets(self, enabled):
+        """  """
+        if enabled != self._releaseInactiveSheets:
+            self._releaseInactiveSheets = enabled
+            self._releasePages(self._keptPages())
+            self.releaseInactiveSheetsChanged.emit(self._releaseInactiveSheets)
+
+
+    def resetReleaseInactiveSheets(self):
+        """  """
+        self.setReleaseInactiveSheets(False)
+
+
+    def initReleaseInactiveSheets(self):
+        """  """
+        self.releaseInactiveSheetsChanged.emit(self.isReleaseInactiveSheets())
+
+
+    releaseInactiveSheetsChanged = Signal(bool)
+    releaseInactiveSheets = Property(bool, isReleaseInactiveSheets, setReleaseInactiveSheets, notify=releaseInactiveSheetsChanged)
+
+
+    #
+    # Sheets
+    #
+
+    def sheetCount(self):
+        """  """
+        return self._sheetNames.rowCount()
+
+
+    def sheetNames(self):
+        """  """
+        return self._sheetNames.names()
+
+
+    def sheetModel(self, index):
+        """ Returns the model of the sheet, creating it on first use. """
+        model = self._sheetModels[index]
+        if model is None:
+            model = SheetModel(parent=self)
+            model.cellEdited.connect(self._slotCellEdited)
+            self._sheetModels[index] = model
+
+        return model
+
+
+    def loadedSheetModels(self):
+        """ Returns (index, model) of the sheets whose model exists, without creating the others. """
+        return [(index, model) for index, model in enumerate(self._sheetModels) if model is not None]
+
+
+    def resetSheet(self, index):
+        """ Drops the model and the page of the sheet; they are created again, empty, on next use. """
+        model = self._sheetModels[index]
+        if model is None:
+            return None
+
+        self._sheetModels[index] = None
+        self._sheetStates.pop(model, None)
+        page = self._sheetPages.pop(model, None)
+
+        # The current sheet gets its new page before the old one goes
+        if index == self._currentSheetIndex:
+            self._currentSheetIndex = -1
+            self.setCurrentSheetIndex(index)
+
+        if page is not None:
+            self._releasePage(page)
+        model.deleteLater()
+
+
+    def getCurrentSheetIndex(self):
+        """  """
+        return self._currentSheetIndex
+
+
+    def setCurrentSheetIndex(self, index):
+        """  """
+        if 0 <= index < self.sheetCount():
+            self._navigator.setCurrentIndex(index)
+            self._showSheet(index)
+
+
+    def currentSheet(self):
+        """ Returns the sheet pane of the current sheet, or None. """
+        return self._pageStack.currentWidget()
+
+
+    def _showSheet(self, index):
+        """ Shows the page of the sheet, building it if it was never displayed or was released. """
+        if index == self._currentSheetIndex:
+            return None
+
+        model = self.sheetModel(index)
+
+        page = self._sheetPages.get(model)
+        if page is None:
+            page = SheetPane(model)
+            self._pageStack.addWidget(page)
+            self._sheetPages[model] = page
+
+            state = self._sheetStates.pop(model, None)
+            if state is not None:
+                page.restoreState(state)
+        self._sheetPages.move_to_end(model)
+
+        self._pageStack.setCurrentWidget(page)
+        self._currentSheetIndex = index
+
+        self._releasePages(self._keptPages())
+
+
+    def _keptPages(self):
+        """  """
+        return 1 if self._releaseInactiveSheets else self._pageCacheSize
+
+
+    def _releasePages(self, keep):
+        """ Releases the pages of the least recently displayed sheets beyond keep; their models stay. """
+        while len(self._sheetPages) > max(1, keep):
+            model, page = self._sheetPages.popitem(last=False)
+            self._sheetStates[model] = page.saveState()
+            self._releasePage(page)
+
+
+    def _releasePage(self, page):
+        """  """
+        self._pageStack.removeWidget(page)
+        page.deleteLater()
+
+
     #
     # Slots
     #
 
     def slotAddTab(self, count):
         """  """
-        if not self._tabBox.count():
-            for i in range(1, count+1):
-                widget = QWidget()
-                widget.setAttribute(Qt.WA_DeleteOnClose)
-                self._tabBox.addTab(widget, self.tr("Sheet {0}").format(i))
+        if not self.sheetCount():
+            with Tracer.span("Add sheets", count=count):
+                self._sheetNames.insertNames(0, [self.tr("Sheet {0}").format(i) for i in range(1, count+1)])
+                self._sheetModels = [None] * count
 
-        if self._tabBox.count() > 1:
-            self._tabBox.setTabsClosable(True)
+            self.setCurrentSheetIndex(0)
 
+        self._updateNavigatorVisible()
 
-    def _slotCloseTab(self, index):
+
+    def _slotCellEdited(self, row, column, value):
         """  """
-        if self._tabBox.count() > 1:
-            widget = self._tabBox.widget(index)
-            if widget is not None:
-                widget.close()
-                self._tabBox.removeTab(index)
+        model = self.sender()
+        if model in self._sheetModels:
+            self.cellEdited.emit(self._sheetModels.index(model), row, column, value)
+
 
-        if self._tabBox.count() <= 1:
-            self._tabBox.setTabsClosable(False)
+    def _slotCloseTab(self, index):
+        """  """
+        if self.sheetCount() > 1:
+            model = self._sheetModels.pop(index)
+            page = self._sheetPages.pop(model, None) if model is not None else None
+            if page is not None:
+                self._releasePage(page)
+            if model is not None:
+                self._sheetStates.pop(model, None)
+                model.deleteLater()
+
+            # The navigator must not switch sheets while the indexes shift
+            self._navigator.blockSignals(True)
+            self._sheetNames.removeName(index)
+            self._navigator.blockSignals(False)
+
+            current = self._currentSheetIndex
+            if index < current:
+                self._currentSheetIndex = current - 1
+                self._navigator.setCurrentIndex(self._currentSheetIndex)
+            elif index == current:
+                self._currentSheetIndex = -1
+                self.setCurrentSheetIndex(min(index, self.sheetCount() - 1))
+
+        self._updateNavigatorVisible()
@@ -0,0 +1,305 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import collections
+import concurrent.futures
+import os
+import threading
+
+from PySide2.QtCore import QObject, Signal
+
+from tracer import Tracer
+
+
+class CancellationToken:
+
+    def __init__(self):
+        """  """
+        self._event = threading.Event()
+
+
+    def cancel(self):
+        """  """
+        self._event.set()
+
+
+    def isCancelled(self):
+        """  """
+        return self._event.is_set()
+
+
+class Task(QObject):
+
+    # Emitted from the worker thread; connections to main thread objects are queued
+    finished = Signal(object)
+    failed = Signal(object)
+    cancelled = Signal()
+    progressChanged = Signal(int)
+
+
+    def __init__(self, function, args, token, parent=None):
+        """  """
+        super().__init__(parent=parent)
+
+        self._function = function
+        self._args = args
+        self._token = token
+        self._progress = 0
+
+
+    def token(self):
+        """  """
+        return self._token
+
+
+    def progress(self):
+        """  """
+        return self._progress
+
+
+    def _setProgress(self, value):
+        """ Progress callback handed to the task function; value in percent. """
+        self._progress = max(0, min(100, int(value)))
+        self.progressChanged.emit(self._progress)
+
+
+    def _run(self):
+        """ Runs the task function in the calling worker thread. """
+        if self._token.isCancelled():
+            self.cancelled.emit()
+            return None
+
+        try:
+            with Tracer.span(getattr(self._function, "__name__", "Task")):
+                result = self._function(self._token, self._setProgress, *self._args)
+        except Exception as exception:
+            self.failed.emit(exception)
+            return None
+
+        if self._token.isCancelled():
+            self.cancelled.emit()
+        else:
+            self.finished.emit(result)
+
+
+class TaskScheduler(QObject):
+
+    Interactive = 0
+    Background = 1
+
+    activeTasksChanged = Signal(int)
+    progressChanged = Signal(int)
+
+
+    def __init__(self, threads=0, parent=None):
+        """ Runs tasks on a bounded pool of worker threads; threads defaults to the number of cores.
+
+        Workers are started when tasks need them. Background tasks may occupy all workers but one,
+        so that an interactive task always finds a worker without waiting for long background work. """
+        super().__init__(parent=parent)
+
+        self._condition = threading.Condition()
+        self._pending = {TaskScheduler.Interactive: collections.deque(), TaskScheduler.Background: collections.deque()}
+        self._tasks = []
+        self._tokens = {}
+        self._processPool = None
+        self._stopping = False
+
+        self._maxWorkers = threads or max(2, os.cpu_count() or 2)
+        self._backgroundWorkers = max(1, self._maxWorkers - 1)
+        self._runningBackground = 0
+        # Workers not running a task, including those starting up or notified but not awake yet
+        self._idleWorkers = 0
+        self._workers = []
+
+
+    def submit(self, function, *args, priority=Background, owner=None):
+        """ Queues function(token, progress, *args) and returns its task.
+
+        Interactive tasks are started before any queued background task.
+        Tasks of an owner are cancelled when the owner is destroyed. """
+        token = CancellationToken()
+
+        task = Task(function, args, token, self)
+        # Bound slots of the scheduler, so that deliveries are queued to its thread
+        task.progressChanged.connect(self._taskProgressChanged)
+        task.finished.connect(self._taskFinished)
+        task.failed.connect(self._taskFinished)
+        task.cancelled.connect(self._taskFinished)
+
+        if owner is not None:
+            key = id(owner)
+            if key not in self._tokens:
+                self._tokens[key] = []
+                owner.destroyed.connect(lambda obj=None, key=key: self._cancelOwner(key))
+            self._tokens[key].append(token)
+
+        self._tasks.append(task)
+        self.activeTasksChanged.emit(len(self._tasks))
+
+        with self._condition:
+            self._pending[priority].append(task)
+
+            # One worker per queued task, up to the bound
+            pending = sum(len(tasks) for tasks in self._pending.values())
+            while pending > self._idleWorkers and len(self._workers) < self._maxWorkers:
+                worker = threading.Thread(target=self._work, name="TaskScheduler-{0}".format(len(self._workers) + 1), daemon=True)
+                self._idleWorkers += 1
+                self._workers.append(worker)
+                worker.start()
+            self._condition.notify_all()
+
+        return task
+
+
+    def submitProcess(self, function, *args, priority=Background, owner=None):
+        """ Runs the picklable function(*args) in the bounded process pool and returns its task.
+
+        The task waits for the process in a worker thread, so that it has a priority and can be
+        cancelled like any other task; the function itself cannot report progress. """
+        return self.submit(self._runInProcess, function, args, priority=priority, owner=owner)
+
+
+    def _runInProcess(self, token, progress, function, args):
+        """ Task function of submitProcess. """
+        with self._condition:
+            if self._processPool is None:
+                self._processPool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count() or 2)
+            future = self._processPool.submit(function, *args)
+
+        while True:
+            try:
+                result = future.result(timeout=0.1)
+                break
+            except concurrent.futures.TimeoutError:
+                if token.isCancelled():
+                    future.cancel()
+                    return None
+
+        progress(100)
+        return result
+
+
+    def queueDepth(self):
+        """ Returns the number of tasks waiting for a worker. """
+        with self._condition:
+            return sum(len(pending) for pending in self._pending.values())
+
+
+    def activeTasks(self):
+        """ Returns the number of tasks queued or running. """
+        return len(self._tasks)
+
+
+    def cancel(self, owner):
+        """ Cancels all tasks of the given owner. """
+        self._cancelOwner(id(owner))
+
+
+    def shutdown(self):
+        """ Cancels all tasks and stops the workers once the queued tasks reported their cancellation. """
+        for task in self._tasks:
+            task.token().cancel()
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+
+            if self._processPool is not None:
+                self._processPool.shutdown(wait=False)
+                self._processPool = None
+
+
+    def _cancelOwner(self, key):
+        """  """
+        for token in self._tokens.pop(key, []):
+            token.cancel()
+
+
+    def _nextTask(self):
+        """ Returns the next task a worker may run and whether it is a background task, or None; called with the condition held. """
+        if self._pending[TaskScheduler.Interactive]:
+            return self._pending[TaskScheduler.Interactive].popleft(), False
+
+        background = self._pending[TaskScheduler.Background]
+        if background and self._runningBackground < self._backgroundWorkers:
+            self._runningBackground += 1
+            return background.popleft(), True
+
+        # Cancelled tasks only report their cancellation, any worker may take them
+        if background and background[0].token().isCancelled():
+            return background.popleft(), False
+
+        return None
+
+
+    def _work(self):
+        """ Worker thread loop. """
+        while True:
+            with self._condition:
+                nextTask = self._nextTask()
+                while nextTask is None:
+                    if self._stopping and not any(self._pending.values()):
+                        self._idleWorkers -= 1
+                        return None
+
+                    self._condition.wait()
+                    nextTask = self._nextTask()
+
+                self._idleWorkers -= 1
+
+            task, background = nextTask
+            task._run()
+
+            with self._condition:
+                self._idleWorkers += 1
+                if background:
+                    self._runningBackground -= 1
+                    self._condition.notify_all()
+
+
+    def _taskFinished(self, result=None):
+        """  """
+        task = self.sender()
+        if task not in self._tasks:
+            return None
+
+        self._tasks.remove(task)
+
+        for tokens in self._tokens.values():
+            if task.token() in tokens:
+                tokens.remove(task.token())
+
+        self.activeTasksChanged.emit(len(self._tasks))
+        self._taskProgressChanged()
+
+        # Let connections made by the caller see the signal first
+        task.deleteLater()
+
+
+    def _taskProgressChanged(self, value=0):
+        """ Emits the average progress of all active tasks. """
+        if self._tasks:
+            self.progressChanged.emit(sum(task.progress() for task in self._tasks) // len(self._tasks))
+        else:
+            self.progressChanged.emit(0)
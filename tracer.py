@@ -0,0 +1,124 @@
+# This Python file uses the following encoding: utf-8
+#
+# Copyright 2022 naracanto <https://naracanto.github.io>.
+#
+# This file is part of PyTabelo <https://github.com/beletalabs/pytabelo>.
+#
+# PyTabelo is an open source table editor written in Python using
+# the Python bindings for the Qt framework.
+#
+# PyTabelo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published
+# by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# PyTabelo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyTabelo.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import json
+import os
+import threading
+import time
+
+
+class _Span:
+
+    def __init__(self, name, args):
+        """ A block being recorded. """
+        self._name = name
+        self._args = args
+        self._start = 0.0
+
+
+    def __enter__(self):
+        """  """
+        self._start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exception):
+        """  """
+        end = time.perf_counter()
+        Tracer._events.append({
+            "name": self._name,
+            "ph": "X",
+            "ts": (self._start - Tracer._origin) * 1000000,
+            "dur": (end - self._start) * 1000000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self._args,
+        })
+
+
+class _DisabledSpan:
+
+    def __enter__(self):
+        """  """
+        return self
+
+
+    def __exit__(self, *exception):
+        """  """
+
+
+class Tracer:
+
+    _enabled = False
+    _events = []
+    _origin = time.perf_counter()
+    _disabledSpan = _DisabledSpan()
+
+
+    @staticmethod
+    def isEnabled():
+        """  """
+        return Tracer._enabled
+
+
+    @staticmethod
+    def setEnabled(enabled):
+        """ Starts or stops recording; starting discards previously recorded spans. """
+        if enabled and not Tracer._enabled:
+            Tracer._events = []
+            Tracer._origin = time.perf_counter()
+
+        Tracer._enabled = enabled
+
+
+    @staticmethod
+    def span(name, **args):
+        """ Returns a context manager recording the enclosed block as a span.
+
+        While recording is disabled, a shared context manager that does nothing is returned. Argument
+        values are converted when the trace is saved, so callers can pass objects such as urls as they are. """
+        if not Tracer._enabled:
+            return Tracer._disabledSpan
+
+        return _Span(name, args)
+
+
+    @staticmethod
+    def _argument(value):
+        """ Converts a span argument to JSON, urls as their text. """
+        return value.toString() if hasattr(value, "toString") else str(value)
+
+
+    @staticmethod
+    def save(filename):
+        """ Writes the recorded spans in the Chrome trace event format; raises OSError if the file cannot be written. """
+        threads = [{
+            "name": "thread_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": {"name": thread.name},
+        } for thread in threading.enumerate()]
+
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": threads + list(Tracer._events), "displayTimeUnit": "ms"}, file, default=Tracer._argument)